@@ -0,0 +1,140 @@
+import argparse
+import array
+import json
+import os
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from gibberishModules.ksmreader import *
+from gibberishModules.ksmbuilder import *
+from gibberishModules.cppheader import parseCppHeaderFile
+from gibberishModules.cppbody import parseCppBodyFile
+from benchmarks.synthetic import generateKsmFile
+
+#how much slower than the baseline a phase may get before --compare fails, as a fraction
+defaultTolerance = 0.25
+#phases have to get at least this much slower in seconds too, so timer noise on tiny phases doesn't fail --compare
+minimumSlowdown = 0.002
+
+#the fastest of every run of each phase, and how much work the phase did
+#phases are named "<version> <phase>", units are "words" or "lines"
+class phaseTimer:
+    def __init__(self):
+        self.results = dict()
+
+    def time(self, name: str, function: Callable, *arguments) -> object:
+        start = time.perf_counter()
+        result = function(*arguments)
+        seconds = time.perf_counter() - start
+        if name not in self.results or seconds < self.results[name][0]:
+            self.results[name] = (seconds, *self.results.get(name, (None, 0, "words"))[1:])
+        return result
+
+    def setAmount(self, name: str, amount: int, unit: str):
+        self.results[name] = (self.results[name][0], amount, unit)
+
+    def report(self):
+        for name, (seconds, amount, unit) in self.results.items():
+            rate = amount / seconds if seconds else float("inf")
+            print(f"{name:<52} {seconds * 1000:>10.2f} ms {rate:>14,.0f} {unit}/s")
+
+#decompiles a KSM *.bin the way main() does, returns the *.hksm and *.cksm text
+def benchmarkDecompile(timer: phaseTimer, prefix: str, fileName: str) -> (str, str):
+    fileWords = mapKsmFile(fileName)
+    thisFile = timer.time(f"{prefix} readHeader", ksmFile, fileWords)
+    timer.setAmount(f"{prefix} readHeader", len(fileWords), "words")
+    for sectionIndex in (ksmSection.summary, *definitionSections):
+        name = f"{prefix} parse {sectionIndex.name}"
+        timer.time(name, thisFile.getSection, sectionIndex)
+        timer.setAmount(name, len(thisFile.sections[sectionIndex].words), "words")
+    minID, maxID = getMinimumAndMaximumIdentifiers(thisFile.context)
+    headerWriter = cppWriter()
+    timer.time(f"{prefix} writeCppHeaderFile", writeCppHeaderFile, thisFile.context, minID, headerWriter)
+    headerText = headerWriter.getText()
+    timer.setAmount(f"{prefix} writeCppHeaderFile", headerText.count('\n'), "lines")
+    bodyWriter = cppWriter()
+    timer.time(f"{prefix} parseInstructions", parseInstructions, thisFile.instructions(), bodyWriter)
+    timer.setAmount(f"{prefix} parseInstructions", len(thisFile.sections[ksmSection.code].words), "words")
+    return headerText, bodyWriter.getText()
+
+#compiles decompiled text the way main() does, into fileName
+def benchmarkCompile(timer: phaseTimer, prefix: str, headerText: str, bodyText: str, fileName: str):
+    headerLines = headerText.splitlines(True)
+    bodyLines = bodyText.splitlines(True)
+    definedImports, definedVariables, identifierSlotOffset = timer.time(f"{prefix} parseCppHeaderFile", parseCppHeaderFile, headerLines)
+    timer.setAmount(f"{prefix} parseCppHeaderFile", len(headerLines), "lines")
+    instructionList, definedFunctions, usedIdentifierSlots, usedImportSlots, importCount, allowDisableExpression, definedGlobalArrays = timer.time(f"{prefix} parseCppBodyFile", parseCppBodyFile, bodyLines, definedImports, definedVariables, identifierSlotOffset)
+    timer.setAmount(f"{prefix} parseCppBodyFile", len(bodyLines), "lines")
+
+    sections = [fileSection(0, array.array("I")) for sectionCount in range(9)]
+    variablesByScope = sortVariablesByScope(usedIdentifierSlots)
+    emitters = (
+        ("buildInstructionSection", 7, buildInstructionSection, (instructionList,)),
+        ("buildSummarySection", 0, buildSummarySection, (importCount, allowDisableExpression)),
+        ("buildFunctionDefinitionsSection", 1, buildFunctionDefinitionsSection, (definedFunctions,)),
+        ("buildVariableDefinitionSection statics", 2, buildVariableDefinitionSection, (variablesByScope[variableScope.static],)),
+        ("buildArrayDefinitionSection", 3, buildArrayDefinitionSection, (definedGlobalArrays,)),
+        ("buildVariableDefinitionSection consts", 4, buildVariableDefinitionSection, (variablesByScope[variableScope.const],)),
+        ("buildImportDefinitionSection", 5, buildImportDefinitionSection, (usedImportSlots,)),
+        ("buildVariableDefinitionSection globals", 6, buildVariableDefinitionSection, (variablesByScope[variableScope.Global],)),
+        ("buildHeaderSection", 8, buildHeaderSection, (sections[:-1],))
+    )
+    for name, sectionIndex, emitter, arguments in emitters:
+        timer.time(f"{prefix} {name}", emitter, sections[sectionIndex], *arguments)
+        timer.setAmount(f"{prefix} {name}", len(sections[sectionIndex].words), "words")
+    timer.time(f"{prefix} writeKsmFile", writeKsmFile, fileName, sections)
+    timer.setAmount(f"{prefix} writeKsmFile", os.path.getsize(fileName) // 4, "words")
+
+#checks every phase against a saved run, returns the phases that got slower by more than tolerance
+def compareResults(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    slowerPhases = list()
+    for name, (seconds, amount, unit) in results.items():
+        if name not in baseline:
+            continue
+        baselineSeconds = baseline[name][0]
+        if seconds > baselineSeconds * (1 + tolerance) and seconds - baselineSeconds > minimumSlowdown:
+            slowerPhases.append(f"{name}: {seconds * 1000:.2f} ms, was {baselineSeconds * 1000:.2f} ms")
+    return slowerPhases
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Times decompiling and compiling synthetic KSM files, phase by phase.")
+    parser.add_argument("--functions", type=int, default=50, help="functions per file")
+    parser.add_argument("--statements", type=int, default=50, help="statements per function")
+    parser.add_argument("--depth", type=int, default=4, help="nesting depth of the expressions")
+    parser.add_argument("--array-size", type=int, default=16, help="entries of each array, 1.3.0 only")
+    parser.add_argument("--imports", type=int, default=8, help="imported functions per file")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per phase, the fastest one is reported")
+    parser.add_argument("--save", metavar="FILE", help="write the results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="fail if any phase is slower than in a saved run")
+    parser.add_argument("--tolerance", type=float, default=defaultTolerance, help="how much slower a phase may get with --compare, as a fraction")
+    arguments = parser.parse_args()
+
+    timer = phaseTimer()
+    with tempfile.TemporaryDirectory() as path:
+        for versionRaw in formatProfiles:
+            prefix = f"{versionRaw:#010x}"
+            fileName = os.path.join(path, f"{prefix}.bin")
+            with open(fileName, "wb") as file:
+                file.write(generateKsmFile(versionRaw, arguments.functions, arguments.statements, arguments.depth, arguments.array_size, arguments.imports, arguments.seed))
+            for run in range(arguments.repeat):
+                headerText, bodyText = benchmarkDecompile(timer, prefix, fileName)
+                # *.cksm files are always built as 1.3.0, and 1.3.2 imports don't say which file they're from, so only 1.3.0 is compiled again
+                if versionRaw == 0x00010300:
+                    benchmarkCompile(timer, prefix, headerText, bodyText, os.path.join(path, f"{prefix}.re.bin"))
+    timer.report()
+
+    if arguments.save is not None:
+        with open(arguments.save, "w", encoding="utf-8") as file:
+            json.dump(timer.results, file, indent=4)
+    if arguments.compare is not None:
+        with open(arguments.compare, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+        slowerPhases = compareResults(timer.results, baseline, arguments.tolerance)
+        for slowerPhase in slowerPhases:
+            print(f"SLOWER - {slowerPhase}")
+        if slowerPhases:
+            sys.exit(1)
+
+if __name__ == "__main__": main()
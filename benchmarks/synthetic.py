@@ -0,0 +1,137 @@
+import array
+import random
+
+#opcodes that differ between the two format versions, by the version they're used for
+#only the instructions the generated code uses are listed
+syntheticOpcodes = {
+    0x00010300: {
+        '(': 0x41, ')': 0x42, '+': 0x53, '-': 0x54, '*': 0x55,
+        "closeExpression": 0x40, "call": 0x0c, "closeCall": 0x11,
+        "if": 0x18, "endIf": 0x28, "while": 0x39, "endWhile": 0x3c, "assignment": 0x3d,
+        "intArrayOpen": 0x64, "arrayClose": 0x66
+    },
+    0x00010302: {
+        '(': 0x3e, ')': 0x3f, '+': 0x50, '-': 0x51, '*': 0x52,
+        "closeExpression": 0x3d, "call": 0x0b, "closeCall": 0x10,
+        "if": 0x17, "endIf": 0x26, "while": 0x36, "endWhile": 0x39, "assignment": 0x3a
+    }
+}
+
+syntheticMaxInstructionIDs = {
+    0x00010300: 0xa0,
+    0x00010302: 0x76
+}
+
+def stringToWords(string: str) -> list[int]:
+    # same layout as writeStringToKsm
+    string = string.encode('utf-8')
+    string += b"\x00" * (4 - (len(string) % 4))
+    return [len(string) // 4] + array.array("I", string).tolist()
+
+#a made up KSM *.bin that decodes like a real one, for benchmarks
+#every function assigns, calls imports, branches, loops and (1.3.0 only) declares an array, all over expressions nested depth levels deep
+#the same arguments always give the same file
+def generateKsmFile(versionRaw: int, functionCount: int = 20, statementCount: int = 20, depth: int = 3, arraySize: int = 8, importCount: int = 4, seed: int = 1) -> bytes:
+    rng = random.Random(seed)
+    opcodes = syntheticOpcodes[versionRaw]
+    isAlt = versionRaw == 0x00010302
+    identifierCount = 0
+
+    def newIdentifier(typeBits: int) -> int:
+        nonlocal identifierCount
+        identifierCount += 1
+        return 0x100000 + identifierCount | typeBits
+
+    statics = [(newIdentifier(0x30000000), index * 7) for index in range(3)]
+    consts = dict()
+    def getConst(value: int) -> int:
+        if value not in consts:
+            consts[value] = newIdentifier(0x40000000)
+        return consts[value]
+
+    def generateExpression(depth: int) -> list[int]:
+        if depth <= 0:
+            return [getConst(rng.randint(0, 100))]
+        return [opcodes['('], *generateExpression(depth - 1), opcodes[rng.choice("+-*")], *generateExpression(depth - 1), opcodes[')']]
+
+    importIdentifiers = [syntheticMaxInstructionIDs[versionRaw] + 1 + index for index in range(importCount)]
+    functions = [{"identifier": newIdentifier(0x10000000), "name": f"func{index}", "arrays": list()} for index in range(functionCount)]
+    localVar0 = 0x20000000
+    localVar1 = 0x20000100
+    code = list()
+    for function in functions:
+        function["codeOffset"] = len(code)
+        code += [0x05, function["identifier"], localVar0, localVar1, 0x08]
+        for statementIndex in range(statementCount):
+            match statementIndex % 5:
+                case 0:
+                    code += [opcodes["assignment"], localVar1, *generateExpression(depth), opcodes["closeExpression"]]
+                case 1 if importIdentifiers:
+                    code += [opcodes["call"], importIdentifiers[statementIndex % importCount], localVar0, opcodes["closeExpression"], *generateExpression(depth), opcodes["closeExpression"], opcodes["closeCall"]]
+                case 2:
+                    code += [opcodes["if"], localVar0, opcodes['+'], getConst(1), opcodes["closeExpression"], 0]
+                    jumpPosition = len(code)
+                    code += [0, 0]
+                    code += [opcodes["assignment"], localVar0, localVar1, opcodes["closeExpression"]]
+                    code[jumpPosition] = len(code)
+                    code += [opcodes["endIf"]]
+                case 3:
+                    code += [opcodes["while"], localVar0] if isAlt else [opcodes["while"], localVar0, opcodes["closeExpression"]]
+                    jumpPosition = len(code)
+                    code += [0]
+                    code += [opcodes["assignment"], localVar0, statics[0][0], opcodes["closeExpression"]]
+                    code[jumpPosition] = len(code)
+                    code += [opcodes["endWhile"]]
+                case 4 if not isAlt and arraySize:
+                    arrayIdentifier = newIdentifier(0x10000000)
+                    function["arrays"].append((arrayIdentifier, len(code) + 1, f"arr{arrayIdentifier & 0xfff:x}"))
+                    code += [opcodes["intArrayOpen"], *(rng.randint(0, 1000) for _ in range(arraySize)), opcodes["arrayClose"]]
+        code += [0x03, localVar0, opcodes["closeExpression"], 0x09]
+        function["codeEnd"] = len(code)
+    code.append(0x01)
+
+    sections = list()
+    # summary
+    sections.append([0xffffffff, 0, *stringToWords("synthetic.cpp")] if isAlt else [0, 0, importCount])
+    # function definitions, newest first like the compiler writes them
+    section = [functionCount]
+    for function in functions[::-1]:
+        section += [0xffffffff, function["identifier"], 1]
+        if not isAlt:
+            section.append(0xffffffff)
+        section += [function["codeOffset"], function["codeEnd"], 0x20000200, 0, *stringToWords(function["name"])]
+        if isAlt:
+            section.append(0)
+        else:
+            section += [3, 0, localVar0, 1, 0, 0, localVar1, 1, 0, 0, 0x20000200, 1, 0]
+        section.append(len(function["arrays"]))
+        for arrayIdentifier, address, name in function["arrays"]:
+            section += [0xffffffff, arrayIdentifier, 1, arraySize, address, *stringToWords(name)]
+        section.append(0)
+    sections.append(section)
+    # statics
+    sections.append([len(statics), *(word for identifier, value in statics for word in (0, identifier, 0x02000001, value))])
+    # global arrays
+    sections.append([0])
+    # consts
+    sections.append([len(consts), *(word for value, identifier in consts.items() for word in (0, identifier, 0x04000001, value))])
+    # imports
+    section = [importCount]
+    for index, identifier in enumerate(importIdentifiers):
+        if isAlt:
+            section += [0xffffffff, 1, 0x04, identifier, 0, *stringToWords(f"import{index}")]
+        else:
+            section += [0xffffffff, 1 | ((0x100 + index) << 16), 0x04, 0, identifier, 0, 0, *stringToWords(f"import{index}")]
+    sections.append(section)
+    # globals
+    sections.append([0])
+    # code
+    sections.append([len(code), *code])
+
+    header = [0x524d534b, versionRaw]
+    offset = 0x0b
+    for section in sections:
+        header.append(offset)
+        offset += len(section)
+    header.append(0)
+    return array.array("I", header + [word for section in sections for word in section]).tobytes()
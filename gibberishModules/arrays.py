@@ -9,7 +9,7 @@ class arrayDataType(Enum):
     Float = 2
     Bool = 3
 
-@dataclass
+@dataclass(slots=True)
 class arrayDefinition:
     name: str
     length: int
@@ -18,74 +18,40 @@ class arrayDefinition:
     values: list
     dataType: IntEnum
 
-arrayDefinitionDictByAddress = dict()
-arrayDefinitionDictByID = dict()
-arrayDefinitionDictByName = dict()
-
-def readArrayDefinitionFromKsm(wordsEnumerated: enumerate[int], currentWord: rawWord) -> (arrayDefinition, int, int):
+def readArrayDefinitionFromKsm(cursor: wordCursor) -> (arrayDefinition, int, int):
     # padding
-    getNextWord(wordsEnumerated, currentWord)
-    assert currentWord.value == 0xffffffff, hex(currentWord.value)
+    word = cursor.readWord()
+    assert word == 0xffffffff, hex(word)
     
     # array id
-    getNextWord(wordsEnumerated, currentWord)
-    identifier = currentWord.value
+    identifier = cursor.readWord()
     
     # datatype - discard
-    getNextWord(wordsEnumerated, currentWord)
+    cursor.skip()
     
     # length
-    getNextWord(wordsEnumerated, currentWord)
-    length = currentWord.value
+    length = cursor.readWord()
     
     # address
-    getNextWord(wordsEnumerated, currentWord)
-    address = currentWord.value
+    address = cursor.readWord()
     
     # name
-    name = readStringFromKsm(wordsEnumerated, currentWord)
+    name = readStringFromKsm(cursor)
     return arrayDefinition(name, length, identifier, address, None, None), address, identifier
 
-def parseArrayDefinitions(section: object):
-    currentWord = rawWord(0, 0)
-    wordsEnumerated = enumerate(section.words)
-    global arrayDefinitionDictByAddress, arrayDefinitionDictByID
+def parseArrayDefinitions(section: object) -> (dict[int, arrayDefinition], dict[int, arrayDefinition], dict[str, arrayDefinition]):
+    cursor = wordCursor(section.words)
     arrayDefinitionDictByAddress = dict()
     arrayDefinitionDictByID = dict()
+    arrayDefinitionDictByName = dict()
     for index in range(section.itemCount):
-        newDefinition, address, identifier = readArrayDefinitionFromKsm(wordsEnumerated, currentWord)
+        newDefinition, address, identifier = readArrayDefinitionFromKsm(cursor)
         arrayDefinitionDictByAddress[address] = newDefinition
         arrayDefinitionDictByID[identifier] = newDefinition
         arrayDefinitionDictByName[newDefinition.name] = newDefinition
+    return arrayDefinitionDictByAddress, arrayDefinitionDictByID, arrayDefinitionDictByName
 
-def arrayDefinitionDictByAddressGet(key: int, currentFunctionTree: list[object] = []) -> arrayDefinition | None:
-    if currentFunctionTree:
-        potentialMatch = currentFunctionTree[-1].localArraysByAddress.get(key, None)
-        if not potentialMatch is None:
-            return potentialMatch
-    return arrayDefinitionDictByAddress.get(key, None)
-
-def arrayDefinitionDictByIDGet(key: int, currentFunctionTree: list[object] = []) -> arrayDefinition | None:
-    if currentFunctionTree:
-        potentialMatch = currentFunctionTree[-1].localArraysByID.get(key, None)
-        if not potentialMatch is None:
-            return potentialMatch
-    return arrayDefinitionDictByID.get(key, None)
-
-def arrayDefinitionDictByNameGet(key: int, currentFunctionTree: list[object] | object = []) -> arrayDefinition | None:
-    if currentFunctionTree:
-        if isinstance(currentFunctionTree, list):
-            potentialMatch = currentFunctionTree[-1].localArraysByName.get(key, None)
-        else:
-            potentialMatch = currentFunctionTree.localArraysByName.get(key, None)
-        if potentialMatch is not None:
-            return potentialMatch
-    return arrayDefinitionDictByName.get(key, None)
-
-def arrayDefinitionDictByIDGetAllKeys() -> list[int]:
-    return arrayDefinitionDictByID.keys()
-
-def getMinimumAndMaxmimumArrayIdentifiers() -> (int, int):
+def getMinimumAndMaxmimumArrayIdentifiers(arrayDefinitionDictByID: dict[int, arrayDefinition]) -> (int, int):
     identifierList = [identifier & 0x0fffffff for identifier in arrayDefinitionDictByID.keys()]
     if not identifierList:
         return 0xffffffff, 0x00000000
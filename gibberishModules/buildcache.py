@@ -0,0 +1,356 @@
+import array
+import hashlib
+import io
+import os
+import pickle
+from copy import copy
+from dataclasses import dataclass, field, fields
+from gibberishModules.functionDefinitions import functionDefinition, label
+from gibberishModules.arrays import arrayDefinition
+from gibberishModules.instructions import closeFunctionInstruction, maxInstructionID, relocation, resolveRelocations
+from gibberishModules.parsecache import getCodeVersion
+
+#bump whenever the compiler changes what it builds from the same source, build caches from older versions are then ignored
+buildCacheVersion = 2
+
+#written as the first record of every build cache and compared before the records are unpickled
+#the source of the compiler is part of it, records pickled from classes that changed since are never even loaded
+def getBuildCacheVersion() -> str:
+    return f"{buildCacheVersion}:{getCodeVersion()}"
+
+#forward calls get these identifiers while their positions are looked for, the low bits are an index into forwardFunctions
+forwardCallMarker = 0x7fff0000
+
+#attributes that hold addresses into the code section, the only ones that change when a function's code moves
+addressAttributes = {
+    functionDefinition: ("codeOffset", "codeEnd"),
+    label: ("address",),
+    arrayDefinition: ("address",),
+}
+
+#identifier slots are slotted dataclasses, their fields are all the state they have
+def getSlotState(slot: object) -> dict:
+    return {slotField.name: getattr(slot, slotField.name) for slotField in fields(slot)}
+
+def setSlotState(slot: object, slotState: dict):
+    for name, value in slotState.items():
+        setattr(slot, name, value)
+
+#same as iterableFile.formatCurrentLine
+def formatCppLine(line: str) -> str:
+    line = line.removesuffix('\n')
+    if '//' in line:
+        line = line[:line.index('//')]
+    return line.strip()
+
+#finds every top-level function of a *.cksm body and returns the line each one ends on by the line it starts on
+#only functions whose closing brace ends its line are returned, anything else is just compiled every time
+def findFunctionBlocks(fileLines: list[str]) -> dict[int, int]:
+    functionBlocks = dict()
+    depth = 0
+    start = None
+    for index, line in enumerate(fileLines):
+        line = formatCppLine(line)
+        if not line:
+            continue
+        if depth == 0 and start is None and line.split(None, 1)[0] in ("public", "private"):
+            start = index
+            hasOpened = False
+        exitCharacter = None
+        isEscaped = False
+        for position, character in enumerate(line):
+            if exitCharacter is not None:
+                if isEscaped:
+                    isEscaped = False
+                elif character == '\\':
+                    isEscaped = True
+                elif character == exitCharacter:
+                    exitCharacter = None
+            elif character in ('"', "'"):
+                exitCharacter = character
+            elif character == '{':
+                depth += 1
+                hasOpened = True
+            elif character == '}':
+                depth -= 1
+                if depth < 0:
+                    depth = 0
+                    start = None
+                elif depth == 0 and start is not None and position != len(line) - 1:
+                    start = None
+        if start is not None and hasOpened and depth == 0:
+            functionBlocks[start] = index
+            start = None
+    return functionBlocks
+
+#everything compiling one function did to the compilation data, so it can be done again without reading the function
+#objects that existed before the function are pickled as references to them, see statePickler
+@dataclass
+class functionState:
+    newSlots: list
+    slotStates: list[tuple[object, dict]]
+    newImports: list
+    timesUsed: list[tuple[object, int]]
+    importCount: int
+    allowDisableExpression: bool
+    constEntries: list[tuple[str, object]]
+    functionTail: list[tuple[str, functionDefinition]]
+    forwardFunctions: list[functionDefinition]
+
+#what a build cache keeps per function
+#words are encoded as if the function started at address 0, relocations are the words holding addresses, taken from the section's relocation table
+#forwardCalls are the words holding identifiers of functions that were defined after it, by index into forwardFunctions
+#addresses are the code addresses of newSlots, also from address 0
+@dataclass
+class functionRecord:
+    state: bytes
+    words: array.array
+    relocations: list[int]
+    forwardCalls: list[tuple[int, int]]
+    addresses: list[tuple[int, str, int]]
+
+#a function a build cache is recording, it is turned into a functionRecord once the whole file is parsed
+@dataclass
+class recordingFunction:
+    key: str
+    end: int
+    slotCount: int
+    importSlotCount: int
+    timesUsed: list[tuple[object, int]]
+    importCount: int
+    allowDisableExpression: bool
+    constCount: int
+    functionItems: list[tuple[str, functionDefinition]]
+    instructionCount: int
+    globalArrayCount: int
+
+#pickles objects that existed before a function as references to them
+class statePickler(pickle.Pickler):
+    def __init__(self, file: io.BytesIO, knownObjects: dict[int, tuple[str, int | str]]):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.knownObjects = knownObjects
+
+    def persistent_id(self, obj: object) -> tuple[str, int | str] | None:
+        return self.knownObjects.get(id(obj))
+
+#turns the references back into the objects of the compilation in progress
+class stateUnpickler(pickle.Unpickler):
+    def __init__(self, file: io.BytesIO, thisData: object):
+        super().__init__(file)
+        self.thisData = thisData
+
+    def persistent_load(self, reference: tuple[str, int | str]) -> object:
+        kind, key = reference
+        match kind:
+            case "slot":
+                return self.thisData.usedIdentifierSlots[key]
+            case "function":
+                return self.thisData.definedFunctions[key]
+            case "variable":
+                return self.thisData.definedVariables[key]
+            case "import":
+                return self.thisData.definedImports[key]
+        raise pickle.UnpicklingError(f"Unknown build cache reference {reference}")
+
+@dataclass
+class scratchSection:
+    words: array.array
+    relocations: list[relocation] = field(default_factory=list)
+
+#stands in for all the instructions of a function taken from the build cache
+class cachedFunctionInstruction:
+    def __init__(self, record: functionRecord, state: functionState):
+        self.record = record
+        self.state = state
+
+    def writeToKsm(self, section: object):
+        base = len(section.words)
+        words = array.array("I", self.record.words)
+        for position in self.record.relocations:
+            words[position] += base
+            # already resolved, but kept in the section's table so it covers every jump
+            section.relocations.append(relocation(base + position, words[position]))
+        for position, index in self.record.forwardCalls:
+            function = self.state.forwardFunctions[index]
+            assert function.identifier is not None, function.name
+            words[position] = function.identifier
+        section.words.extend(words)
+        for index, attribute, address in self.record.addresses:
+            setattr(self.state.newSlots[index], attribute, base + address)
+
+#reuses the encoded words of top-level functions that are unchanged since the last build of a *.cksm
+#a function is only reused if both its text and everything compiling it depends on are the same, i.e. the header, the identifier slots, imports and functions used before it
+#an edited function therefore gets compiled again together with every function after it that it shifted, functions before it are copied over
+class buildCache:
+    def __init__(self, fileName: str, fileLines: list[str], headerLines: list[str], definedImports: dict, definedVariables: dict):
+        self.fileName = fileName
+        self.fileLines = fileLines
+        self.functionBlocks = findFunctionBlocks(fileLines)
+        self.records = dict()
+        self.usedRecords = dict()
+        self.recordedFunctions = list()
+        self.function = None
+        try:
+            with open(fileName, "rb") as file:
+                if pickle.load(file) == getBuildCacheVersion():
+                    self.records = pickle.load(file)
+        except FileNotFoundError:
+            pass
+        except Exception:
+            # damaged, or from a checkout whose classes don't unpickle anymore, everything gets built and the file rewritten
+            self.records = dict()
+
+        # slot descriptions are hashed as the slots get used, so the fingerprint of the slots before a function is never worked out twice
+        self.slotsDigest = hashlib.blake2b(f"{buildCacheVersion}".encode())
+        self.slotsDigest.update("".join(headerLines).encode())
+        self.knownSlotCount = 0
+        self.knownObjects = dict()
+        for name, thisVariable in definedVariables.items():
+            self.knownObjects[id(thisVariable)] = ("variable", name)
+        for name, thisImport in definedImports.items():
+            self.knownObjects[id(thisImport)] = ("import", name)
+
+    def updateKnownObjects(self, thisData: object):
+        for index in range(self.knownSlotCount, len(thisData.usedIdentifierSlots)):
+            slot = thisData.usedIdentifierSlots[index]
+            self.knownObjects[id(slot)] = ("slot", index)
+            description = (type(slot).__name__, getattr(slot, "name", None), getattr(slot, "alias", None), getattr(slot, "scope", None), getattr(slot, "dataTypeString", None), getattr(slot, "value", None) if not isinstance(slot, arrayDefinition) else None)
+            self.slotsDigest.update(repr(description).encode())
+        self.knownSlotCount = len(thisData.usedIdentifierSlots)
+        for key, function in thisData.definedFunctions.items():
+            self.knownObjects.setdefault(id(function), ("function", key))
+
+    def getFingerprint(self, thisData: object) -> bytes:
+        digest = self.slotsDigest.copy()
+        digest.update(repr([(key, function.identifier, function.isPublic is None) for key, function in thisData.definedFunctions.items()]).encode())
+        digest.update(repr([thisImport.name for thisImport in thisData.usedImportSlots]).encode())
+        digest.update(repr(list(thisData.definedGlobalArrays)).encode())
+        return digest.digest()
+
+    def startFunction(self, file: object, thisData: object) -> bool:
+        # returns True if the function starting at the current line was taken from the cache, the file is then past its last line
+        self.function = None
+        end = self.functionBlocks.get(file.index)
+        if end is None or file.line != formatCppLine(self.fileLines[file.index]):
+            return False
+        self.updateKnownObjects(thisData)
+        digest = hashlib.blake2b("".join(self.fileLines[file.index:end + 1]).encode())
+        digest.update(self.getFingerprint(thisData))
+        key = digest.hexdigest()
+
+        record = self.records.get(key)
+        if record is not None:
+            self.replayFunction(record, thisData)
+            self.usedRecords[key] = record
+            while file.index < end:
+                file.index, line = next(file.fileLines)
+            file.setLine("")
+            return True
+
+        self.function = recordingFunction(key, end, len(thisData.usedIdentifierSlots), len(thisData.usedImportSlots), [(thisImport, thisImport.timesUsed) for thisImport in thisData.definedImports.values()], thisData.importCount, thisData.allowDisableExpression, len(thisData.constDict), list(thisData.definedFunctions.items()), len(thisData.instructionList), len(thisData.definedGlobalArrays))
+        # cleared so it can be told whether the function itself needs it
+        thisData.allowDisableExpression = False
+        return False
+
+    def endFunction(self, file: object, thisData: object, lastInstruction: object, statementLine: int):
+        # called after every top-level statement, only the closing brace of the function being recorded ends it
+        function = self.function
+        if function is None:
+            return
+        self.function = None
+        allowDisableExpression = thisData.allowDisableExpression
+        thisData.allowDisableExpression |= function.allowDisableExpression
+        if not isinstance(lastInstruction, closeFunctionInstruction) or statementLine != function.end or (file.line is not None and file.index <= function.end):
+            return
+        if len(thisData.definedGlobalArrays) != function.globalArrayCount:
+            return
+
+        # functions only ever get added or moved to the end, anything from the first difference on is replayed as is
+        functionItems = list(thisData.definedFunctions.items())
+        unchangedCount = 0
+        for (key, thisFunction), (oldKey, oldFunction) in zip(functionItems, function.functionItems):
+            if key != oldKey or thisFunction is not oldFunction:
+                break
+            unchangedCount += 1
+        functionTail = functionItems[unchangedCount:]
+        if not {key for key, thisFunction in function.functionItems[unchangedCount:]} <= {key for key, thisFunction in functionTail}:
+            return
+
+        newSlots = thisData.usedIdentifierSlots[function.slotCount:]
+        state = functionState(
+            newSlots,
+            [(slot, getSlotState(slot)) for slot in newSlots if id(slot) in self.knownObjects],
+            thisData.usedImportSlots[function.importSlotCount:],
+            [(thisImport, thisImport.timesUsed - timesUsed) for thisImport, timesUsed in function.timesUsed if thisImport.timesUsed != timesUsed],
+            thisData.importCount - function.importCount,
+            allowDisableExpression,
+            list(thisData.constDict.items())[function.constCount:],
+            functionTail,
+            [thisFunction for thisFunction in thisData.definedFunctions.values() if thisFunction.identifier is None])
+
+        # pickled right away, functions after this one still change the objects it made
+        stream = io.BytesIO()
+        statePickler(stream, self.knownObjects).dump(state)
+        self.recordedFunctions.append((function.key, stream.getvalue(), thisData.instructionList[function.instructionCount:], newSlots, state.forwardFunctions))
+
+    def replayFunction(self, record: functionRecord, thisData: object):
+        state = stateUnpickler(io.BytesIO(record.state), thisData).load()
+        for slot, slotState in state.slotStates:
+            setSlotState(slot, slotState)
+        thisData.usedIdentifierSlots.extend(state.newSlots)
+        for thisImport in state.newImports:
+            thisData.usedImportSlots.append(thisImport)
+            thisImport.identifier = len(thisData.usedImportSlots) + maxInstructionID
+        for thisImport, timesUsed in state.timesUsed:
+            thisImport.timesUsed += timesUsed
+        thisData.importCount += state.importCount
+        thisData.allowDisableExpression |= state.allowDisableExpression
+        thisData.constDict.update(state.constEntries)
+        for key, function in state.functionTail:
+            thisData.definedFunctions.pop(key, None)
+        thisData.definedFunctions.update(state.functionTail)
+        thisData.instructionList.append(cachedFunctionInstruction(record, state))
+
+    def encodeInstructions(self, instructions: list, instructionStates: list[dict]) -> scratchSection:
+        # encoding sets up jumps on the instructions themselves, so every encode starts over from the parsed state
+        for instruction, instructionState in zip(instructions, instructionStates):
+            instruction.__dict__.clear()
+            instruction.__dict__.update(instructionState)
+        section = scratchSection(array.array("I"))
+        for instruction in instructions:
+            instruction.writeToKsm(section)
+        resolveRelocations(section)
+        return section
+
+    def finish(self):
+        # turns every function compiled this time into a record, has to run before the code section gets built
+        # a function is encoded from address 0 to find its addresses and jumps, then with marked forward calls to find those
+        for key, state, instructions, newSlots, forwardFunctions in self.recordedFunctions:
+            if any(function.identifier is None for function in forwardFunctions):
+                continue
+            instructionStates = [copy(instruction.__dict__) for instruction in instructions]
+            section = self.encodeInstructions(instructions, instructionStates)
+            words = section.words
+            relocations = [thisRelocation.position for thisRelocation in section.relocations]
+            addresses = [(index, attribute, getattr(slot, attribute)) for index, slot in enumerate(newSlots) for attribute in addressAttributes.get(type(slot), ()) if getattr(slot, attribute) is not None]
+            identifiers = [function.identifier for function in forwardFunctions]
+            for index, function in enumerate(forwardFunctions):
+                function.identifier = forwardCallMarker | index
+            try:
+                markedWords = self.encodeInstructions(instructions, instructionStates).words
+            finally:
+                for function, identifier in zip(forwardFunctions, identifiers):
+                    function.identifier = identifier
+            forwardCalls = [(position, markedWord & 0xffff) for position, (word, markedWord) in enumerate(zip(words, markedWords)) if word != markedWord]
+            for instruction, instructionState in zip(instructions, instructionStates):
+                instruction.__dict__.clear()
+                instruction.__dict__.update(instructionState)
+            self.usedRecords[key] = functionRecord(state, words, relocations, forwardCalls, addresses)
+
+    def save(self):
+        # only what this build used or made is kept, so the cache never outgrows the file
+        temporaryName = f"{self.fileName}.{os.getpid()}.tmp"
+        with open(temporaryName, "wb") as file:
+            pickle.dump(getBuildCacheVersion(), file, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(self.usedRecords, file, pickle.HIGHEST_PROTOCOL)
+        os.replace(temporaryName, self.fileName)
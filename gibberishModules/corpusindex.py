@@ -0,0 +1,122 @@
+import os
+import sqlite3
+from dataclasses import dataclass
+from gibberishModules.imports import importDefinition
+from gibberishModules.parsecache import hashFile
+
+#everything the index keeps about one KSM *.bin, gathered in a single decode
+@dataclass
+class indexedFile:
+    minID: int
+    maxID: int
+    imports: list[importDefinition]
+    functions: list[tuple[str, int, bool]]
+    counts: list[int]
+
+schema = """
+CREATE TABLE IF NOT EXISTS files (
+    fileName TEXT PRIMARY KEY,
+    modifiedTime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    isValid INTEGER NOT NULL,
+    minID INTEGER,
+    maxID INTEGER
+);
+CREATE TABLE IF NOT EXISTS imports (
+    fileName TEXT NOT NULL,
+    name TEXT NOT NULL,
+    identifier INTEGER NOT NULL,
+    importFileID INTEGER,
+    dataType TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS functions (
+    fileName TEXT NOT NULL,
+    name TEXT NOT NULL,
+    identifier INTEGER NOT NULL,
+    isPublic INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS opcodes (
+    fileName TEXT NOT NULL,
+    opcode INTEGER NOT NULL,
+    count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS importsByName ON imports (name);
+CREATE INDEX IF NOT EXISTS importsByFile ON imports (fileName);
+CREATE INDEX IF NOT EXISTS functionsByName ON functions (name);
+CREATE INDEX IF NOT EXISTS functionsByFile ON functions (fileName);
+CREATE INDEX IF NOT EXISTS opcodesByOpcode ON opcodes (opcode);
+CREATE INDEX IF NOT EXISTS opcodesByFile ON opcodes (fileName);
+CREATE INDEX IF NOT EXISTS filesByMinID ON files (minID);
+"""
+
+#the name a file is stored under, relative to the corpus and with / between directories on every platform
+#so query results can be joined onto the corpus path and databases can be moved between machines
+def getCorpusFileName(path: str, fullFileName: str) -> str:
+    return os.path.relpath(fullFileName, path).replace(os.sep, "/")
+
+#a SQLite database of what every file of a corpus imports, defines and uses
+#files are stored by their name relative to the corpus, only files whose contents changed since the last run are decoded again
+class corpusIndex:
+    def __init__(self, databaseName: str):
+        self.connection = sqlite3.connect(databaseName)
+        self.connection.executescript(schema)
+
+    def findChangedFiles(self, path: str, fullFileNames: list[str]) -> dict[str, tuple[float, int, str]]:
+        # the modified time and size decide which files get hashed, the hash decides which files get decoded
+        # returns the modified time, size and hash of every file that has to be decoded
+        known = {fileName: (modifiedTime, size, fileHash) for fileName, modifiedTime, size, fileHash in self.connection.execute("SELECT fileName, modifiedTime, size, hash FROM files")}
+        changedFiles = dict()
+        for fullFileName in fullFileNames:
+            fileName = getCorpusFileName(path, fullFileName)
+            stat = os.stat(fullFileName)
+            knownFile = known.pop(fileName, None)
+            if knownFile is not None and knownFile[:2] == (stat.st_mtime, stat.st_size):
+                continue
+            fileHash = hashFile(fullFileName).hexdigest()
+            if knownFile is not None and knownFile[2] == fileHash:
+                self.connection.execute("UPDATE files SET modifiedTime = ?, size = ? WHERE fileName = ?", (stat.st_mtime, stat.st_size, fileName))
+                continue
+            changedFiles[fullFileName] = (stat.st_mtime, stat.st_size, fileHash)
+        # anything left was removed from the corpus
+        for fileName in known:
+            self.removeFile(fileName)
+        return changedFiles
+
+    def removeFile(self, fileName: str):
+        for table in ("files", "imports", "functions", "opcodes"):
+            self.connection.execute(f"DELETE FROM {table} WHERE fileName = ?", (fileName,))
+
+    def updateFile(self, fileName: str, modifiedTime: float, size: int, fileHash: str, result: indexedFile | None):
+        self.removeFile(fileName)
+        if result is None:
+            self.connection.execute("INSERT INTO files VALUES (?, ?, ?, ?, 0, NULL, NULL)", (fileName, modifiedTime, size, fileHash))
+            return
+        minID, maxID = (None, None) if result.minID == -1 else (result.minID, result.maxID)
+        self.connection.execute("INSERT INTO files VALUES (?, ?, ?, ?, 1, ?, ?)", (fileName, modifiedTime, size, fileHash, minID, maxID))
+        self.connection.executemany("INSERT INTO imports VALUES (?, ?, ?, ?, ?)", ((fileName, thisImport.name, thisImport.identifier, thisImport.fileID, thisImport.dataTypeString) for thisImport in result.imports))
+        self.connection.executemany("INSERT INTO functions VALUES (?, ?, ?, ?)", ((fileName, name, identifier, isPublic) for name, identifier, isPublic in result.functions))
+        self.connection.executemany("INSERT INTO opcodes VALUES (?, ?, ?)", ((fileName, opcode, count) for opcode, count in enumerate(result.counts) if count))
+
+    def commit(self):
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def findImport(self, name: str) -> list[tuple]:
+        return self.connection.execute("SELECT fileName, dataType, importFileID FROM imports WHERE name = ? ORDER BY fileName", (name,)).fetchall()
+
+    def findFunction(self, name: str) -> list[tuple]:
+        return self.connection.execute("SELECT fileName, identifier, isPublic FROM functions WHERE name = ? ORDER BY fileName", (name,)).fetchall()
+
+    def findOpcode(self, opcode: int) -> list[tuple]:
+        return self.connection.execute("SELECT fileName, count FROM opcodes WHERE opcode = ? ORDER BY count DESC, fileName", (opcode,)).fetchall()
+
+    def findIdentifier(self, identifier: int) -> list[tuple]:
+        # ranges are stored without the type nibble, like getMinimumAndMaximumIdentifiers returns them
+        identifier &= 0x0fffffff
+        return self.connection.execute("SELECT fileName, minID, maxID FROM files WHERE minID <= ? AND maxID >= ? ORDER BY minID", (identifier, identifier)).fetchall()
+
+    def findInvalidFiles(self) -> list[tuple]:
+        return self.connection.execute("SELECT fileName FROM files WHERE NOT isValid ORDER BY fileName").fetchall()
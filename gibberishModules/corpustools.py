@@ -0,0 +1,283 @@
+import os
+import sys
+import time
+from collections.abc import Callable
+from functools import partial
+from typing import Generator
+from gibberishModules.instructions import *
+from gibberishModules.words import *
+from gibberishModules.imports import *
+from gibberishModules.parsecache import parseCache, runCachedFile
+from gibberishModules.ksmsections import *
+from gibberishModules.ksmreader import ksmFile, getMinimumAndMaximumIdentifiers
+
+#the index, the compiler and the process pool are imported by the tools that use them
+#a census or an ID scan never loads sqlite3, the *.cksm parser or the section builders
+
+def listCorpusFiles(path: str) -> list[str]:
+    return [os.path.join(root, fileName) for root, dirNames, fileNames in os.walk(path) for fileName in fileNames]
+
+#runs fileFunction over every file of a corpus, returning the results in os.walk order
+#with more than one job the files are spread over a process pool
+#with a cache, files whose contents were already seen by this tool aren't parsed again
+def runCorpus(fullFileNames: list[str], fileFunction: Callable[[str], object], jobs: int = 1, cache: parseCache | None = None) -> Generator[object]:
+    fileFunction = partial(runCachedFile, fileFunction, cache)
+    if jobs <= 1:
+        yield from map(fileFunction, fullFileNames)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    chunkSize = max(1, len(fullFileNames) // (jobs * 16))
+    with ProcessPoolExecutor(jobs) as pool:
+        yield from pool.map(fileFunction, fullFileNames, chunksize=chunkSize)
+
+def idTestFile(fullFileName: str) -> (int, int):
+    try:
+        fileWords = mapKsmFile(fullFileName)
+        thisFile = ksmFile(fileWords)
+        thisFile.require(definitionSections)
+    except:
+        return -2, -2
+    return getMinimumAndMaximumIdentifiers(thisFile.context)
+
+def parseIDTest(jobs: int = 1, cache: parseCache | None = None):
+    path = sys.argv[1]
+    idRangeList = list()
+    fullFileNames = listCorpusFiles(path)
+    for fullFileName, (minID, maxID) in zip(fullFileNames, runCorpus(fullFileNames, idTestFile, jobs, cache)):
+        fullFileName = fullFileName.removeprefix(path)
+        idRangeList.append((minID, maxID, fullFileName))
+    idRangeList.sort(key=lambda x: x[0])
+    lastMaxID = None
+    outFile = ""
+    for minID, maxID, fullFileName in idRangeList:
+        if minID == -1:
+            outFile += f"NONE - {fullFileName}\n"
+        elif minID == -2:
+            outFile += f"ERR - {fullFileName}\n"
+        else:
+            outFile += f"{hex(minID // 8)} - {fullFileName}\n"
+            lastMaxID = maxID
+    filename = "list.txt"
+    with open(filename, "w", encoding='utf-8') as file:
+        file.write(outFile)
+
+def idTest2File(fullFileName: str) -> list[importDefinition] | None:
+    try:
+        fileWords = mapKsmFile(fullFileName)
+        thisFile = ksmFile(fileWords)
+        thisFile.require(definitionSections)
+    except:
+        return None
+    return list(thisFile.context.importDefinitionDict.values())
+
+def parseIDTest2(jobs: int = 1, cache: parseCache | None = None):
+    path = sys.argv[1]
+    importList = list()
+    fullFileNames = listCorpusFiles(path)
+    for fullFileName, extList in zip(fullFileNames, runCorpus(fullFileNames, idTest2File, jobs, cache)):
+        fullFileName = fullFileName.removeprefix(path)
+        if extList is None:
+            continue
+        for thisImport in extList:
+            thisImport.foundIn = fullFileName
+        importList.extend(extList)
+    outFileA = ""
+    outFileB = ""
+    outFileC = ""
+    importNameSet = set()
+    for thisImport in importList:
+        if thisImport.name in importNameSet:
+            continue
+        importNameSet.add(thisImport.name)
+        fileIDtext = hex(thisImport.fileID)
+        fileIDtext = "0x" + ("0" * (6 - len(fileIDtext))) + fileIDtext[2:] + "\n"
+        outFileA += fileIDtext
+        outFileB += thisImport.name + "\n"
+        outFileC += thisImport.foundIn + "\n"
+    filename = "listA.txt"
+    with open(filename, "w", encoding='utf-8') as file:
+        file.write(outFileA)
+    filename = "listB.txt"
+    with open(filename, "w", encoding='utf-8') as file:
+        file.write(outFileB)
+    filename = "listC.txt"
+    with open(filename, "w", encoding='utf-8') as file:
+        file.write(outFileC)
+    
+def censusFile(fullFileName: str) -> list[int] | None:
+    try:
+        fileWords = mapKsmFile(fullFileName)
+        thisFile = ksmFile(fileWords)
+        return thisFile.census()
+    except:
+        return None
+
+def parseFindInstruction(path: str, targetInstructionID: int, jobs: int = 1, cache: parseCache | None = None):
+    outFile = ""
+    fullFileNames = listCorpusFiles(path)
+    for fullFileName, counts in zip(fullFileNames, runCorpus(fullFileNames, censusFile, jobs, cache)):
+        fullFileName = fullFileName.removeprefix(path)
+        if counts is None:
+            outFile += f"ERROR - {fullFileName}\n"
+        elif counts[targetInstructionID]:
+            outFile += f"FOUND - {fullFileName}\n"
+        print(f"{fullFileName} processed.")
+    filename = "list.txt"
+    with open(filename, "w", encoding='utf-8') as file:
+        file.write(outFile)
+
+def parseFindAllInstructions(path: str, jobs: int = 1, cache: parseCache | None = None):
+    outFile = "ERROR:\n"
+    fileNameSetList = [list() for count in range(0xa1)]
+    fullFileNames = listCorpusFiles(path)
+    for fullFileName, counts in zip(fullFileNames, runCorpus(fullFileNames, censusFile, jobs, cache)):
+        fullFileName = fullFileName.removeprefix(path)
+        if counts is None:
+            outFile += f"  - {fullFileName}\n"
+        else:
+            for instructionID, count in enumerate(counts):
+                if count:
+                    assert instructionID >= 0x00 and instructionID <= 0xa0
+                    fileNameSetList[instructionID].append(fullFileName)
+        print(f"{fullFileName} processed.")
+    for instructionID, fileNameList in enumerate(fileNameSetList):
+        outFile += f"INSTRUCTION_{hex(instructionID)}:\n"
+        for fileName in fileNameList:
+            outFile += f"  - {fileName}\n"
+    filename = "list.yaml"
+    with open(filename, "w", encoding='utf-8') as file:
+        file.write(outFile)
+
+#an indexedFile, or None if the file couldn't be decoded
+def indexFile(fullFileName: str) -> object:
+    from gibberishModules.corpusindex import indexedFile
+    try:
+        fileWords = mapKsmFile(fullFileName)
+        thisFile = ksmFile(fileWords)
+        thisFile.require(definitionSections)
+        minID, maxID = getMinimumAndMaximumIdentifiers(thisFile.context)
+        counts = thisFile.census()
+    except:
+        return None
+    functions = [(function.name, function.identifier, function.isPublic) for function in thisFile.context.functionDefinitionDict.values()]
+    return indexedFile(minID, maxID, list(thisFile.context.importDefinitionDict.values()), functions, counts)
+
+def parseIndex(path: str, databaseName: str, jobs: int = 1, cache: parseCache | None = None):
+    from gibberishModules.corpusindex import corpusIndex, getCorpusFileName
+    index = corpusIndex(databaseName)
+    changedFiles = index.findChangedFiles(path, listCorpusFiles(path))
+    fullFileNames = list(changedFiles)
+    for fullFileName, result in zip(fullFileNames, runCorpus(fullFileNames, indexFile, jobs, cache)):
+        fileName = getCorpusFileName(path, fullFileName)
+        index.updateFile(fileName, *changedFiles[fullFileName], result)
+        print(f"{fileName} indexed.")
+    index.commit()
+    index.close()
+
+#what each query takes after its type, None for queries that take nothing
+queryArguments = {"import": "<name>", "function": "<name>", "opcode": "<number>", "id": "<number>", "invalid": None}
+
+def parseQuery(databaseName: str, queryType: str, value: str | None):
+    if queryType not in queryArguments:
+        print(f"Unknown query \"{queryType}\", expected import, function, opcode, id or invalid")
+        return
+    argument = queryArguments[queryType]
+    if (argument is None) != (value is None):
+        print(f"Usage: python main.py <db> -query {queryType}{'' if argument is None else f' {argument}'}")
+        return
+    if argument == "<number>":
+        try:
+            number = int(value, 0)
+        except ValueError:
+            print(f"\"{value}\" isn't a number, expected something like 24 or 0x18")
+            return
+    
+    from gibberishModules.corpusindex import corpusIndex
+    index = corpusIndex(databaseName)
+    match queryType:
+        case "import":
+            for fileName, dataTypeString, fileID in index.findImport(value):
+                print(f"{fileName} - {dataTypeString}{'' if fileID is None else f' from {hex(fileID)}'}")
+        case "function":
+            for fileName, identifier, isPublic in index.findFunction(value):
+                print(f"{fileName} - {hex(identifier)} {'public' if isPublic else 'private'}")
+        case "opcode":
+            for fileName, count in index.findOpcode(number):
+                print(f"{fileName} - {count}")
+        case "id":
+            for fileName, minID, maxID in index.findIdentifier(number):
+                print(f"{fileName} - {hex(minID)} to {hex(maxID)}")
+        case "invalid":
+            for fileName, in index.findInvalidFiles():
+                print(fileName)
+    index.close()
+
+#decompiles a KSM *.bin and builds it again without touching the disk, then compares the result section by section
+#only 1.3.0 files can make the trip, the compiler always builds 1.3.0
+#returns a roundtripResult
+def roundtripFile(fullFileName: str) -> object:
+    from gibberishModules.cppwriter import cppWriter
+    from gibberishModules.cppheader import parseCppHeaderFile
+    from gibberishModules.cppbody import parseCppBodyFile
+    from gibberishModules.ksmreader import decompileKsmFile
+    from gibberishModules.ksmbuilder import buildKsmSections
+    from gibberishModules.roundtrip import roundtripResult, compareSection, compareWords
+    try:
+        fileWords = mapKsmFile(fullFileName)
+        start = time.perf_counter()
+        thisFile = ksmFile(fileWords)
+        if thisFile.profile.versionRaw != 0x00010300:
+            return roundtripResult("SKIPPED", len(fileWords), detail=f"version {hex(thisFile.profile.versionRaw)} can't be built")
+        headerWriter = cppWriter()
+        bodyWriter = cppWriter()
+        decompileKsmFile(thisFile, headerWriter, bodyWriter)
+        decompileSeconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        definedImports, definedVariables, identifierSlotOffset = parseCppHeaderFile(headerWriter.getText().splitlines(True))
+        sections = buildKsmSections(*parseCppBodyFile(bodyWriter.getText().splitlines(True), definedImports, definedVariables, identifierSlotOffset))
+        compileSeconds = time.perf_counter() - start
+    except Exception as exception:
+        return roundtripResult("ERROR", detail=f"{type(exception).__name__}: {exception}")
+    
+    mismatches = [compareWords("header", 0, fileWords[:11], memoryview(sections[-1].words))]
+    for sectionIndex, originalSection in zip(ksmSection, thisFile.sections):
+        startAddress = fileWords[2 + sectionIndex]
+        mismatches.append(compareSection(sectionIndex.name, startAddress, originalSection.itemCount, originalSection.words, sections[sectionIndex].itemCount, memoryview(sections[sectionIndex].words)))
+    mismatches = [mismatch for mismatch in mismatches if mismatch is not None]
+    return roundtripResult("MISMATCH" if mismatches else "OK", len(fileWords), decompileSeconds, compileSeconds, mismatches)
+
+def parseRoundtrip(path: str, jobs: int = 1):
+    outFile = ""
+    statusCounts = {status: 0 for status in ("OK", "MISMATCH", "SKIPPED", "ERROR")}
+    wordCount = 0
+    decompileSeconds = 0.0
+    compileSeconds = 0.0
+    start = time.perf_counter()
+    fullFileNames = listCorpusFiles(path)
+    # never cached, every run has to actually go through the current decompiler and compiler
+    for fullFileName, result in zip(fullFileNames, runCorpus(fullFileNames, roundtripFile, jobs)):
+        fullFileName = fullFileName.removeprefix(path)
+        statusCounts[result.status] += 1
+        if result.status in ("OK", "MISMATCH"):
+            wordCount += result.wordCount
+            decompileSeconds += result.decompileSeconds
+            compileSeconds += result.compileSeconds
+        outFile += f"{result.status} - {fullFileName} - {result.decompileSeconds * 1000:.1f} ms decompile, {result.compileSeconds * 1000:.1f} ms compile\n"
+        if result.detail:
+            outFile += f"  {result.detail}\n"
+        for mismatch in result.mismatches:
+            expected = "none" if mismatch.expected is None else hex(mismatch.expected)
+            actual = "none" if mismatch.actual is None else hex(mismatch.actual)
+            outFile += f"  {mismatch.sectionName} at word {hex(mismatch.offset)}: expected {expected}, got {actual}, {mismatch.count} differing words\n"
+        print(f"{fullFileName} {result.status}.")
+    wallSeconds = time.perf_counter() - start
+    
+    summary = ", ".join(f"{count} {status}" for status, count in statusCounts.items())
+    summary += f"\n{wordCount} words in {wallSeconds:.2f} s, {wordCount / wallSeconds if wallSeconds else 0:,.0f} words/s"
+    summary += f"\n{decompileSeconds:.2f} s decompiling, {compileSeconds:.2f} s compiling over {jobs} jobs\n"
+    outFile += summary
+    print(summary, end="")
+    filename = "roundtrip.txt"
+    with open(filename, "w", encoding='utf-8') as file:
+        file.write(outFile)
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from collections import OrderedDict
 from copy import copy
+from time import perf_counter
 from gibberishModules.functionDefinitions import functionDefinition
 from gibberishModules.terms import iterableFile
 from gibberishModules.instructions import *
@@ -15,7 +16,7 @@ class compilationData:
     usedIdentifierSlots: list[variable | functionDefinition | label]
     usedImportSlots: list
     localDefinedVariablesTree: list[dict[str, variable]]
-    bracesTree: list[parentInstruction]
+    bracesTree: bracesStack
     functionTree: list[functionDefinition]
     constDict: dict
     importCount: int
@@ -27,6 +28,7 @@ class compilationData:
     definedGlobalArrays: OrderedDict[str, arrayDefinition]
     localDefinedArraysTree: list[dict[str, arrayDefinition]]
     localDefinedGlobalFlagsTree : list[dict[str, variable]]
+    profiler: object = None
     
     def handleVariable(self, newVariable: variable, treeIndex: int = -1) -> variable:
         if (match := self.definedVariables.get(newVariable.name, None)) is not None:
@@ -104,7 +106,7 @@ class compilationData:
         while True:
             if file.term in exitingCharacters:
                 break
-            if file.line == '' and ';' in exitingCharacters:
+            if file.isLineEmpty() and ';' in exitingCharacters:
                 break
             newValue = self.readAnyValue()
             match type(newValue).__name__:
@@ -158,15 +160,17 @@ class compilationData:
             self.getAccumulator()
             return matchedFunction
         
-        if file.line and file.line[0] == '(':
+        if file.peekCharacter() == '(':
             self.getAccumulator()
             function = functionDefinition(name, None, None, None, None, None, None, None, None, None, None, None, None, None, None)
             self.definedFunctions[name] = function
             return function
         return None
 
-def parseCppBodyFile(fileLines: list[str], definedImports: dict[str, importDefinition], definedVariables: dict, identifierSlotOffset: int):
-    thisData = compilationData(list(), OrderedDict(), list(), list(), list(), list(), list(), dict(), 0, definedImports, definedVariables, identifierSlotOffset, list(), False, dict(), list(), list())
+#buildCache is optional, with one top-level functions that didn't change since the last build are taken from it instead of being parsed
+#profiler is optional too, with one every statement's identifyInstructionFromCpp and readFromCpp are timed by the class they ended up as, and every expression operand by its own
+def parseCppBodyFile(fileLines: list[str], definedImports: dict[str, importDefinition], definedVariables: dict, identifierSlotOffset: int, buildCache: object = None, profiler: object = None):
+    thisData = compilationData(list(), OrderedDict(), list(), list(), list(), bracesStack(), list(), dict(), 0, definedImports, definedVariables, identifierSlotOffset, list(), False, dict(), list(), list(), profiler)
     global file
     file = iterableFile(fileLines)
     tobreak = False
@@ -176,7 +180,7 @@ def parseCppBodyFile(fileLines: list[str], definedImports: dict[str, importDefin
         
         file.formatCurrentLine()
         
-        while file.line == '' or file.line[0] == ';':
+        while file.isLineEmpty() or file.peekCharacter() == ';':
             file.allowGetNextLine(True, True)
             if file.line is None: 
                 tobreak = True
@@ -185,9 +189,23 @@ def parseCppBodyFile(fileLines: list[str], definedImports: dict[str, importDefin
         if tobreak:
             break
         
-        newInstruction = identifyInstructionFromCpp(file, thisData)
-        newInstruction.readFromCpp(file, thisData)
+        if buildCache is not None and not thisData.bracesTree and buildCache.startFunction(file, thisData):
+            continue
+        
+        statementLine = file.index
+        if profiler is None:
+            newInstruction = identifyInstructionFromCpp(file, thisData)
+            newInstruction.readFromCpp(file, thisData)
+        else:
+            start = perf_counter()
+            newInstruction = identifyInstructionFromCpp(file, thisData)
+            identified = perf_counter()
+            newInstruction.readFromCpp(file, thisData)
+            profiler.record("identifyInstructionFromCpp", newInstruction, identified - start)
+            profiler.record("readFromCpp", newInstruction, perf_counter() - identified)
         thisData.instructionList.append(newInstruction)
+        if buildCache is not None and not thisData.bracesTree:
+            buildCache.endFunction(file, thisData, newInstruction, statementLine)
     
     thisData.instructionList.append(endFileInstruction())
     
@@ -1,41 +1,40 @@
-from gibberishModules.imports import importDefinition, importDefinitionDictGetAllValues
-from gibberishModules.instructions import importedInstruction, variableInstruction
-from gibberishModules.variables import variable, variableDictGetAllValues, variableScope, writeVariableValue, isVariableScope
-from gibberishModules.terms import iterableFile
+from gibberishModules.imports import importDefinition
+from gibberishModules.instructions import importedInstruction, variableInstruction, decodeContext
+from gibberishModules.variables import variable, variableScope, writeVariableValue, isVariableScope
+from gibberishModules.cppwriter import cppWriter
 
-def writeCppHeaderFile(versionRaw: int, minID: int) -> str:
-    outstr = ""
+def writeCppHeaderFile(context: decodeContext, minID: int, writer: cppWriter):
     indentLevel = 0
     definedGameFlags = set()
-    imports = list(importDefinitionDictGetAllValues())[::-1]
+    imports = list(context.importDefinitionDict.values())[::-1]
     if minID == -1:
         minID = 0x00100000
-    outstr += f"#offset {hex(minID)};\n"
-    if versionRaw < 0x00010302:
+    writer.write(f"#offset {hex(minID)};\n")
+    if context.profile.versionRaw < 0x00010302:
         for thisImport in imports:
-            thisInstruction = importedInstruction(thisImport.identifier, False)
+            thisInstruction = importedInstruction(thisImport.identifier, False, context)
             #outstr += f"#import {thisImport.dataTypeString} {thisImport.name} from {hex(thisImport.fileID)} {{{hex(thisImport.unknown0)} vs {hex(thisImport.identifier)}}};\n"
-            outstr += f"#import {thisImport.dataTypeString} {thisImport.name} from {hex(thisImport.fileID)} {{{hex(thisImport.unknown0)}}};\n"
+            writer.write(f"#import {thisImport.dataTypeString} {thisImport.name} from {hex(thisImport.fileID)} {{{hex(thisImport.unknown0)}}};\n")
     else:
         for thisImport in imports:
-            thisInstruction = importedInstruction(thisImport.identifier, False)
-            outstr += f"#import {thisImport.dataTypeString} {thisImport.name};\n"
+            thisInstruction = importedInstruction(thisImport.identifier, False, context)
+            writer.write(f"#import {thisImport.dataTypeString} {thisImport.name};\n")
     
-    variables = list(variableDictGetAllValues())[::-1]
+    variables = list(context.variableDict.values())[::-1]
     for thisVariable in variables:
         
         if thisVariable.scope != variableScope.static:
             continue
         
-        thisInstruction = variableInstruction(thisVariable.identifier, False)
+        thisInstruction = variableInstruction(thisVariable.identifier, False, context)
         if thisVariable.dataTypeString == "user":
             if thisVariable.name in definedGameFlags:
                 continue
             definedGameFlags.add(thisVariable.name)
-            outstr += f"{thisInstruction.writeToCpp(indentLevel)[0]};\n"
+            writer.write(f"{thisInstruction.writeToCpp(indentLevel)[0]};\n")
             continue
         if thisVariable.dataTypeString in ("float", "int", "string", "bool"):
-            outstr += f"{thisInstruction.writeToCpp(indentLevel)[0]} = {writeVariableValue(thisVariable.value, thisVariable.dataTypeString)};\n"
+            writer.write(f"{thisInstruction.writeToCpp(indentLevel)[0]} = {writeVariableValue(thisVariable.value, thisVariable.dataTypeString)};\n")
             continue
         
         if thisVariable.dataTypeString == "func":
@@ -43,10 +42,10 @@ def writeCppHeaderFile(versionRaw: int, minID: int) -> str:
             continue
         
         assert False, f"Unhandled data type: {thisVariable.dataTypeString}"
-    
-    return outstr
 
 def parseCppHeaderFile(fileLines: list[str]) -> (dict[importDefinition], dict[variable], int):
+    # the *.cksm parser is only loaded when building, decompiling only ever writes headers
+    from gibberishModules.terms import iterableFile
     definedImports = dict()
     definedVariables = dict()
     identifierSlotOffset = 0x00100000
@@ -57,7 +56,7 @@ def parseCppHeaderFile(fileLines: list[str]) -> (dict[importDefinition], dict[va
         
         file.formatCurrentLine()
         
-        while file.line == '' or file.line[0] == ';':
+        while file.isLineEmpty() or file.peekCharacter() == ';':
             file.allowGetNextLine(True, True)
             if file.line is None: break
             file.formatCurrentLine()
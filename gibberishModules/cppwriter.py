@@ -0,0 +1,32 @@
+from typing import TextIO
+
+#collects the text of a *.cksm/*.hksm file
+#with a file it writes every fragment straight through, otherwise fragments are kept and joined once by getText()
+class cppWriter:
+    indentLevel = 0
+
+    def __init__(self, file: TextIO | None = None):
+        self.file = file
+        self.fragments = list()
+
+    def write(self, text: str):
+        if self.file is None:
+            self.fragments.append(text)
+        else:
+            self.file.write(text)
+
+    def writeIndented(self, text: str):
+        # only whole lines get indented, every line of a multi-line fragment gets the current indent
+        if not self.indentLevel or not text.endswith('\n'):
+            self.write(text)
+            return
+        indent = '\t' * self.indentLevel
+        self.write(indent)
+        if '\n' in text[:-1]:
+            self.write(text[:-1].replace('\n', f"\n{indent}"))
+            self.write('\n')
+        else:
+            self.write(text)
+
+    def getText(self) -> str:
+        return "".join(self.fragments)
@@ -0,0 +1,173 @@
+import json
+import os
+import socket
+import socketserver
+import stat
+from collections import OrderedDict
+from copy import copy
+from gibberishModules.words import mapKsmFile
+from gibberishModules.cppwriter import cppWriter
+from gibberishModules.cppheader import parseCppHeaderFile
+from gibberishModules.ksmreader import ksmFile, decompileFile, decompileKsmFile, decompileKsmFunction
+from gibberishModules.ksmbuilder import compileFile
+
+#how many parsed *.hksm files are kept, the least recently used one is dropped past that
+maxCachedHeaders = 32
+
+#parsed *.hksm files by path, so building against the same header again skips parseCppHeaderFile
+#the file is still read every time and only a header with the exact same text is reused
+class headerCache:
+    def __init__(self, maxEntries: int = maxCachedHeaders):
+        self.maxEntries = maxEntries
+        self.entries = OrderedDict()
+
+    def get(self, headerFileName: str) -> tuple:
+        headerText = open(headerFileName, "r", encoding = "utf-8").readlines()
+        key = os.path.abspath(headerFileName)
+        entry = self.entries.get(key)
+        if entry is None or entry[0] != headerText:
+            entry = self.entries[key] = (headerText, *parseCppHeaderFile(headerText))
+            if len(self.entries) > self.maxEntries:
+                self.entries.popitem(last=False)
+        self.entries.move_to_end(key)
+        headerText, definedImports, definedVariables, identifierSlotOffset = entry
+        # building changes the counts and identifiers of the definitions, every build gets its own copies of them
+        # none of their fields hold anything mutable, so copying each one is enough
+        return headerText, {name: copy(definition) for name, definition in definedImports.items()}, {name: copy(definition) for name, definition in definedVariables.items()}, identifierSlotOffset
+
+def getArgument(request: dict, name: str) -> object:
+    if name not in request:
+        raise ValueError(f"Missing \"{name}\"")
+    return request[name]
+
+#everything the daemon keeps between requests, and what each command does
+#commands get the request and return what goes into "result", anything they raise is sent back as the error
+#the paths they send back are absolute, the client's working directory isn't the daemon's
+class daemonState:
+    def __init__(self):
+        self.headers = headerCache()
+        self.running = True
+        self.commands = {
+            "ping": self.ping,
+            "shutdown": self.shutdown,
+            "decompile": self.decompile,
+            "decompileFunction": self.decompileFunction,
+            "compile": self.compile
+        }
+
+    def ping(self, request: dict) -> dict:
+        return {"pid": os.getpid(), "cachedHeaders": len(self.headers.entries)}
+
+    def shutdown(self, request: dict) -> dict:
+        self.running = False
+        return dict()
+
+    #writes the *.cksm and *.hksm like main.py does, or with "write": false sends their text back instead
+    #without an outputDirectory they go next to the file, not into the daemon's working directory, even when the summary names them
+    def decompile(self, request: dict) -> dict:
+        fileName = getArgument(request, "file")
+        if request.get("write", True):
+            outputDirectory = request.get("outputDirectory")
+            if outputDirectory is None:
+                outputDirectory = os.path.dirname(os.path.abspath(fileName))
+            bodyFileName, headerFileName = decompileFile(fileName, outputDirectory)
+            return {"body": os.path.abspath(bodyFileName), "header": os.path.abspath(headerFileName)}
+        headerWriter = cppWriter()
+        bodyWriter = cppWriter()
+        decompileKsmFile(ksmFile(mapKsmFile(fileName)), headerWriter, bodyWriter)
+        return {"headerText": headerWriter.getText(), "bodyText": bodyWriter.getText()}
+
+    def decompileFunction(self, request: dict) -> dict:
+        writer = cppWriter()
+        decompileKsmFunction(ksmFile(mapKsmFile(getArgument(request, "file"))), getArgument(request, "function"), writer)
+        return {"bodyText": writer.getText()}
+
+    def compile(self, request: dict) -> dict:
+        fileName = getArgument(request, "file")
+        header = self.headers.get(f"{fileName.removesuffix(".cksm")}.hksm")
+        outputFileName = compileFile(fileName, request.get("outputDirectory"), bool(request.get("incremental", False)), header=header)
+        return {"output": os.path.abspath(outputFileName)}
+
+    def answer(self, line: bytes) -> dict:
+        requestID = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Requests have to be JSON objects")
+            requestID = request.get("id")
+            command = self.commands.get(request.get("command"))
+            if command is None:
+                raise ValueError(f"Unknown command \"{request.get("command")}\"")
+            response = {"ok": True, "result": command(request)}
+        except Exception as exception:
+            # a broken file or request only fails that request, the daemon keeps going
+            response = {"ok": False, "error": {"type": type(exception).__name__, "message": str(exception)}}
+        if requestID is not None:
+            response["id"] = requestID
+        return response
+
+#one JSON request per line in, one JSON response per line out, in the same order
+#connections are served one at a time, a client can send as many requests as it wants before closing its own
+class requestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        state = self.server.state
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            self.wfile.write(json.dumps(state.answer(line)).encode("utf-8") + b"\n")
+            self.wfile.flush()
+            if not state.running:
+                return
+
+def isSocketFile(socketPath: str) -> bool:
+    try:
+        return stat.S_ISSOCK(os.stat(socketPath).st_mode)
+    except FileNotFoundError:
+        return False
+
+def isDaemonListening(socketPath: str) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(socketPath)
+        except OSError:
+            return False
+    return True
+
+#serves requests on socketPath until a "shutdown" request or Ctrl+C
+def runDaemon(socketPath: str):
+    if not hasattr(socket, "AF_UNIX"):
+        raise OSError("The daemon needs Unix sockets, which this platform doesn't have")
+    if os.path.exists(socketPath):
+        if not isSocketFile(socketPath):
+            raise FileExistsError(f"{socketPath} exists and isn't a socket")
+        if isDaemonListening(socketPath):
+            raise FileExistsError(f"A daemon is already listening on {socketPath}")
+        # left behind by a daemon that didn't get to clean up
+        os.remove(socketPath)
+
+    state = daemonState()
+    with socketserver.UnixStreamServer(socketPath, requestHandler) as server:
+        server.state = state
+        print(f"Listening on {socketPath}")
+        try:
+            while state.running:
+                server.handle_request()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if isSocketFile(socketPath):
+                os.remove(socketPath)
+
+#sends one request to a daemon and returns its response
+#paths are made absolute first, since the daemon resolves them against its own working directory
+def sendRequest(socketPath: str, request: dict) -> dict:
+    request = dict(request)
+    for name in ("file", "outputDirectory"):
+        if request.get(name) is not None:
+            request[name] = os.path.abspath(request[name])
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socketPath)
+        with client.makefile("rwb") as stream:
+            stream.write(json.dumps(request).encode("utf-8") + b"\n")
+            stream.flush()
+            return json.loads(stream.readline())
@@ -6,13 +6,13 @@ from gibberishModules.variables import variable, readVariableFromKsm, variableSc
 
 labelAliasSuffixes = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
 
-@dataclass
+@dataclass(slots=True)
 class label:
     identifier: int
     address: int
     alias: str
 
-@dataclass
+@dataclass(slots=True)
 class functionDefinition:
     name: str
     identifier: int
@@ -32,90 +32,84 @@ class functionDefinition:
     localArraysByName: dict[str, arrayDefinition] = field(default_factory=dict)
     localVariableTypes: list[str] = field(default_factory=list)
 
-functionDefinitionDict = dict()
+def readTempVarFlags(cursor: wordCursor) -> list[bool]:
+    tempVarFlagsRaw = cursor.readWord()
+    return [bool((tempVarFlagsRaw >> i) & 1) for i in range(32)]
 
-def readFunctionDefinitionFromKsm(wordsEnumerated: enumerate[int], currentWord: rawWord) -> (functionDefinition, int):
+# 1.3.2 doesn't store the flags, every tempVar is available
+def readTempVarFlagsAlt(cursor: wordCursor) -> list[bool]:
+    return [True] * 32
+
+# only the data types are kept, the locals themselves get aliases
+def readLocalVariables(cursor: wordCursor, localVariableCount: int) -> (None, list[str]):
+    localVariableTypes = list()
+    for _ in range(localVariableCount):
+        cursor.skip(2)
+        localVariableTypes.append(variableDataTypesIntToString(cursor.readWord()))
+        cursor.skip()
+    return None, localVariableTypes
+
+# 1.3.2 stores full variable definitions for its locals
+def readLocalVariablesAlt(cursor: wordCursor, localVariableCount: int) -> (dict[int, variable], list[str]):
+    definedLocals = dict()
+    for _ in range(localVariableCount):
+        newLocal, newLocalIdentifier = readVariableFromKsm(cursor, variableScope.localVar)
+        definedLocals[newLocalIdentifier] = newLocal
+    return definedLocals, list()
+
+def readFunctionDefinitionFromKsm(cursor: wordCursor, profile: object) -> (functionDefinition, int):
     # padding
-    getNextWord(wordsEnumerated, currentWord)
-    assert currentWord.value == 0xffffffff, hex(currentWord.value)
+    word = cursor.readWord()
+    assert word == 0xffffffff, hex(word)
     
     # function id
-    getNextWord(wordsEnumerated, currentWord)
-    functionID = currentWord.value
+    functionID = cursor.readWord()
     
     # whether the function can be called by other scripts
-    getNextWord(wordsEnumerated, currentWord)
-    isPublic = bool(currentWord.value)
+    isPublic = bool(cursor.readWord())
     
-    if versionRaw < 0x00010302:
-        # which tempVars are present
-        getNextWord(wordsEnumerated, currentWord)
-        tempVarFlagsRaw = currentWord.value
-        tempVarFlags = [bool((tempVarFlagsRaw >> i) & 1) for i in range(32)]
-        del tempVarFlagsRaw
-    else:
-        tempVarFlags = [True] * 32
+    # which tempVars are present
+    tempVarFlags = profile.readTempVarFlags(cursor)
     
-    # code offset - discard
-    getNextWord(wordsEnumerated, currentWord)
-    # code end - discard
-    getNextWord(wordsEnumerated, currentWord)
+    # where the function's code starts and ends in the code section, in words
+    codeOffset = cursor.readWord()
+    codeEnd = cursor.readWord()
     
     # the variable that handles storing any values returned by any called instructions run in the function
     # ideally you should avoid accessing this variable directly
-    getNextWord(wordsEnumerated, currentWord)
-    accumulatorID = currentWord.value
+    accumulatorID = cursor.readWord()
     
     # special label???
-    getNextWord(wordsEnumerated, currentWord)
-    #assert currentWord.value == 0x00000000
-    specialLabelID = currentWord.value
+    specialLabelID = cursor.readWord()
+    #assert specialLabelID == 0x00000000
     
     # name
-    name = readStringFromKsm(wordsEnumerated, currentWord)
+    name = readStringFromKsm(cursor)
     
-    # local variables - discard
-    getNextWord(wordsEnumerated, currentWord)
-    localVariableCount = currentWord.value
-    localVariableTypes = list()
-    if versionRaw < 0x00010302:
-        definedLocals = None
-        for _ in range(localVariableCount):
-            getNextWord(wordsEnumerated, currentWord)
-            getNextWord(wordsEnumerated, currentWord)
-            getNextWord(wordsEnumerated, currentWord)
-            localVariableTypes.append(variableDataTypesIntToString(currentWord.value))
-            getNextWord(wordsEnumerated, currentWord)
-    else:
-        definedLocals = dict()
-        for _ in range(localVariableCount):
-            newLocal, newLocalIdentifier = readVariableFromKsm(wordsEnumerated, currentWord, variableScope.localVar)
-            definedLocals[newLocalIdentifier] = newLocal
+    # local variables
+    localVariableCount = cursor.readWord()
+    definedLocals, localVariableTypes = profile.readLocalVariables(cursor, localVariableCount)
     
     # local arrays
-    getNextWord(wordsEnumerated, currentWord)
-    localArrayCount = currentWord.value
+    localArrayCount = cursor.readWord()
     localArraysByAddress = dict()
     localArraysByID = dict()
     localArraysByName = dict()
     for i in range(localArrayCount):
-        newDefinition, address, identifier = readArrayDefinitionFromKsm(wordsEnumerated, currentWord)
+        newDefinition, address, identifier = readArrayDefinitionFromKsm(cursor)
         localArraysByAddress[address] = newDefinition
         localArraysByID[identifier] = newDefinition
         localArraysByName[newDefinition.name] = newDefinition
     
     # labels
-    getNextWord(wordsEnumerated, currentWord)
-    labelCount = currentWord.value
+    labelCount = cursor.readWord()
     labelsByID = dict()
     labelsByAddress = dict()
     for labelIndex in range(labelCount):
-        getNextWord(wordsEnumerated, currentWord)
-        assert currentWord.value == 0x00000000, hex(currentWord.value)
-        getNextWord(wordsEnumerated, currentWord)
-        labelID = currentWord.value
-        getNextWord(wordsEnumerated, currentWord)
-        labelAddress = currentWord.value
+        word = cursor.readWord()
+        assert word == 0x00000000, hex(word)
+        labelID = cursor.readWord()
+        labelAddress = cursor.readWord()
         labelAlias = f"label{labelAliasSuffixes[labelCount - labelIndex - 1]}"
         theLabel = label(labelID, labelAddress, labelAlias)
         labelsByID[labelID] = theLabel
@@ -126,33 +120,24 @@ def readFunctionDefinitionFromKsm(wordsEnumerated: enumerate[int], currentWord:
         specialLabel = labelsByID[specialLabelID]
     else:
         specialLabel = None
-    return functionDefinition(name, functionID, isPublic, tempVarFlags, accumulatorID, None, labelsByAddress, labelsByID, localArraysByAddress, localArraysByID, definedLocals, {accumulatorID}, specialLabel, None, None, localArraysByName, localVariableTypes), functionID
+    return functionDefinition(name, functionID, isPublic, tempVarFlags, accumulatorID, None, labelsByAddress, labelsByID, localArraysByAddress, localArraysByID, definedLocals, {accumulatorID}, specialLabel, codeOffset, codeEnd, localArraysByName, localVariableTypes), functionID
 
-def parseFunctionDefinitions(section: object, versionRawInput: int):
-    global versionRaw
-    versionRaw = versionRawInput
-    currentWord = rawWord(0, 0)
-    wordsEnumerated = enumerate(section.words)
-    global functionDefinitionDict
+def parseFunctionDefinitions(section: object, profile: object) -> dict[int, functionDefinition]:
+    cursor = wordCursor(section.words)
     functionDefinitionDict = dict()
     for index in range(section.itemCount):
-        newDefinition, functionID = readFunctionDefinitionFromKsm(wordsEnumerated, currentWord)
+        newDefinition, functionID = readFunctionDefinitionFromKsm(cursor, profile)
         functionDefinitionDict[functionID] = newDefinition
+    return functionDefinitionDict
 
-def functionDefinitionDictGet(key: int) -> functionDefinition | None:
-    return functionDefinitionDict.get(key, None)
-
-def functionDefinitionDictGetAllKeys() -> list[int]:
-    return functionDefinitionDict.keys()
-
-def getAllLabelAndArrayIDs() -> list[int]:
+def getAllLabelAndArrayIDs(functionDefinitionDict: dict[int, functionDefinition]) -> list[int]:
     identifierList = list()
     for functionDefinition in functionDefinitionDict.values():
         identifierList.extend(functionDefinition.labelsByID)
         identifierList.extend(functionDefinition.localArraysByID)
     return identifierList
 
-def getMinimumAndMaxmimumFunctionIdentifiers() -> (int, int):
+def getMinimumAndMaxmimumFunctionIdentifiers(functionDefinitionDict: dict[int, functionDefinition]) -> (int, int):
     identifierList = [identifier & 0x0fffffff for identifier in functionDefinitionDict.keys()]
     if not identifierList:
         return 0xffffffff, 0x00000000
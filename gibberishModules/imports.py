@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from gibberishModules.words import *
 from gibberishModules.strings import *
 
-@dataclass
+@dataclass(slots=True)
 class importDefinition:
     name: str
     identifier: int
@@ -12,8 +12,6 @@ class importDefinition:
     unknown0: int
     foundIn: str = None
 
-importDefinitionDict = dict()
-
 dataTypes = {
     0x02: "int",
     0x04: "function",
@@ -23,67 +21,69 @@ dataTypes = {
 
 dataTypesReverse = {value: key for key, value in dataTypes.items()}
 
-def readImportDefinitionsFromKsm(wordsEnumerated: enumerate[int], currentWord: rawWord) -> importDefinition:
+def readImportDefinitionsFromKsm(cursor: wordCursor) -> importDefinition:
     # padding
-    getNextWord(wordsEnumerated, currentWord)
-    assert currentWord.value == 0xffffffff, hex(currentWord.value)
+    word = cursor.readWord()
+    assert word == 0xffffffff, hex(word)
     
-    getNextWord(wordsEnumerated, currentWord)
-    if versionRaw < 0x00010302:
-        # these are both shorts
-        # a counter of how many times this import is used in the file. Purpose not clear
-        timesUsed = currentWord.value & 0xffff
-        # an id that somehow indicates what file this is imported from. Consistent between different files, but not sure how it is determined
-        fileID = currentWord.value >> 16
-    else:
-        # a counter of how many times this import is used in the file. Purpose not clear
-        timesUsed = currentWord.value
-        # obsolete
-        fileID = None
+    # these are both shorts
+    word = cursor.readWord()
+    # a counter of how many times this import is used in the file. Purpose not clear
+    timesUsed = word & 0xffff
+    # an id that somehow indicates what file this is imported from. Consistent between different files, but not sure how it is determined
+    fileID = word >> 16
     
     # dataType
-    getNextWord(wordsEnumerated, currentWord)
-    dataTypeString = dataTypes[currentWord.value]
+    dataTypeString = dataTypes[cursor.readWord()]
     
     # unused?
-    if versionRaw < 0x00010302:
-        getNextWord(wordsEnumerated, currentWord)
-        unknown0 = currentWord.value
-    else:
-        unknown0 = None
+    unknown0 = cursor.readWord()
     
     # importID
-    getNextWord(wordsEnumerated, currentWord)
-    importID = currentWord.value
+    importID = cursor.readWord()
     
     # unused?
-    getNextWord(wordsEnumerated, currentWord)
-    assert currentWord.value == 0x00000000, hex(currentWord.value)
-    if versionRaw < 0x00010302:
-        getNextWord(wordsEnumerated, currentWord)
-        assert currentWord.value == 0x00000000, hex(currentWord.value)
+    word = cursor.readWord()
+    assert word == 0x00000000, hex(word)
+    word = cursor.readWord()
+    assert word == 0x00000000, hex(word)
     
     # name
-    name = readStringFromKsm(wordsEnumerated, currentWord)
+    name = readStringFromKsm(cursor)
         
     return importDefinition(name, importID, timesUsed, fileID, dataTypeString, unknown0), importID
 
-def parseImportDefinitions(section: object, versionRawInput: int):
-    global versionRaw
-    versionRaw = versionRawInput
-    currentWord = rawWord(0, 0)
-    wordsEnumerated = enumerate(section.words)
-    global importDefinitionDict
+# 1.3.2 dropped the file id and both unknown words
+def readImportDefinitionsFromKsmAlt(cursor: wordCursor) -> importDefinition:
+    # padding
+    word = cursor.readWord()
+    assert word == 0xffffffff, hex(word)
+    
+    # a counter of how many times this import is used in the file. Purpose not clear
+    timesUsed = cursor.readWord()
+    
+    # dataType
+    dataTypeString = dataTypes[cursor.readWord()]
+    
+    # importID
+    importID = cursor.readWord()
+    
+    # unused?
+    word = cursor.readWord()
+    assert word == 0x00000000, hex(word)
+    
+    # name
+    name = readStringFromKsm(cursor)
+        
+    return importDefinition(name, importID, timesUsed, None, dataTypeString, None), importID
+
+def parseImportDefinitions(section: object, profile: object) -> dict[int, importDefinition]:
+    cursor = wordCursor(section.words)
     importDefinitionDict = dict()
     for index in range(section.itemCount):
-        newDefinition, importID = readImportDefinitionsFromKsm(wordsEnumerated, currentWord)
+        newDefinition, importID = profile.readImportDefinition(cursor)
         importDefinitionDict[importID] = newDefinition
-
-def importDefinitionDictGet(key: int) -> importDefinition | None:
-    return importDefinitionDict.get(key, None)
-
-def importDefinitionDictGetAllValues() -> list[importDefinition]:
-    return importDefinitionDict.values()
+    return importDefinitionDict
 
 def importDataTypesStringToInt(key: str) -> int | None:
     return dataTypesReverse.get(key, None)
\ No newline at end of file
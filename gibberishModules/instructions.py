@@ -1,6 +1,9 @@
 from collections.abc import Callable
+from dataclasses import dataclass, field
+from functools import cached_property
 from typing import Generator
 from struct import pack, unpack
+from time import perf_counter
 from gibberishModules.words import *
 from gibberishModules.functionDefinitions import *
 from gibberishModules.imports import *
@@ -9,20 +12,37 @@ from gibberishModules.arrays import *
 
 indentLevel = 0
 indentOffsetNextLine = 0
-currentFunctionTree = list()
-variableIDsDefinedInCpp = set()
+#*.cksm files are always built as 1.3.0, decoding gets this from the file's profile instead
 maxInstructionID = 0xa0
-def setMaxInstructionID(value: int):
-    global maxInstructionID
-    maxInstructionID = value
+
+#a jump operand of the code section, written as 0 and filled in once the section is complete
+#the instruction opening a block adds one for each jump it has, whatever comes next in the block sets its target
+#the whole section is patched from this table in one go, see resolveRelocations
+@dataclass
+class relocation:
+    position: int
+    target: int | None = None
+
+def addRelocation(section: object) -> relocation:
+    thisRelocation = relocation(len(section.words))
+    section.relocations.append(thisRelocation)
+    section.words.append(0)
+    return thisRelocation
+
+def resolveRelocations(section: object):
+    for thisRelocation in section.relocations:
+        assert thisRelocation.target is not None and thisRelocation.target <= len(section.words), hex(thisRelocation.position)
+        section.words[thisRelocation.position] = thisRelocation.target
 
 #[parent]
 #the superclass all instructions inherit from
+#instructions that make up expressions are slotted, there can be millions of them in a large script
+#statements keep a __dict__ for whatever they read, see buildCache.encodeInstructions
 class parentInstruction:
-    instructionID = 0x0
-    disableExpression = False
+    __slots__ = ("instructionID", "disableExpression")
     
-    def __init__(self, instructionID: int | None = None, disableExpression: bool = False):
+    # context is only used by instructions that stand for an identifier, see decodeContext
+    def __init__(self, instructionID: int | None = None, disableExpression: bool = False, context: object = None):
         if instructionID is None:
             self.instructionID = invertedInstructionDict[type(self)]
         else:
@@ -30,10 +50,15 @@ class parentInstruction:
         
         self.disableExpression = disableExpression
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         # it's fine for an instruction to not have this defined, just do nothing
         pass
     
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        # words that aren't opcodes, and instructions without operands, don't take any more words
+        pass
+    
     def writeToCpp(self, indentLevel: int) -> (str, int, int):
         raise Exception(f"Instruction {hex(self.instructionID)} ({self.__name__}) missing writeToCpp definition.")
         
@@ -45,10 +70,6 @@ class parentInstruction:
         finalIdentifier = self.instructionID | (self.disableExpression << 8)
         section.words.append(finalIdentifier)
     
-    def writeToKsmAfter(self, section: object):
-        # it's fine for an instruction to not have this defined, just do nothing
-        pass
-
 #this is not an instruction, but rather a list of instructions on a single line i.e.:
 #
 #int x = 5 + 4;
@@ -57,21 +78,23 @@ class parentInstruction:
 #
 #...just think of what expressions are in maths... basically that :)
 class expression:
+    __slots__ = ("instructions",)
+    
     def writeToCpp(self, indentLevel: int) -> (str, int, int):
         cppText = " ".join(instruction.writeToCpp(indentLevel)[0].removesuffix(';\n') for instruction in self.instructions)
         return cppText, indentLevel, 0
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         self.instructions = []
         while True:
             try:
-                getNextWord(wordsEnumerated, currentWord)
-            except StopIteration:
+                word = cursor.readWord()
+            except IndexError:
                 break
-            newInstruction = matchInstruction(currentWord.value, True)(currentWord.value, False)
+            newInstruction = cursor.context.newInstruction(word)
             if isinstance(newInstruction, closeExpressionInstruction) or isinstance(newInstruction, closeCallArgumentsInstruction):
                 break
-            newInstruction.readFromKsm(wordsEnumerated, currentWord)
+            newInstruction.readFromKsm(cursor)
             self.instructions.append(newInstruction)
     
     def readFromCpp(self, file: object, thisData: object, exitingCharacters: str | list[str], enforceUnsignedInt: bool = False) -> str:
@@ -109,10 +132,14 @@ class expression:
         
         self.instructions = list()
         depth = 0
+        # --profile times every operand by the class it was read as, nested calls include the operands read inside them
+        profiler = thisData.profiler
         while not (
                 (file.term is None and (';' in exitingCharacters or '{' in exitingCharacters)) or
                 (file.term in exitingCharacters and depth <= 0)
                 ):
+            if profiler is not None:
+                start = perf_counter()
             if type(newInstruction := identifyInstructionFromCpp(file, thisData, True)) == callInstruction:
                 newInstruction.readFromCpp(file, thisData, True)
             else:
@@ -122,6 +149,8 @@ class expression:
                     depth -= 1
                 newInstruction = readAnyValue()
                 file.getNextTerm()
+            if profiler is not None:
+                profiler.record("expression operand", newInstruction, perf_counter() - start)
             self.instructions.append(newInstruction)
         if file.term is None: file.term = ';'
         return file.term
@@ -134,7 +163,7 @@ class expression:
 #N/A
 #this is to catch any unknown instructions
 class unknownInstruction(parentInstruction):
-    def __init__(self, instructionID: int | None = None, disableExpression: bool = False):
+    def __init__(self, instructionID: int | None = None, disableExpression: bool = False, context: object = None):
         parentInstruction.__init__(self, instructionID, disableExpression)
         #print(f"Warning: initialising unknownInstruction {hex(instructionID)}, disableExpression={disableExpression}")
     
@@ -175,8 +204,12 @@ class returnInstruction(parentInstruction):
         else:
             return f"return{'*' if self.disableExpression else ''} {self.returnValue.writeToCpp(indentLevel)[0]};\n", indentLevel, 0
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
-        self.returnValue = readPotentialExpression(wordsEnumerated, currentWord, self.disableExpression)
+    def readFromKsm(self, cursor: wordCursor):
+        self.returnValue = readPotentialExpression(cursor, self.disableExpression)
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        census.scanPotentialExpression(cursor, disableExpression)
     
     def readFromCpp(self, file: object, thisData: object):
         assert file.term == "return"
@@ -207,9 +240,9 @@ class labelInstruction(parentInstruction):
     def writeToCpp(self, indentLevel: int) -> (str, int, int):
         return f"{self.alias}:\n", indentLevel, 0
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         assert not self.disableExpression
-        linkedLabelDefinition = currentFunctionTree[-1].labelsByAddress.get(currentWord.index, None)
+        linkedLabelDefinition = cursor.context.functionTree[-1].labelsByAddress.get(cursor.position - 1, None)
         self.alias = linkedLabelDefinition.alias
     
     def readFromCpp(self, file: object, thisData: object):
@@ -253,31 +286,40 @@ class openFunctionInstruction(parentInstruction):
         
         return cppText, indentLevel, indentOffsetNextLine
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         assert not self.disableExpression
         # function id - use to link to appropiate function definition
-        getNextWord(wordsEnumerated, currentWord)
+        word = cursor.readWord()
         
-        linkedFunctionDefinition = functionDefinitionDictGet(currentWord.value)
+        linkedFunctionDefinition = cursor.context.functionDefinitionDictGet(word)
         if not linkedFunctionDefinition is None:
             self.name = linkedFunctionDefinition.name
             self.isPublic = linkedFunctionDefinition.isPublic
             if not linkedFunctionDefinition.specialLabel is None:
                 self.specialLabelAlias = linkedFunctionDefinition.specialLabel.alias
         else:
-            raise Exception(f"{hex(currentWord.value,)}, {hex(currentWord.index * 4)}")
-        global currentFunctionTree
-        currentFunctionTree.append(linkedFunctionDefinition)
+            raise Exception(f"{hex(word,)}, {hex((cursor.position - 1) * 4)}")
+        cursor.context.functionTree.append(linkedFunctionDefinition)
         
         self.arguments = []
         while True:
-            getNextWord(wordsEnumerated, currentWord)
-            newArgument = matchInstruction(currentWord.value)(currentWord.value, False)
+            word = cursor.readWord()
+            newArgument = cursor.context.newInstruction(word)
             if isinstance(newArgument, closeFunctionArgumentsInstruction):
                 break
-            newArgument.readFromKsm(wordsEnumerated, currentWord)
+            newArgument.readFromKsm(cursor)
             self.arguments.append(newArgument)
     
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        word = cursor.readWord()
+        linkedFunctionDefinition = census.context.functionDefinitionDictGet(word)
+        if linkedFunctionDefinition is None:
+            raise Exception(f"{hex(word,)}, {hex((cursor.position - 1) * 4)}")
+        census.functionTree.append(linkedFunctionDefinition)
+        while (argumentType := census.scanOperand(cursor)) is not closeFunctionArgumentsInstruction:
+            argumentType.scanKsm(cursor, census, False)
+    
     def readFromCpp(self, file: object, thisData: object):
         thisData.localDefinedVariablesTree.append(dict())
         thisData.localDefinedArraysTree.append(dict())
@@ -358,11 +400,11 @@ class openThreadInstruction(parentInstruction):
         
         return cppText, indentLevel, indentOffsetNextLine
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         # function id - use to link to appropiate function definition
-        getNextWord(wordsEnumerated, currentWord)
+        word = cursor.readWord()
         
-        linkedFunctionDefinition = functionDefinitionDictGet(currentWord.value)
+        linkedFunctionDefinition = cursor.context.functionDefinitionDictGet(word)
         if not linkedFunctionDefinition is None:
             self.name = linkedFunctionDefinition.name[:-9]
             self.name = self.name if self.name else "_"
@@ -370,30 +412,44 @@ class openThreadInstruction(parentInstruction):
         if not linkedFunctionDefinition.specialLabel is None:
             self.specialLabelAlias = linkedFunctionDefinition.specialLabel.alias
         
-        global currentFunctionTree
-        currentFunctionTree.append(linkedFunctionDefinition)
+        cursor.context.functionTree.append(linkedFunctionDefinition)
         
         self.arguments = []
         while True:
-            getNextWord(wordsEnumerated, currentWord)
-            newArgument = matchInstruction(currentWord.value)(currentWord.value, False)
+            word = cursor.readWord()
+            newArgument = cursor.context.newInstruction(word)
             if isinstance(newArgument, closeFunctionArgumentsInstruction):
                 break
-            newArgument.readFromKsm(wordsEnumerated, currentWord)
+            newArgument.readFromKsm(cursor)
             self.arguments.append(newArgument)
         
         # TODO: make this implementation not suck (this is to make the local variables focus on the parent function)
-        rememberThreadFunction = currentFunctionTree[-1]
-        currentFunctionTree.pop(-1)
+        rememberThreadFunction = cursor.context.functionTree[-1]
+        cursor.context.functionTree.pop(-1)
         self.captures = []
         while True:
-            getNextWord(wordsEnumerated, currentWord)
-            newArgument = matchInstruction(currentWord.value)(currentWord.value, False)
+            word = cursor.readWord()
+            newArgument = cursor.context.newInstruction(word)
             if isinstance(newArgument, closeCallArgumentsInstruction):
                 break
-            newArgument.readFromKsm(wordsEnumerated, currentWord)
+            newArgument.readFromKsm(cursor)
             self.captures.append(newArgument)
-        currentFunctionTree.append(rememberThreadFunction)
+        cursor.context.functionTree.append(rememberThreadFunction)
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        word = cursor.readWord()
+        linkedFunctionDefinition = census.context.functionDefinitionDictGet(word)
+        if linkedFunctionDefinition is None:
+            raise Exception(f"{hex(word,)}, {hex((cursor.position - 1) * 4)}")
+        census.functionTree.append(linkedFunctionDefinition)
+        while (argumentType := census.scanOperand(cursor)) is not closeFunctionArgumentsInstruction:
+            argumentType.scanKsm(cursor, census, False)
+        # captures belong to the parent function
+        census.functionTree.pop(-1)
+        while (argumentType := census.scanOperand(cursor)) is not closeCallArgumentsInstruction:
+            argumentType.scanKsm(cursor, census, False)
+        census.functionTree.append(linkedFunctionDefinition)
     
     def readFromCpp(self, file: object, thisData: object):
         thisData.bracesTree.append(self)
@@ -474,9 +530,12 @@ class closeFunctionInstruction(parentInstruction):
         indentLevel -= 1
         return "}\n", indentLevel, 0
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
-        global currentFunctionTree
-        currentFunctionTree.pop(-1)
+    def readFromKsm(self, cursor: wordCursor):
+        cursor.context.functionTree.pop(-1)
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        census.functionTree.pop(-1)
     
     def readFromCpp(self, file: object, thisData: object):
         for thisLabel in thisData.declaredLabelStack[-1].values():
@@ -512,13 +571,16 @@ class gotoInstruction(parentInstruction):
         isAltType = isinstance(self, caseGotoInstruction)
         return f"goto{'*' if isAltType else ''} {self.labelAlias};\n", indentLevel, 0
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         assert not self.disableExpression
-        getNextWord(wordsEnumerated, currentWord)
-        labelID = currentWord.value
-        linkedLabelDefinition = currentFunctionTree[-1].labelsByID.get(labelID, None)
+        labelID = cursor.readWord()
+        linkedLabelDefinition = cursor.context.functionTree[-1].labelsByID.get(labelID, None)
         self.labelAlias = linkedLabelDefinition.alias
     
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        cursor.skip()
+    
     def readFromCpp(self, file: object, thisData: object):
         assert file.term == "goto"
         file.getNextTerm()
@@ -556,25 +618,35 @@ class callInstruction(parentInstruction):
         cppText = f"{threadText}{self.callee.writeToCpp(indentLevel)[0]}{'*' if self.disableExpression else ''}({argumentsText});\n"
         return cppText, indentLevel, 0
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
-        getNextWord(wordsEnumerated, currentWord)
-        self.callee = matchInstruction(currentWord.value, True)(currentWord.value, False)
+    def readFromKsm(self, cursor: wordCursor):
+        word = cursor.readWord()
+        self.callee = cursor.context.newInstruction(word)
         self.arguments = []
         if self.disableExpression:
             while True:
-                getNextWord(wordsEnumerated, currentWord)
-                newArgument = matchInstruction(currentWord.value, True)(currentWord.value, False)
+                word = cursor.readWord()
+                newArgument = cursor.context.newInstruction(word)
                 if isinstance(newArgument, closeCallArgumentsInstruction):
                     break
                 self.arguments.append(newArgument)
         else:
             while True:
                 newArgument = expression()
-                newArgument.readFromKsm(wordsEnumerated, currentWord)
+                newArgument.readFromKsm(cursor)
                 if not newArgument.instructions:
                     break
                 self.arguments.append(newArgument)
     
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        census.scanOperand(cursor)
+        if disableExpression:
+            while census.scanOperand(cursor) is not closeCallArgumentsInstruction:
+                pass
+        else:
+            while census.scanExpression(cursor) is not None:
+                pass
+    
     def readFromCpp(self, file: object, thisData: object, disableLineEnd: bool = False, isAssignmentEdgeCase: bool = False):
         name = self.name = file.term
         if (match:= thisData.definedImports.get(name, None)) is not None:
@@ -656,12 +728,16 @@ class deleteVariableInstruction(parentInstruction):
             return "delete;\n", indentLevel, 0
         return f"delete {self.variable.writeToCpp(indentLevel)[0]};\n", indentLevel, 0
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         assert not self.disableExpression
-        getNextWord(wordsEnumerated, currentWord)
-        self.variable = matchInstruction(currentWord.value)(currentWord.value, False)
+        word = cursor.readWord()
+        self.variable = cursor.context.newInstruction(word)
         if isinstance(self.variable, closeExpressionInstruction):
             self.variable = None
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        census.scanOperand(cursor)
 
     def readFromCpp(self, file: object, thisData: object):
         assert file.term == "delete"
@@ -684,10 +760,14 @@ class unidentified13Instruction(parentInstruction):
     def writeToCpp(self, indentLevel: int) -> (str, int, int):
         return f"unidentified_13 {self.variable.writeToCpp(indentLevel)[0]};\n", indentLevel, 0
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         assert not self.disableExpression
-        getNextWord(wordsEnumerated, currentWord)
-        self.variable = matchInstruction(currentWord.value)(currentWord.value, False)
+        word = cursor.readWord()
+        self.variable = cursor.context.newInstruction(word)
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        census.scanOperand(cursor)
 
     def readFromCpp(self, file: object, thisData: object):
         assert file.term == "unidentified_13"
@@ -708,10 +788,14 @@ class unidentified14Instruction(parentInstruction):
     def writeToCpp(self, indentLevel: int) -> (str, int, int):
         return f"unidentified_14 {self.variable.writeToCpp(indentLevel)[0]};\n", indentLevel, 0
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         assert not self.disableExpression
-        getNextWord(wordsEnumerated, currentWord)
-        self.variable = matchInstruction(currentWord.value)(currentWord.value, False)
+        word = cursor.readWord()
+        self.variable = cursor.context.newInstruction(word)
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        census.scanOperand(cursor)
 
     def readFromCpp(self, file: object, thisData: object):
         assert file.term == "unidentified_14"
@@ -733,10 +817,14 @@ class isChildThreadIncompleteInstruction(parentInstruction):
         cppText = f"is_incomplete {self.variable.writeToCpp(indentLevel)[0]};\n"
         return cppText, indentLevel, 0
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         assert not self.disableExpression
-        getNextWord(wordsEnumerated, currentWord)
-        self.variable = matchInstruction(currentWord.value)(currentWord.value, False)
+        word = cursor.readWord()
+        self.variable = cursor.context.newInstruction(word)
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        census.scanOperand(cursor)
     
     def readFromCpp(self, file: object, thisData: object):
         assert file.term == "is_incomplete"
@@ -758,13 +846,17 @@ class sleepFramesInstruction(parentInstruction):
         cppText = f"sleep_frames{'*' if self.disableExpression else ''} {self.value.writeToCpp(indentLevel)[0]};\n"
         return cppText, indentLevel, 0
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         if self.disableExpression:
-            getNextWord(wordsEnumerated, currentWord)
-            self.value = matchInstruction(currentWord.value)(currentWord.value, False)
+            word = cursor.readWord()
+            self.value = cursor.context.newInstruction(word)
         else:
             self.value = expression()
-        self.value.readFromKsm(wordsEnumerated, currentWord)
+        self.value.readFromKsm(cursor)
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        census.scanPotentialExpression(cursor, disableExpression)
     
     def readFromCpp(self, file: object, thisData: object):
         assert file.term == "sleep_frames"
@@ -791,13 +883,17 @@ class sleepMillisecondsInstruction(parentInstruction):
         cppText = f"sleep_milliseconds{'*' if self.disableExpression else ''} {self.value.writeToCpp(indentLevel)[0]};\n"
         return cppText, indentLevel, 0
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         if self.disableExpression:
-            getNextWord(wordsEnumerated, currentWord)
-            self.value = matchInstruction(currentWord.value)(currentWord.value, False)
+            word = cursor.readWord()
+            self.value = cursor.context.newInstruction(word)
         else:
             self.value = expression()
-        self.value.readFromKsm(wordsEnumerated, currentWord)
+        self.value.readFromKsm(cursor)
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        census.scanPotentialExpression(cursor, disableExpression)
     
     def readFromCpp(self, file: object, thisData: object):
         assert file.term == "sleep_milliseconds"
@@ -824,19 +920,24 @@ class ifInstruction(parentInstruction):
         cppText = f"if{'*' if self.disableExpression else ''} {self.condition.writeToCpp(indentLevel)[0]} {{\n"
         return cppText, indentLevel, indentOffsetNextLine
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         if self.disableExpression:
-            getNextWord(wordsEnumerated, currentWord)
-            self.condition = matchInstruction(currentWord.value, True)(currentWord.value, False)
+            word = cursor.readWord()
+            self.condition = cursor.context.newInstruction(word)
         else:
             self.condition = expression()
-        self.condition.readFromKsm(wordsEnumerated, currentWord)
+        self.condition.readFromKsm(cursor)
         # unused - discard
-        getNextWord(wordsEnumerated, currentWord)
+        cursor.skip()
         # jump to offset - discard
-        getNextWord(wordsEnumerated, currentWord)
+        cursor.skip()
         # also unused - discard
-        getNextWord(wordsEnumerated, currentWord)
+        cursor.skip()
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        census.scanPotentialExpression(cursor, disableExpression)
+        cursor.skip(3)
     
     def readFromCpp(self, file: object, thisData: object):
         thisData.bracesTree.append(self)
@@ -850,12 +951,8 @@ class ifInstruction(parentInstruction):
         super().writeToKsm(section)
         self.condition.writeToKsm(section)
         section.words.append(0)
-        self.writeToAddress = len(section.words)
-        section.words.append(0)
+        self.jump = addRelocation(section)
         section.words.append(0)
-    
-    def writeToKsmAfter(self, section: object):
-        section.words[self.writeToAddress] = self.jumpOffset
 
 #0x19
 #If Equal - OBSOLETE, use "if" instead.
@@ -866,14 +963,20 @@ class ifEqualInstruction(parentInstruction):
         cppText = f"if {self.operator}({self.valueX.writeToCpp(indentLevel)[0]}, {self.valueY.writeToCpp(indentLevel)[0]}) {{\n"
         return cppText, indentLevel, indentOffsetNextLine
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         assert not self.disableExpression
-        getNextWord(wordsEnumerated, currentWord)
-        self.valueX = matchInstruction(currentWord.value, True)(currentWord.value, False)
-        getNextWord(wordsEnumerated, currentWord)
-        self.valueY = matchInstruction(currentWord.value, True)(currentWord.value, False)
+        word = cursor.readWord()
+        self.valueX = cursor.context.newInstruction(word)
+        word = cursor.readWord()
+        self.valueY = cursor.context.newInstruction(word)
         # jump to offset - discard
-        getNextWord(wordsEnumerated, currentWord)
+        cursor.skip()
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        census.scanOperand(cursor)
+        census.scanOperand(cursor)
+        cursor.skip()
     
     def readFromCpp(self, file: object, thisData: object):
         thisData.bracesTree.append(self)
@@ -900,11 +1003,7 @@ class ifEqualInstruction(parentInstruction):
         super().writeToKsm(section)
         self.valueX.writeToKsm(section)
         self.valueY.writeToKsm(section)
-        self.writeToAddress = len(section.words)
-        section.words.append(0)
-    
-    def writeToKsmAfter(self, section: object):
-        section.words[self.writeToAddress] = self.jumpOffset
+        self.jump = addRelocation(section)
 
 #0x1a
 #If Not Equal - OBSOLETE, use if instead.
@@ -942,9 +1041,13 @@ class elseInstruction(parentInstruction):
         cppText = f"}} else {{\n"
         return cppText, indentLevel, indentOffsetNextLine
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         # jump to offset - discard
-        getNextWord(wordsEnumerated, currentWord)
+        cursor.skip()
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        cursor.skip()
     
     def readFromCpp(self, file: object, thisData: object):
         self.pairedInstruction = thisData.bracesTree[-1] 
@@ -959,13 +1062,17 @@ class elseInstruction(parentInstruction):
         file.allowGetNextLine(False, False)
     
     def writeToKsm(self, section: object):
-        self.pairedInstruction.jumpOffset = len(section.words) + 2
+        self.jumpToBranch(section)
         super().writeToKsm(section)
-        self.writeToAddress = len(section.words)
-        section.words.append(0)
+        self.jump = addRelocation(section)
     
-    def writeToKsmAfter(self, section: object):
-        section.words[self.writeToAddress] = self.jumpOffset
+    def jumpToBranch(self, section: object):
+        # the branch before this one ends here, an else if skips its condition with one jump and this instruction with the other
+        if isinstance(self.pairedInstruction, elseIfInstruction):
+            self.pairedInstruction.jump.target = len(section.words)
+            self.pairedInstruction.jump2.target = len(section.words) + 2
+        else:
+            self.pairedInstruction.jump.target = len(section.words) + 2
 
 #0x27
 #Else If Statement
@@ -976,24 +1083,33 @@ class elseIfInstruction(parentInstruction):
         cppText = f"}} else if{'*' if self.disableExpression else ''} {self.condition.writeToCpp(indentLevel)[0]} {{\n"
         return cppText, indentLevel, indentOffsetNextLine
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         # jump to offset - discard
-        getNextWord(wordsEnumerated, currentWord)
+        cursor.skip()
         # unused - discard
-        getNextWord(wordsEnumerated, currentWord)
-        assert currentWord.value == 0x18, hex(currentWord.value)
+        word = cursor.readWord()
+        assert word == 0x18, hex(word)
         if self.disableExpression:
-            getNextWord(wordsEnumerated, currentWord)
-            self.condition = matchInstruction(currentWord.value, True)(currentWord.value, False)
+            word = cursor.readWord()
+            self.condition = cursor.context.newInstruction(word)
         else:
             self.condition = expression()
-            self.condition.readFromKsm(wordsEnumerated, currentWord)
+            self.condition.readFromKsm(cursor)
         # also unused - discard
-        getNextWord(wordsEnumerated, currentWord)
+        cursor.skip()
         # 2nd jump to offset - discard
-        getNextWord(wordsEnumerated, currentWord)
+        cursor.skip()
         # also also unused - discard
-        getNextWord(wordsEnumerated, currentWord)
+        cursor.skip()
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        cursor.skip(2)
+        if disableExpression:
+            census.scanOperand(cursor)
+        else:
+            census.scanExpression(cursor)
+        cursor.skip(3)
     
     def readFromCpp(self, file: object, thisData: object):
         self.pairedInstruction = thisData.bracesTree[-1]
@@ -1010,26 +1126,16 @@ class elseIfInstruction(parentInstruction):
         self.condition = expression()
         self.condition.readFromCpp(file, thisData, '{')
         file.allowGetNextLine(False, False)
-        self.jumpOffset2 = None
     
     def writeToKsm(self, section: object):
-        self.pairedInstruction.jumpOffset = len(section.words) + 2
+        elseInstruction.jumpToBranch(self, section)
         super().writeToKsm(section)
-        self.writeToAddress = len(section.words)
-        section.words.append(0)
+        self.jump = addRelocation(section)
         section.words.append(0x18)
         self.condition.writeToKsm(section)
         section.words.append(0)
-        self.writeToAddress2 = len(section.words)
+        self.jump2 = addRelocation(section)
         section.words.append(0)
-        section.words.append(0)
-    
-    def writeToKsmAfter(self, section: object):
-        if self.jumpOffset2 is None:
-            self.jumpOffset2 = self.jumpOffset
-            self.jumpOffset -= 2
-        section.words[self.writeToAddress] = self.jumpOffset
-        section.words[self.writeToAddress2] = self.jumpOffset2
     
 #0x28
 #End If Statement - Close an If Statement branch
@@ -1046,12 +1152,12 @@ class endIfInstruction(parentInstruction):
     
     def writeToKsm(self, section: object):
         if isinstance(self.pairedInstruction, elseInstruction):
-            self.pairedInstruction.jumpOffset = len(section.words) + 1
+            self.pairedInstruction.jump.target = len(section.words) + 1
         elif isinstance(self.pairedInstruction, elseIfInstruction):
-            self.pairedInstruction.jumpOffset = len(section.words)
-            self.pairedInstruction.jumpOffset2 = len(section.words)
+            self.pairedInstruction.jump.target = len(section.words)
+            self.pairedInstruction.jump2.target = len(section.words)
         else:
-            self.pairedInstruction.jumpOffset = len(section.words)
+            self.pairedInstruction.jump.target = len(section.words)
         super().writeToKsm(section)
 
 #0x29
@@ -1062,16 +1168,21 @@ class switchInstruction(parentInstruction):
         indentOffsetNextLine = 2
         return f"switch {self.value.writeToCpp(indentLevel)[0]} {{\n", indentLevel, indentOffsetNextLine
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         assert not self.disableExpression
-        getNextWord(wordsEnumerated, currentWord)
-        self.value = matchInstruction(currentWord.value)(currentWord.value, False)
+        word = cursor.readWord()
+        self.value = cursor.context.newInstruction(word)
         if isinstance(self.value, closeExpressionInstruction):
             self.value = None
         #unused value - discard
-        getNextWord(wordsEnumerated, currentWord)
+        cursor.skip()
         #jump offset - discard
-        getNextWord(wordsEnumerated, currentWord)
+        cursor.skip()
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        census.scanOperand(cursor)
+        cursor.skip(2)
     
     def readFromCpp(self, file: object, thisData: object):
         thisData.bracesTree.append(self)
@@ -1086,14 +1197,8 @@ class switchInstruction(parentInstruction):
     def writeToKsm(self, section: object):
         super().writeToKsm(section)
         self.value.writeToKsm(section)
-        self.writeToAddress2 = len(section.words)
-        section.words.append(0)
-        self.writeToAddress = len(section.words)
-        section.words.append(0)
-    
-    def writeToKsmAfter(self, section: object):
-        section.words[self.writeToAddress] = self.jumpOffset
-        section.words[self.writeToAddress2] = self.jumpOffset2
+        self.jump2 = addRelocation(section)
+        self.jump = addRelocation(section)
 
 #0x2a
 #Case - One potential place to jump to in a switch statement.
@@ -1104,12 +1209,17 @@ class caseInstruction(parentInstruction):
         indentOffsetNextLine = 1
         return f"case {self.operator}{self.value.writeToCpp(indentLevel)[0]}:\n", indentLevel, indentOffsetNextLine
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         assert not self.disableExpression
-        getNextWord(wordsEnumerated, currentWord)
-        self.value = matchInstruction(currentWord.value, True)(currentWord.value, False)
+        word = cursor.readWord()
+        self.value = cursor.context.newInstruction(word)
         #jump offset - discard
-        getNextWord(wordsEnumerated, currentWord)
+        cursor.skip()
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        census.scanOperand(cursor)
+        cursor.skip()
     
     def readFromCpp(self, file: object, thisData: object):
         self.pairedInstruction = thisData.bracesTree[-1]
@@ -1129,14 +1239,10 @@ class caseInstruction(parentInstruction):
     
     def writeToKsm(self, section: object):
         if self.pairedInstruction is not None:
-            self.pairedInstruction.jumpOffset = len(section.words)
+            self.pairedInstruction.jump.target = len(section.words)
         super().writeToKsm(section)
         self.value.writeToKsm(section)
-        self.writeToAddress = len(section.words)
-        section.words.append(0)
-    
-    def writeToKsmAfter(self, section: object):
-        section.words[self.writeToAddress] = self.jumpOffset
+        self.jump = addRelocation(section)
 
 #0x2b
 #Case Not Equal
@@ -1171,14 +1277,20 @@ class caseRangeInstruction(caseInstruction):
         indentOffsetNextLine = 1
         return f"case {self.lowerBound.writeToCpp(indentLevel)[0]} ... {self.upperBound.writeToCpp(indentLevel)[0]}:\n", indentLevel, indentOffsetNextLine
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         assert not self.disableExpression
-        getNextWord(wordsEnumerated, currentWord)
-        self.lowerBound = matchInstruction(currentWord.value, True)(currentWord.value, False)
-        getNextWord(wordsEnumerated, currentWord)
-        self.upperBound = matchInstruction(currentWord.value, True)(currentWord.value, False)
+        word = cursor.readWord()
+        self.lowerBound = cursor.context.newInstruction(word)
+        word = cursor.readWord()
+        self.upperBound = cursor.context.newInstruction(word)
         #jump offset - discard
-        getNextWord(wordsEnumerated, currentWord)
+        cursor.skip()
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        census.scanOperand(cursor)
+        census.scanOperand(cursor)
+        cursor.skip()
     
     def readFromCpp(self, file: object, thisData: object):
         self.pairedInstruction = thisData.bracesTree[-1]
@@ -1201,15 +1313,11 @@ class caseRangeInstruction(caseInstruction):
     
     def writeToKsm(self, section: object):
         if self.pairedInstruction is not None:
-            self.pairedInstruction.jumpOffset = len(section.words)
+            self.pairedInstruction.jump.target = len(section.words)
         parentInstruction.writeToKsm(self, section)
         self.lowerBound.writeToKsm(section)
         self.upperBound.writeToKsm(section)
-        self.writeToAddress = len(section.words)
-        section.words.append(0)
-    
-    def writeToKsmAfter(self, section: object):
-        section.words[self.writeToAddress] = self.jumpOffset
+        self.jump = addRelocation(section)
     
 ...
 
@@ -1221,12 +1329,16 @@ class caseDefaultInstruction(caseInstruction):
         indentOffsetNextLine = 1
         return f"default:\n", indentLevel, indentOffsetNextLine
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         assert not self.disableExpression
         #unused - discard
-        getNextWord(wordsEnumerated, currentWord)
+        cursor.skip()
         #jump offset - discard
-        getNextWord(wordsEnumerated, currentWord)
+        cursor.skip()
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        cursor.skip(2)
     
     def readFromCpp(self, file: object, thisData: object):
         self.pairedInstruction = thisData.bracesTree[-1]
@@ -1240,14 +1352,10 @@ class caseDefaultInstruction(caseInstruction):
     
     def writeToKsm(self, section: object):
         if self.pairedInstruction is not None:
-            self.pairedInstruction.jumpOffset = len(section.words)
+            self.pairedInstruction.jump.target = len(section.words)
         parentInstruction.writeToKsm(self, section)
         section.words.append(0)
-        self.writeToAddress = len(section.words)
-        section.words.append(0)
-    
-    def writeToKsmAfter(self, section: object):
-        section.words[self.writeToAddress] = self.jumpOffset
+        self.jump = addRelocation(section)
 
 #0x37
 #Break Switch - Jump to the end of the switch statement.
@@ -1279,11 +1387,11 @@ class endSwitchInstruction(parentInstruction):
     
     def writeToKsm(self, section: object):
         if isinstance(self.pairedInstruction, switchInstruction):
-            self.pairedInstruction.jumpOffset2 = len(section.words)
+            self.pairedInstruction.jump2.target = len(section.words)
         else:
-            self.pairedInstruction.jumpOffset = len(section.words)
+            self.pairedInstruction.jump.target = len(section.words)
         if self.pairedInstruction2 is not None:
-            self.pairedInstruction2.jumpOffset2 = len(section.words)
+            self.pairedInstruction2.jump2.target = len(section.words)
         super().writeToKsm(section)
 
 #0x39
@@ -1294,20 +1402,23 @@ class whileInstruction(parentInstruction):
         cppText = f"while{'*' if self.disableExpression else ''} {self.condition.writeToCpp(indentLevel)[0]} {{\n"
         return cppText, indentLevel, indentOffsetNextLine
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
-        if versionRaw >= 0x00010302:
-            assert not self.disableExpression
-            expressionBypass = True
-        else:
-            expressionBypass = False
-        if self.disableExpression or expressionBypass:
-            getNextWord(wordsEnumerated, currentWord)
-            self.condition = matchInstruction(currentWord.value, True)(currentWord.value, False)
+    def readFromKsm(self, cursor: wordCursor):
+        if self.disableExpression:
+            word = cursor.readWord()
+            self.condition = cursor.context.newInstruction(word)
         else:
             self.condition = expression()
-            self.condition.readFromKsm(wordsEnumerated, currentWord)
+            self.condition.readFromKsm(cursor)
         # jump to offset - discard
-        getNextWord(wordsEnumerated, currentWord)
+        cursor.skip()
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        if disableExpression:
+            census.scanOperand(cursor)
+        else:
+            census.scanExpression(cursor)
+        cursor.skip()
     
     def readFromCpp(self, file: object, thisData: object):
         thisData.bracesTree.append(self)
@@ -1327,11 +1438,22 @@ class whileInstruction(parentInstruction):
     def writeToKsm(self, section: object):
         super().writeToKsm(section)
         self.condition.writeToKsm(section)
-        self.writeToAddress = len(section.words)
-        section.words.append(0)
+        self.jump = addRelocation(section)
+
+#0x36 (1.3.2)
+#While Loop - the condition is always a single value rather than an expression
+class whileInstructionAlt(whileInstruction):
+    def readFromKsm(self, cursor: wordCursor):
+        assert not self.disableExpression
+        word = cursor.readWord()
+        self.condition = cursor.context.newInstruction(word)
+        # jump to offset - discard
+        cursor.skip()
     
-    def writeToKsmAfter(self, section: object):
-        section.words[self.writeToAddress] = self.jumpOffset
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        census.scanOperand(cursor)
+        cursor.skip()
 
 #0x3a
 #Break - Exit ("break") out of a while loop prematurely.
@@ -1367,7 +1489,7 @@ class endWhileInstruction(parentInstruction):
         file.allowGetNextLine(False, False)
     
     def writeToKsm(self, section: object):
-        self.pairedInstruction.jumpOffset = len(section.words)
+        self.pairedInstruction.jump.target = len(section.words)
         super().writeToKsm(section)
 
 #0x3d
@@ -1393,21 +1515,21 @@ class assignmentInstruction(parentInstruction):
             cppText = f"{assigneeText} {'*' if self.disableExpression else ''}= {valueText}{'' if valueText.endswith('{\n') else ';\n'}"
         return cppText, indentLevel, indentOffsetNextLine
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         def readNextReturnInstruction():
             nonlocal self
-            getNextWord(wordsEnumerated, currentWord)
-            returnInstructionID = currentWord.value & 0xff
-            returnDisableExpression = bool(currentWord.value & 0x0100)
-            self.value = matchInstruction(returnInstructionID)(returnInstructionID, returnDisableExpression)
-            self.value.readFromKsm(wordsEnumerated, currentWord)
-        
-        getNextWord(wordsEnumerated, currentWord)
-        self.assignee = matchInstruction(currentWord.value)(currentWord.value, False)
+            word = cursor.readWord()
+            returnInstructionID = word & 0xff
+            returnDisableExpression = bool(word & 0x0100)
+            self.value = cursor.context.newInstruction(returnInstructionID, True, returnDisableExpression)
+            self.value.readFromKsm(cursor)
+        
+        word = cursor.readWord()
+        self.assignee = cursor.context.newInstruction(word)
         if self.disableExpression:
-            getNextWord(wordsEnumerated, currentWord)
-            self.value = matchInstruction(currentWord.value, True)(currentWord.value, False)
-            self.value.readFromKsm(wordsEnumerated, currentWord)
+            word = cursor.readWord()
+            self.value = cursor.context.newInstruction(word)
+            self.value.readFromKsm(cursor)
             if isinstance(self.value, closeExpressionInstruction):
                 self.value = None
             elif isinstance(self.value, getNextFunctionReturnInstruction):
@@ -1416,7 +1538,7 @@ class assignmentInstruction(parentInstruction):
                 self.isIncrement = True
         else:
             self.value = expression()
-            self.value.readFromKsm(wordsEnumerated, currentWord)
+            self.value.readFromKsm(cursor)
             if len(self.value.instructions) == 0:
                 self.value = None
             elif isinstance(self.value.instructions[0], getNextFunctionReturnInstruction):
@@ -1424,6 +1546,18 @@ class assignmentInstruction(parentInstruction):
             elif isinstance(self.value.instructions[0], operatorInstruction) and self.value.instructions[0].instructionID in (0x50, 0x51):
                 self.isIncrement = True
     
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        census.scanOperand(cursor)
+        if disableExpression:
+            valueType = census.scanOperand(cursor)
+            valueType.scanKsm(cursor, census, False)
+        else:
+            valueType = census.scanExpression(cursor)
+        if valueType is getNextFunctionReturnInstruction:
+            word = cursor.readWord()
+            census.scanOperandWord(word & 0xff).scanKsm(cursor, census, bool(word & 0x0100))
+    
     def readFromCpp(self, file: object, thisData: object):
         self.gettingNext = False
         self.variable = expression()
@@ -1521,12 +1655,19 @@ class closeExpressionInstruction(unknownInstruction):
 #0x41 to 0x4f and 0x52 to 0x56
 #Operators
 class operatorInstruction(parentInstruction):
+    __slots__ = ()
+    
     def writeToCpp(self, indentLevel: int) -> (str, int, int):
-        if versionRaw >= 0x00010302:
-            return operatorDictAlt[self.instructionID], indentLevel, 0
-            
         return operatorDict[self.instructionID], indentLevel, 0
 
+#0x3e to 0x53 (1.3.2)
+#Operators
+class operatorInstructionAlt(operatorInstruction):
+    __slots__ = ()
+    
+    def writeToCpp(self, indentLevel: int) -> (str, int, int):
+        return operatorDictAlt[self.instructionID], indentLevel, 0
+
 ...
 
 #[parent]
@@ -1536,14 +1677,19 @@ class operatorFunctionInstruction(parentInstruction):
     def writeToCpp(self, indentLevel: int) -> (str, int, int):
         return f"{self.name}({self.variable.writeToCpp(indentLevel)[0]}, {self.value.writeToCpp(indentLevel)[0]});\n", indentLevel, 0
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         assert not self.disableExpression
-        getNextWord(wordsEnumerated, currentWord)
-        self.variable = matchInstruction(currentWord.value, True)(currentWord.value, False)
-        self.variable.readFromKsm(wordsEnumerated, currentWord)
-        getNextWord(wordsEnumerated, currentWord)
-        self.value = matchInstruction(currentWord.value, True)(currentWord.value, False)
-        self.value.readFromKsm(wordsEnumerated, currentWord)
+        word = cursor.readWord()
+        self.variable = cursor.context.newInstruction(word)
+        self.variable.readFromKsm(cursor)
+        word = cursor.readWord()
+        self.value = cursor.context.newInstruction(word)
+        self.value.readFromKsm(cursor)
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        census.scanValue(cursor)
+        census.scanValue(cursor)
     
     def readFromCpp(self, file: object, thisData: object):
         assert file.term == self.name
@@ -1648,58 +1794,67 @@ class parentArrayOpenInstruction(parentInstruction):
         #lengthString = f"[{self.length}]" if self.dataTypeString != "var_array" else ""
         return f"{nameString} = {{{elementsString}}};\n", indentLevel, 0
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         def readArrayVariables() -> Generator[str]:
-            nonlocal self, wordsEnumerated, currentWord
+            nonlocal self, cursor
             for _ in range(self.length):
-                getNextWord(wordsEnumerated, currentWord)
-                yield matchInstruction(currentWord.value)(currentWord.value, False)
+                word = cursor.readWord()
+                yield cursor.context.newInstruction(word)
         
         def readArrayInts() -> Generator[str]:
-            nonlocal self, wordsEnumerated, currentWord
+            nonlocal self, cursor
             for _ in range(self.length):
-                getNextWord(wordsEnumerated, currentWord)
-                if currentWord.value >= 0x80000000:
-                    yield repr(currentWord.value - 0x100000000)
+                word = cursor.readWord()
+                if word >= 0x80000000:
+                    yield repr(word - 0x100000000)
                 else:
-                    yield repr(currentWord.value)
+                    yield repr(word)
         
         def readArrayFloats() -> Generator[str]:
-            nonlocal self, wordsEnumerated, currentWord
+            nonlocal self, cursor
             for _ in range(self.length):
-                getNextWord(wordsEnumerated, currentWord)
-                value = unpack('<f', currentWord.value.to_bytes(4, byteorder='little'))[0]
+                word = cursor.readWord()
+                value = unpack('<f', word.to_bytes(4, byteorder='little'))[0]
                 value = float('%.6g' % value) # round to 6 s.f.
                 yield repr(value)
         
         def readArrayBools() -> Generator[str]:
-            nonlocal self, wordsEnumerated, currentWord
+            nonlocal self, cursor
             for _ in range(self.length // 4):
-                getNextWord(wordsEnumerated, currentWord)
+                word = cursor.readWord()
                 for bitshift in range(4):
-                    newVal = (currentWord.value >> (bitshift * 8)) & 0xff
+                    newVal = (word >> (bitshift * 8)) & 0xff
                     assert newVal <= 1
                     yield "true" if newVal else "false"
             extraLength = self.length % 4
             if extraLength != 0:
-                getNextWord(wordsEnumerated, currentWord)
+                word = cursor.readWord()
                 for bitshift in range(extraLength):
-                    newVal = (currentWord.value >> (bitshift * 8)) & 0xff
+                    newVal = (word >> (bitshift * 8)) & 0xff
                     assert newVal <= 1
                     yield "true" if newVal else "false"
                 
-        linkedArrayDefinition = arrayDefinitionDictByAddressGet(currentWord.index + 1, currentFunctionTree)
+        linkedArrayDefinition = cursor.context.arrayDefinitionDictByAddressGet(cursor.position, cursor.context.functionTree)
         if linkedArrayDefinition is None:
-            raise Exception(f"Array {hex(currentWord.index + 1)} is not defined!!")
+            raise Exception(f"Array {hex(cursor.position)} is not defined!!")
         self.name = linkedArrayDefinition.name
         self.length = linkedArrayDefinition.length
         
-        self.elements = self.readArrayContents(wordsEnumerated, currentWord)
+        self.elements = self.readArrayContents(cursor)
         # force exhaustion of generator (thanks, python)
         self.elements = list(self.elements)
-        getNextWord(wordsEnumerated, currentWord)
-        newInstruction = matchInstruction(currentWord.value)(currentWord.value, False)
-        assert isinstance(newInstruction, arrayCloseInstruction), (hex(newInstruction.instructionID), hex(currentWord.index * 4))
+        word = cursor.readWord()
+        newInstruction = cursor.context.newInstruction(word)
+        assert isinstance(newInstruction, arrayCloseInstruction), (hex(newInstruction.instructionID), hex((cursor.position - 1) * 4))
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        linkedArrayDefinition = census.context.arrayDefinitionDictByAddressGet(cursor.position, census.functionTree)
+        if linkedArrayDefinition is None:
+            raise Exception(f"Array {hex(cursor.position)} is not defined!!")
+        cls.scanArrayContents(cursor, census, linkedArrayDefinition.length)
+        closeType = census.scanOperand(cursor)
+        assert closeType is arrayCloseInstruction, hex((cursor.position - 1) * 4)
     
     def readFromCpp(self, file: object, thisData: object):
         assert file.term == self.dataTypeString
@@ -1747,10 +1902,15 @@ class parentArrayOpenInstruction(parentInstruction):
 class variableArrayOpenInstruction(parentArrayOpenInstruction):
     dataTypeString = "var_array"
     dataType = arrayDataType.Variable
-    def readArrayContents(self, wordsEnumerated: enumerate[int], currentWord: object) -> Generator[str]:
+    def readArrayContents(self, cursor: wordCursor) -> Generator[str]:
         for _ in range(self.length):
-            getNextWord(wordsEnumerated, currentWord)
-            yield matchInstruction(currentWord.value)(currentWord.value, False)
+            word = cursor.readWord()
+            yield cursor.context.newInstruction(word)
+    
+    @classmethod
+    def scanArrayContents(cls, cursor: wordCursor, census: object, length: int):
+        for _ in range(length):
+            census.scanOperand(cursor)
     
     def writeToKsm(self, section: object):
         super().writeToKsm(section)
@@ -1763,13 +1923,13 @@ class variableArrayOpenInstruction(parentArrayOpenInstruction):
 class intArrayOpenInstruction(parentArrayOpenInstruction):
     dataTypeString = "int_array"
     dataType = arrayDataType.Int
-    def readArrayContents(self, wordsEnumerated: enumerate[int], currentWord: object) -> Generator[str]:
-        for _ in range(self.length):
-            getNextWord(wordsEnumerated, currentWord)
-            if currentWord.value >= 0x80000000:
-                yield repr(currentWord.value - 0x100000000)
-            else:
-                yield repr(currentWord.value)
+    def readArrayContents(self, cursor: wordCursor) -> Generator[str]:
+        for value in cursor.readStruct(f"<{self.length}i"):
+            yield repr(value)
+    
+    @classmethod
+    def scanArrayContents(cls, cursor: wordCursor, census: object, length: int):
+        cursor.skip(length)
     
     def writeToKsm(self, section: object):
         super().writeToKsm(section)
@@ -1784,12 +1944,14 @@ class intArrayOpenInstruction(parentArrayOpenInstruction):
 class floatArrayOpenInstruction(parentArrayOpenInstruction):
     dataTypeString = "float_array"
     dataType = arrayDataType.Float
-    def readArrayContents(self, wordsEnumerated: enumerate[int], currentWord: object) -> Generator[str]:
-        for _ in range(self.length):
-            getNextWord(wordsEnumerated, currentWord)
-            value = unpack('<f', currentWord.value.to_bytes(4, byteorder='little'))[0]
+    def readArrayContents(self, cursor: wordCursor) -> Generator[str]:
+        for value in cursor.readStruct(f"<{self.length}f"):
             value = float('%.6g' % value) # round to 6 s.f.
             yield repr(value)
+    
+    @classmethod
+    def scanArrayContents(cls, cursor: wordCursor, census: object, length: int):
+        cursor.skip(length)
         
     def writeToKsm(self, section: object):
         super().writeToKsm(section)
@@ -1831,10 +1993,14 @@ class getArrayLengthInstruction(parentArrayInstruction):
     def writeToCpp(self, indentLevel: int) -> (str, int, int):
         return f"length {self.array.writeToCpp(indentLevel)[0]};\n", indentLevel, 0
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         assert not self.disableExpression
-        getNextWord(wordsEnumerated, currentWord)
-        self.array = matchInstruction(currentWord.value)(currentWord.value, False)
+        word = cursor.readWord()
+        self.array = cursor.context.newInstruction(word)
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        census.scanOperand(cursor)
     
     def readFromCpp(self, file: object, thisData: object):
         assert file.term == "length"
@@ -1852,12 +2018,17 @@ class readArrayEntryInstruction(parentArrayInstruction):
     def writeToCpp(self, indentLevel: int) -> (str, int, int):
         return f"{self.array.writeToCpp(indentLevel)[0]}[{self.index.writeToCpp(indentLevel)[0]}];\n", indentLevel, 0
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         assert not self.disableExpression
-        getNextWord(wordsEnumerated, currentWord)
-        self.array = matchInstruction(currentWord.value)(currentWord.value, False)
-        getNextWord(wordsEnumerated, currentWord)
-        self.index = matchInstruction(currentWord.value)(currentWord.value, False)
+        word = cursor.readWord()
+        self.array = cursor.context.newInstruction(word)
+        word = cursor.readWord()
+        self.index = cursor.context.newInstruction(word)
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        census.scanOperand(cursor)
+        census.scanOperand(cursor)
     
     def readFromCpp(self, file: object, thisData: object):
         self.readArrayFromCpp(file, thisData, '[')
@@ -1879,14 +2050,19 @@ class arrayCopy1Instruction(parentArrayInstruction):
     def writeToCpp(self, indentLevel: int) -> (str, int, int):
         return f"array_copy_1({self.array.writeToCpp(indentLevel)[0]}, {self.index.writeToCpp(indentLevel)[0]}, {self.variable.writeToCpp(indentLevel)[0]});\n", indentLevel, 0
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         assert not self.disableExpression
-        getNextWord(wordsEnumerated, currentWord)
-        self.array = matchInstruction(currentWord.value)(currentWord.value, False)
-        getNextWord(wordsEnumerated, currentWord)
-        self.index = matchInstruction(currentWord.value, True)(currentWord.value, False)
-        getNextWord(wordsEnumerated, currentWord)
-        self.variable = matchInstruction(currentWord.value, True)(currentWord.value, False)
+        word = cursor.readWord()
+        self.array = cursor.context.newInstruction(word)
+        word = cursor.readWord()
+        self.index = cursor.context.newInstruction(word)
+        word = cursor.readWord()
+        self.variable = cursor.context.newInstruction(word)
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        for _ in range(3):
+            census.scanOperand(cursor)
     
     def readFromCpp(self, file: object, thisData: object):
         assert file.term in ("array_copy_1", "array_assign_1")
@@ -1920,16 +2096,21 @@ class arrayCopy2Instruction(parentArrayInstruction):
     def writeToCpp(self, indentLevel: int) -> (str, int, int):
         return f"array_copy_2({self.array.writeToCpp(indentLevel)[0]}, {self.index.writeToCpp(indentLevel)[0]}, {self.variableX.writeToCpp(indentLevel)[0]}, {self.variableY.writeToCpp(indentLevel)[0]});\n", indentLevel, 0
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         assert not self.disableExpression
-        getNextWord(wordsEnumerated, currentWord)
-        self.array = matchInstruction(currentWord.value)(currentWord.value, False)
-        getNextWord(wordsEnumerated, currentWord)
-        self.index = matchInstruction(currentWord.value)(currentWord.value, False)
-        getNextWord(wordsEnumerated, currentWord)
-        self.variableX = matchInstruction(currentWord.value)(currentWord.value, False)
-        getNextWord(wordsEnumerated, currentWord)
-        self.variableY = matchInstruction(currentWord.value)(currentWord.value, False)
+        word = cursor.readWord()
+        self.array = cursor.context.newInstruction(word)
+        word = cursor.readWord()
+        self.index = cursor.context.newInstruction(word)
+        word = cursor.readWord()
+        self.variableX = cursor.context.newInstruction(word)
+        word = cursor.readWord()
+        self.variableY = cursor.context.newInstruction(word)
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        for _ in range(4):
+            census.scanOperand(cursor)
     
     def readFromCpp(self, file: object, thisData: object):
         assert file.term in ("array_copy_2", "array_assign_2")
@@ -1970,18 +2151,23 @@ class arrayCopy3Instruction(parentArrayInstruction):
     def writeToCpp(self, indentLevel: int) -> (str, int, int):
         return f"array_copy_3({self.array.writeToCpp(indentLevel)[0]}, {self.index.writeToCpp(indentLevel)[0]}, {self.variableX.writeToCpp(indentLevel)[0]}, {self.variableY.writeToCpp(indentLevel)[0]}, {self.variableZ.writeToCpp(indentLevel)[0]});\n", indentLevel, 0
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         assert not self.disableExpression
-        getNextWord(wordsEnumerated, currentWord)
-        self.array = matchInstruction(currentWord.value)(currentWord.value, False)
-        getNextWord(wordsEnumerated, currentWord)
-        self.index = matchInstruction(currentWord.value)(currentWord.value, False)
-        getNextWord(wordsEnumerated, currentWord)
-        self.variableX = matchInstruction(currentWord.value)(currentWord.value, False)
-        getNextWord(wordsEnumerated, currentWord)
-        self.variableY = matchInstruction(currentWord.value)(currentWord.value, False)
-        getNextWord(wordsEnumerated, currentWord)
-        self.variableZ = matchInstruction(currentWord.value)(currentWord.value, False)
+        word = cursor.readWord()
+        self.array = cursor.context.newInstruction(word)
+        word = cursor.readWord()
+        self.index = cursor.context.newInstruction(word)
+        word = cursor.readWord()
+        self.variableX = cursor.context.newInstruction(word)
+        word = cursor.readWord()
+        self.variableY = cursor.context.newInstruction(word)
+        word = cursor.readWord()
+        self.variableZ = cursor.context.newInstruction(word)
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        for _ in range(5):
+            census.scanOperand(cursor)
     
     def readFromCpp(self, file: object, thisData: object):
         assert file.term in ("array_copy_3", "array_assign_3")
@@ -2025,14 +2211,19 @@ class arrayAssignmentInstruction(parentArrayInstruction):
     def writeToCpp(self, indentLevel: int) -> (str, int, int):
         return f"{self.array.writeToCpp(indentLevel)[0]}[{self.index.writeToCpp(indentLevel)[0]}] = {self.variable.writeToCpp(indentLevel)[0]};\n", indentLevel, 0
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         assert not self.disableExpression
-        getNextWord(wordsEnumerated, currentWord)
-        self.array = matchInstruction(currentWord.value)(currentWord.value, False)
-        getNextWord(wordsEnumerated, currentWord)
-        self.index = matchInstruction(currentWord.value)(currentWord.value, False)
-        getNextWord(wordsEnumerated, currentWord)
-        self.variable = matchInstruction(currentWord.value)(currentWord.value, False)
+        word = cursor.readWord()
+        self.array = cursor.context.newInstruction(word)
+        word = cursor.readWord()
+        self.index = cursor.context.newInstruction(word)
+        word = cursor.readWord()
+        self.variable = cursor.context.newInstruction(word)
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        for _ in range(3):
+            census.scanOperand(cursor)
     
     def readFromCpp(self, file: object, thisData: object):
         self.readArrayFromCpp(file, thisData, '[')
@@ -2062,17 +2253,22 @@ class arrayGetIndexInstruction(parentArrayInstruction):
     def writeToCpp(self, indentLevel: int) -> (str, int, int):
         return f"index({self.array.writeToCpp(indentLevel)[0]}, {self.unknown.writeToCpp(indentLevel)[0]}, {self.variable.writeToCpp(indentLevel)[0]});\n", indentLevel, 0
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         assert not self.disableExpression
-        getNextWord(wordsEnumerated, currentWord)
-        self.array = matchInstruction(currentWord.value, True)(currentWord.value, False)
-        self.array.readFromKsm(wordsEnumerated, currentWord)
-        getNextWord(wordsEnumerated, currentWord)
-        self.unknown = matchInstruction(currentWord.value)(currentWord.value, False)
-        self.unknown.readFromKsm(wordsEnumerated, currentWord)
-        getNextWord(wordsEnumerated, currentWord)
-        self.variable = matchInstruction(currentWord.value)(currentWord.value, False)
-        self.variable.readFromKsm(wordsEnumerated, currentWord)
+        word = cursor.readWord()
+        self.array = cursor.context.newInstruction(word)
+        self.array.readFromKsm(cursor)
+        word = cursor.readWord()
+        self.unknown = cursor.context.newInstruction(word)
+        self.unknown.readFromKsm(cursor)
+        word = cursor.readWord()
+        self.variable = cursor.context.newInstruction(word)
+        self.variable.readFromKsm(cursor)
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        for _ in range(3):
+            census.scanValue(cursor)
     
     def readFromCpp(self, file: object, thisData: object):
         assert file.term == "index"
@@ -2119,12 +2315,17 @@ class unidentified76Instruction(parentInstruction):
     def writeToCpp(self, indentLevel: int) -> (str, int, int):
         return f"unidentified_76({self.variable.writeToCpp(indentLevel)[0]}, {self.value.writeToCpp(indentLevel)[0]});\n", indentLevel, 0
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         assert not self.disableExpression
-        getNextWord(wordsEnumerated, currentWord)
-        self.variable = matchInstruction(currentWord.value, True)(currentWord.value, False)
-        self.variable.readFromKsm(wordsEnumerated, currentWord)
-        self.value = readPotentialExpression(wordsEnumerated, currentWord, self.disableExpression)
+        word = cursor.readWord()
+        self.variable = cursor.context.newInstruction(word)
+        self.variable.readFromKsm(cursor)
+        self.value = readPotentialExpression(cursor, self.disableExpression)
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        census.scanValue(cursor)
+        census.scanPotentialExpression(cursor, disableExpression)
     
     def readFromCpp(self, file: object, thisData: object):
         assert file.term == "unidentified_76"
@@ -2192,11 +2393,16 @@ class functionAssignmentInstruction(assignmentInstruction):
         cppText = f"{assigneeText} {'*' if self.disableExpression else ''}= funcref {valueText}{'' if valueText.endswith('{\n') else ';\n'}"
         return cppText, indentLevel, indentOffsetNextLine
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
-        getNextWord(wordsEnumerated, currentWord)
-        self.assignee = matchInstruction(currentWord.value)(currentWord.value, False)
-        getNextWord(wordsEnumerated, currentWord)
-        self.value = matchInstruction(currentWord.value)(currentWord.value, False)
+    def readFromKsm(self, cursor: wordCursor):
+        word = cursor.readWord()
+        self.assignee = cursor.context.newInstruction(word)
+        word = cursor.readWord()
+        self.value = cursor.context.newInstruction(word)
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        census.scanOperand(cursor)
+        census.scanOperand(cursor)
     
     def readFromCpp(self, file: object, thisData: object):
         self.variable = expression()
@@ -2295,10 +2501,14 @@ class castInstruction(parentInstruction):
     def writeToCpp(self, indentLevel: int) -> (str, int, int):
         return f"{self.name}({self.value.writeToCpp(indentLevel)[0]});\n", indentLevel, 0
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         assert not self.disableExpression
-        getNextWord(wordsEnumerated, currentWord)
-        self.value = matchInstruction(currentWord.value)(currentWord.value, False)
+        word = cursor.readWord()
+        self.value = cursor.context.newInstruction(word)
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        census.scanOperand(cursor)
     
     def readFromCpp(self, file: object, thisData: object):
         assert file.term == self.name
@@ -2340,8 +2550,12 @@ class sleepUntilCompleteInstruction(parentInstruction):
         cppText = f"sleep_until_complete{'*' if self.disableExpression else ''} {self.thread.writeToCpp(indentLevel)[0]};\n"
         return cppText, indentLevel, 0
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
-        self.thread = readPotentialExpression(wordsEnumerated, currentWord, self.disableExpression)
+    def readFromKsm(self, cursor: wordCursor):
+        self.thread = readPotentialExpression(cursor, self.disableExpression)
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        census.scanPotentialExpression(cursor, disableExpression)
     
     def readFromCpp(self, file: object, thisData: object):
         assert file.term == "sleep_until_complete"
@@ -2368,13 +2582,19 @@ class formatStringInstruction(parentInstruction):
         cppText = f"format({self.assignee.writeToCpp(indentLevel)[0]}, {self.string.writeToCpp(indentLevel)[0]}, {argText});\n"
         return cppText, indentLevel, 0
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         assert not self.disableExpression
-        getNextWord(wordsEnumerated, currentWord)
-        self.assignee = matchInstruction(currentWord.value)(currentWord.value, False)
-        getNextWord(wordsEnumerated, currentWord)
-        self.string = matchInstruction(currentWord.value)(currentWord.value, False)
-        self.arguments = readPotentialExpression(wordsEnumerated, currentWord, self.disableExpression)
+        word = cursor.readWord()
+        self.assignee = cursor.context.newInstruction(word)
+        word = cursor.readWord()
+        self.string = cursor.context.newInstruction(word)
+        self.arguments = readPotentialExpression(cursor, self.disableExpression)
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        census.scanOperand(cursor)
+        census.scanOperand(cursor)
+        census.scanPotentialExpression(cursor, disableExpression)
     
     def readFromCpp(self, file: object, thisData: object):
         assert file.term == "format"
@@ -2451,12 +2671,17 @@ class assignmentReferenceArrayInstruction(parentArrayInstruction):
         cppText = f"{assigneeText} = {valueText};\n"
         return cppText, indentLevel, indentOffsetNextLine
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         assert not self.disableExpression
-        getNextWord(wordsEnumerated, currentWord)
-        self.assignee = matchInstruction(currentWord.value)(currentWord.value, False)
-        getNextWord(wordsEnumerated, currentWord)
-        self.array = matchInstruction(currentWord.value)(currentWord.value, False)
+        word = cursor.readWord()
+        self.assignee = cursor.context.newInstruction(word)
+        word = cursor.readWord()
+        self.array = cursor.context.newInstruction(word)
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        census.scanOperand(cursor)
+        census.scanOperand(cursor)
     
     def readFromCpp(self, file: object, thisData: object):
         self.variable = expression()
@@ -2557,20 +2782,25 @@ class variableReferenceArrayGetIndexInstruction(arrayGetIndexInstruction):
 class boolArrayOpenInstruction(parentArrayOpenInstruction):
     dataTypeString = "bool_array"
     dataType = arrayDataType.Bool
-    def readArrayContents(self, wordsEnumerated: enumerate[int], currentWord: object) -> Generator[str]:
+    def readArrayContents(self, cursor: wordCursor) -> Generator[str]:
         for _ in range(self.length // 4):
-            getNextWord(wordsEnumerated, currentWord)
+            word = cursor.readWord()
             for bitshift in range(4):
-                newVal = (currentWord.value >> (bitshift * 8)) & 0xff
+                newVal = (word >> (bitshift * 8)) & 0xff
                 assert newVal <= 1
                 yield "true" if newVal else "false"
         extraLength = self.length % 4
         if extraLength != 0:
-            getNextWord(wordsEnumerated, currentWord)
+            word = cursor.readWord()
             for bitshift in range(extraLength):
-                newVal = (currentWord.value >> (bitshift * 8)) & 0xff
+                newVal = (word >> (bitshift * 8)) & 0xff
                 assert newVal <= 1
                 yield "true" if newVal else "false"
+    
+    @classmethod
+    def scanArrayContents(cls, cursor: wordCursor, census: object, length: int):
+        # four bools to a word
+        cursor.skip((length + 3) // 4)
             
     def writeToKsm(self, section: object):
         super().writeToKsm(section)
@@ -2602,10 +2832,14 @@ class getDataTypeInstruction(parentInstruction):
         cppText = f"type {self.value.writeToCpp(indentLevel)[0]};\n"
         return cppText, indentLevel, 0
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         assert not self.disableExpression
-        getNextWord(wordsEnumerated, currentWord)
-        self.value = matchInstruction(currentWord.value)(currentWord.value, False)
+        word = cursor.readWord()
+        self.value = cursor.context.newInstruction(word)
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        census.scanOperand(cursor)
     
     def readFromCpp(self, file: object, thisData: object):
         assert file.term == "type"
@@ -2628,16 +2862,21 @@ class sleepWhileInstruction(parentInstruction):
         cppText = f"sleep_while {self.condition.writeToCpp(indentLevel)[0]};\n"
         return cppText, indentLevel, 0
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
+    def readFromKsm(self, cursor: wordCursor):
         #assert not self.disableExpression
         self.condition = expression()
-        self.condition.readFromKsm(wordsEnumerated, currentWord)
+        self.condition.readFromKsm(cursor)
         
         #unused - discard
-        getNextWord(wordsEnumerated, currentWord)
-        assert currentWord.value == 0x00000000
-        getNextWord(wordsEnumerated, currentWord)
-        assert currentWord.value == 0x00000000
+        word = cursor.readWord()
+        assert word == 0x00000000
+        word = cursor.readWord()
+        assert word == 0x00000000
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        census.scanExpression(cursor)
+        cursor.skip(2)
     
     def readFromCpp(self, file: object, thisData: object):
         assert file.term == "sleep_while"
@@ -2672,12 +2911,18 @@ class assertInstruction(parentInstruction):
             cppText = f"assert{'*' if self.disableExpression else ''}({self.condition.writeToCpp(indentLevel)[0]}, {self.message.writeToCpp(indentLevel)[0]}, {formatExprListText});\n"
         return cppText, indentLevel, 0
     
-    def readFromKsm(self, wordsEnumerated: enumerate[int], currentWord: object):
-        self.condition = readPotentialExpression(wordsEnumerated, currentWord, self.disableExpression)
-        getNextWord(wordsEnumerated, currentWord)
-        self.message = matchInstruction(currentWord.value)(currentWord.value, False)
+    def readFromKsm(self, cursor: wordCursor):
+        self.condition = readPotentialExpression(cursor, self.disableExpression)
+        word = cursor.readWord()
+        self.message = cursor.context.newInstruction(word)
         self.formatExpr = expression()
-        self.formatExpr.readFromKsm(wordsEnumerated, currentWord)
+        self.formatExpr.readFromKsm(cursor)
+    
+    @classmethod
+    def scanKsm(cls, cursor: wordCursor, census: object, disableExpression: bool):
+        census.scanPotentialExpression(cursor, disableExpression)
+        census.scanOperand(cursor)
+        census.scanExpression(cursor)
     
     def readFromCpp(self, file: object, thisData: object):
         assert file.term == "assert"
@@ -2723,56 +2968,72 @@ class assertInstruction(parentInstruction):
         closeExpressionInstruction().writeToKsm(section)
 
 #anything larger than 0x01ff is assumed to be a variable
+#the variable's definition is kept rather than copied, only the name can differ from it
 class variableInstruction(parentInstruction):
-    name = None
-    alias = None
-    scope = None
-    isVariableDeclaration = False
+    __slots__ = ("context", "function", "variableDef", "name", "isVariableDeclaration")
     
-    def __init__(self, instructionID: int | None = None, disableExpression: bool = False):
+    def __init__(self, instructionID: int | None = None, disableExpression: bool = False, context: object = None):
         parentInstruction.__init__(self, instructionID, disableExpression)
-        if currentFunctionTree:
-            variableDef = variableDictGet(self.instructionID, currentFunctionTree[-1])
-        else:
-            variableDef = variableDictGet(self.instructionID)
-            
-        self.isVariableDef = False
-        if currentFunctionTree:
-            self.function = currentFunctionTree[-1]
+        self.context = context
+        self.name = None
+        self.isVariableDeclaration = False
+        if context is not None and context.functionTree:
+            self.function = context.functionTree[-1]
         else:
             self.function = None
+        if context is not None:
+            variableDef = context.variableDictGet(self.instructionID, self.function)
+        else:
+            # built while compiling a *.cksm, nothing was decoded so only temporary variables are known
+            variableDef = temporaryVariableGet(self.instructionID)
+        self.variableDef = variableDef
+        
         if variableDef is not None:
-            self.isVariableDef = True
             self.name = variableDef.name
-            self.alias = variableDef.alias
-            self.scope = variableDef.scope
-            self.value = variableDef.value
-            self.dataTypeString = variableDef.dataTypeString
             if self.scope in (variableScope.tempVar, variableScope.localVar):
-                if currentFunctionTree:
+                if self.function is not None:
                     if self.scope == variableScope.tempVar:
-                        if (baseID := (self.instructionID & 0xfffff0ff)) not in currentFunctionTree[-1].declaredLocals:
-                            currentFunctionTree[-1].declaredLocals.add(baseID)
+                        if (baseID := (self.instructionID & 0xfffff0ff)) not in self.function.declaredLocals:
+                            self.function.declaredLocals.add(baseID)
                             self.isVariableDeclaration = True
-                        assert currentFunctionTree[-1].tempVarFlags[variableDef.identifier & 0xff]
-                    elif self.instructionID not in currentFunctionTree[-1].declaredLocals:
-                        currentFunctionTree[-1].declaredLocals.add(self.instructionID)
+                        assert self.function.tempVarFlags[variableDef.identifier & 0xff]
+                    elif self.instructionID not in self.function.declaredLocals:
+                        self.function.declaredLocals.add(self.instructionID)
                         self.isVariableDeclaration = True
             
-            elif variableDef.identifier not in variableIDsDefinedInCpp:
-                variableIDsDefinedInCpp.add(variableDef.identifier)
+            elif context is not None and variableDef.identifier not in context.variableIDsDefinedInCpp:
+                context.variableIDsDefinedInCpp.add(variableDef.identifier)
                 self.isVariableDeclaration = True
             
-            if currentFunctionTree:
-                if self.scope == variableScope.localVar and self.instructionID == currentFunctionTree[-1].accumulatorID:
+            if self.function is not None:
+                if self.scope == variableScope.localVar and self.instructionID == self.function.accumulatorID:
                     self.name = "accumulator"
             return
         
-        ArrayDef = arrayDefinitionDictByIDGet(self.instructionID, currentFunctionTree)
-        if not ArrayDef is None:
-            self.name = ArrayDef.name
-        self.isConst = False
-        
+        if context is not None:
+            ArrayDef = context.arrayDefinitionDictByIDGet(self.instructionID, context.functionTree)
+            if not ArrayDef is None:
+                self.name = ArrayDef.name
+    
+    @property
+    def isVariableDef(self) -> bool:
+        return self.variableDef is not None
+    
+    @property
+    def alias(self) -> str | None:
+        return None if self.variableDef is None else self.variableDef.alias
+    
+    @property
+    def scope(self) -> variableScope | None:
+        return None if self.variableDef is None else self.variableDef.scope
+    
+    @property
+    def value(self) -> int | float | str | bool | None:
+        return self.variableDef.value
+    
+    @property
+    def dataTypeString(self) -> str | None:
+        return self.variableDef.dataTypeString
     
     def writeToCpp(self, indentLevel: int) -> (str, int, int):
         if self.scope == variableScope.const:
@@ -2782,11 +3043,11 @@ class variableInstruction(parentInstruction):
         if self.isVariableDeclaration:
             scopeTxt = variableScopeEnumIntToStringDictGet(self.scope)
             prefixTxt = f"{scopeTxt} "
-            if versionRaw < 0x00010302 and self.scope == variableScope.localVar and self.function.localVariableTypes[int(self.alias[8:])] == "ref":
+            if self.context.profile.versionRaw < 0x00010302 and self.scope == variableScope.localVar and self.function.localVariableTypes[int(self.alias[8:])] == "ref":
                 prefixTxt += "ref "
             if not self.scope in (variableScope.tempVar, variableScope.localVar, variableScope.tempStaticVar):
                 prefixTxt += f"{self.dataTypeString} "
-        elif self.isVariableDef and self.dataTypeString == "func" and arrayDefinitionDictByNameGet(self.name, self.function) is None:
+        elif self.isVariableDef and self.dataTypeString == "func" and self.context.arrayDefinitionDictByNameGet(self.name, self.function) is None:
             prefixTxt += f"{self.dataTypeString} "
         
         if not self.name is None:
@@ -2797,11 +3058,13 @@ class variableInstruction(parentInstruction):
         return f"undef_{hex(self.instructionID)}", indentLevel, 0
 
 class calledFunctionInstruction(parentInstruction):
-    name = None
-    def __init__(self, instructionID: int | None = None, disableExpression: bool = False):
+    __slots__ = ("name",)
+    
+    def __init__(self, instructionID: int | None = None, disableExpression: bool = False, context: object = None):
         parentInstruction.__init__(self, instructionID, disableExpression)
+        self.name = None
         
-        linkedFunctionDefinition = functionDefinitionDictGet(self.instructionID)
+        linkedFunctionDefinition = context.functionDefinitionDictGet(self.instructionID) if context is not None else None
         if not linkedFunctionDefinition is None:
             self.name = linkedFunctionDefinition.name
         
@@ -2814,11 +3077,12 @@ class calledFunctionInstruction(parentInstruction):
         return self.name, indentLevel, 0
 
 class importedInstruction(parentInstruction):
-    name = None
-    def __init__(self, instructionID: int | None = None, disableExpression: bool = False):
+    __slots__ = ("name", "importDefinition")
+    
+    def __init__(self, instructionID: int | None = None, disableExpression: bool = False, context: object = None):
         parentInstruction.__init__(self, instructionID, disableExpression)
         
-        self.importDefinition = importDefinitionDictGet(self.instructionID)
+        self.importDefinition = context.importDefinitionDictGet(self.instructionID) if context is not None else None
         if self.importDefinition is None:
             self.name = "undef_" + hex(self.instructionID)
         else:
@@ -2830,44 +3094,93 @@ class importedInstruction(parentInstruction):
         
         return self.name, indentLevel, 0
 
-def matchInstruction(instructionID: int, biasForVariables: bool = True) -> parentInstruction:
-    if not functionDefinitionDictGet(instructionID) is None:
-        return calledFunctionInstruction
-    
-    if (instructionID & 0xffff0000):
-        return variableInstruction
-    
-    if versionRaw >= 0x00010302:
-        if 0x3e <= instructionID <= 0x53:
-            checkForTargetInstruction(instructionID)
-            return operatorInstruction
-    elif 0x41 <= instructionID <= 0x56:
-        checkForTargetInstruction(instructionID)
-        return operatorInstruction
-    
-    if (instructionID & 0xff) > maxInstructionID or (biasForVariables and (instructionID & 0xff00)):
-        return importedInstruction
-    
-    checkForTargetInstruction(instructionID)
-    if versionRaw >= 0x00010302:
-        return instructionDictAlt.get(instructionID, unknownInstruction)
-    return instructionDict.get(instructionID, unknownInstruction)
-
-def readPotentialExpression(wordsEnumerated: enumerate[int], currentWord: object, disableExpression: bool) -> parentInstruction | expression | None:
+def readPotentialExpression(cursor: wordCursor, disableExpression: bool) -> parentInstruction | expression | None:
     if disableExpression:
-        getNextWord(wordsEnumerated, currentWord)
-        readVal = matchInstruction(currentWord.value, True)(currentWord.value, False)
-        readVal.readFromKsm(wordsEnumerated, currentWord)
+        word = cursor.readWord()
+        readVal = cursor.context.newInstruction(word)
+        readVal.readFromKsm(cursor)
         if isinstance(readVal, closeExpressionInstruction):
             readVal = None
     else:
         readVal = expression()
-        readVal.readFromKsm(wordsEnumerated, currentWord)
+        readVal.readFromKsm(cursor)
         if not readVal.instructions:
             readVal = None
     return readVal
 
 
+#scan-only decoding: walks a code section word by word like readFromKsm does, but only counts opcodes
+#no instruction objects or text are created, the only definitions needed are functions (for local arrays) and arrays
+class opcodeCensus:
+    def __init__(self, context: object):
+        self.context = context
+        self.dispatchTable = context.profile.dispatchTable
+        self.scanTable = context.profile.scanTable
+        self.counts = [0] * 0x100
+        self.functionTree = list()
+    
+    def scanOperandWord(self, word: int) -> parentInstruction:
+        # variables, called functions and imports have no operands of their own
+        if word >= 0x100:
+            return parentInstruction
+        instructionType = self.dispatchTable[word]
+        if instructionType is not importedInstruction:
+            self.counts[word] += 1
+        return instructionType
+    
+    def scanOperand(self, cursor: wordCursor) -> parentInstruction:
+        return self.scanOperandWord(cursor.readWord())
+    
+    def scanValue(self, cursor: wordCursor) -> parentInstruction:
+        instructionType = self.scanOperandWord(cursor.readWord())
+        instructionType.scanKsm(cursor, self, False)
+        return instructionType
+    
+    def scanExpression(self, cursor: wordCursor) -> parentInstruction | None:
+        # returns the type of the first instruction, None when the expression is empty
+        # this is where almost every word of a script ends up, so it reads the words directly
+        words, dispatchTable, scanTable, counts = cursor.words, self.dispatchTable, self.scanTable, self.counts
+        firstType = None
+        position = cursor.position
+        while position < cursor.length:
+            word = words[position]
+            position += 1
+            if word >= 0x100:
+                instructionType = parentInstruction
+            else:
+                instructionType = dispatchTable[word]
+                if instructionType is not importedInstruction:
+                    counts[word] += 1
+                if instructionType is closeExpressionInstruction or instructionType is closeCallArgumentsInstruction:
+                    break
+                if (scanKsm := scanTable[word]) is not None:
+                    cursor.position = position
+                    scanKsm(cursor, self, False)
+                    position = cursor.position
+            if firstType is None:
+                firstType = instructionType
+        cursor.position = position
+        return firstType
+    
+    def scanPotentialExpression(self, cursor: wordCursor, disableExpression: bool):
+        if disableExpression:
+            self.scanValue(cursor)
+        else:
+            self.scanExpression(cursor)
+    
+    def scanSection(self, section: object) -> list[int]:
+        cursor = wordCursor(section.words)
+        while cursor.position < section.itemCount:
+            word = cursor.readWord()
+            if word & 0xffff0000:
+                continue
+            instructionType = self.scanOperandWord(word & 0xff)
+            if instructionType is endFileInstruction:
+                assert cursor.position == section.itemCount, hex((cursor.position - 1) * 4)
+                break
+            instructionType.scanKsm(cursor, self, bool(word & 0x0100))
+        return self.counts
+
 instructionDict = {
     0x00: nullInstruction,
     0x01: endFileInstruction,
@@ -3074,7 +3387,7 @@ instructionDictAlt = {
     
     0x26: endIfInstruction,
     
-    0x36: whileInstruction,    
+    0x36: whileInstructionAlt,    
     0x37: breakWhileInstruction,
     0x38: continueWhileInstruction,
     0x39: endWhileInstruction,
@@ -3135,268 +3448,317 @@ def getOperatorIdentifier(operator: str) -> int | None:
 def isBracketOrDelimiter(character: str) -> bool:
     return character in bracketsAndDelimiters
 
-targetInstructionID = None
-targetInstructionFound = None
-foundInstructions = set()
-def setTargetInstructionID(value: int | str):
-    global targetInstructionID
-    targetInstructionID = value
-def getTargetInstructionFound() -> bool | set[int]:
-    if not targetInstructionFound is None:
-        return targetInstructionFound
-    return foundInstructions
-def setTargetInstructionFound(value: bool):
-    global targetInstructionFound
-    targetInstructionFound = value
-
-def resetFoundInstructionsSet():
-    global foundInstructions
-    foundInstructions = set()
-
-def checkForTargetInstruction(instructionID: int):
-    global targetInstructionID, targetInstructionFound, foundInstructions
-    assert 0x00 <= instructionID <= maxInstructionID
-    if targetInstructionID == "all":
-        foundInstructions.add(instructionID)
-    elif not targetInstructionID is None and targetInstructionID == instructionID:
-        targetInstructionFound = True
-
-def setInstructionsVersionRaw(value: int):
-    global versionRaw
-    versionRaw = value
-
-def identifyInstructionFromCpp(file: object, thisData: object, aligned: bool = False) -> parentInstruction | None:
-    undirtyLine = file.line
-    if aligned:
-        undirtyTerm = file.term
-        terms = [file.term]
-        terms = [file.term] + [(file.getNextTerm(), file.term)[-1] for _ in range(4)]
-    else:
-        terms = []
-    while (file.getNextTerm(), file.term)[-1] is not None:
-        terms.append(file.term)
-    if len(terms) < 5:
-        terms += [None] * (5 - len(terms))
-    file.line = undirtyLine
-    if aligned:
-        file.term = undirtyTerm
-    else:
-        file.getNextTerm()
-    
-    if terms[0] == '"':
-        return
-    
-    nameIsVar = lambda term: term in thisData.definedVariables or (thisData.localDefinedVariablesTree and term in thisData.localDefinedVariablesTree[-1])
-    
-    if terms[0] == "null":
-        return nullInstruction()
-    if terms[0] == "noop":
-        return noopInstruction()
-    if terms[0] == "return":
-        return returnInstruction()
-    if terms[0] in ("private", "public"):
-        return openFunctionInstruction()
-    if terms[2] == '[':
-        if terms[0] == "thread":
-            return openThreadInstruction()
+def buildDispatchTable(operatorRange: range, operatorType: type[parentInstruction], maxID: int, instructions: dict[int, parentInstruction]) -> list[parentInstruction]:
+    table = list()
+    for instructionID in range(0x100):
+        if instructionID in operatorRange:
+            table.append(operatorType)
+        elif instructionID > maxID:
+            table.append(importedInstruction)
         else:
-            assert terms[0] == "childthread"
-            return openThreadChildInstruction()
-    if terms[0] == '}' and isinstance(thisData.bracesTree[-1], (openFunctionInstruction, openThreadInstruction)):
-        return closeFunctionInstruction()
-    if terms[0] == "goto":
-        if any(True for instruction in thisData.bracesTree if isinstance(instruction, switchInstruction)):
-            return caseGotoInstruction()
+            table.append(instructions.get(instructionID, unknownInstruction))
+    return table
+
+#everything that reads differently between KSM versions, picked once per file when its header is read
+#supporting a new version means adding a profile, the readers themselves don't check the version
+#the opcode tables are only built the first time a file of that version is read, building never needs them
+@dataclass(frozen=True)
+class formatProfile:
+    versionRaw: int
+    maxInstructionID: int
+    instructionDict: dict[int, parentInstruction]
+    operatorRange: range
+    operatorType: type[parentInstruction]
+    readTempVarFlags: Callable[[wordCursor], list[bool]]
+    readLocalVariables: Callable[[wordCursor, int], tuple]
+    readImportDefinition: Callable[[wordCursor], tuple]
+    variableDictGet: Callable[[dict[int, variable], int, object], variable | None]
+    
+    @cached_property
+    def dispatchTable(self) -> list[parentInstruction]:
+        return buildDispatchTable(self.operatorRange, self.operatorType, self.maxInstructionID, self.instructionDict)
+    
+    #scanKsm of every opcode, None for instructions that don't take any operands, so expressions can skip the call entirely
+    @cached_property
+    def scanTable(self) -> list[Callable | None]:
+        return [instructionType.scanKsm if instructionType.scanKsm.__func__ is not parentInstruction.scanKsm.__func__ else None for instructionType in self.dispatchTable]
+
+formatProfiles = {
+    0x00010300: formatProfile(
+        0x00010300, 0xa0, instructionDict, range(0x41, 0x57), operatorInstruction,
+        readTempVarFlags, readLocalVariables, readImportDefinitionsFromKsm, variableDictGet
+    ),
+    0x00010302: formatProfile(
+        0x00010302, 0x76, instructionDictAlt, range(0x3e, 0x54), operatorInstructionAlt,
+        readTempVarFlagsAlt, readLocalVariablesAlt, readImportDefinitionsFromKsmAlt, variableDictGetAlt
+    )
+}
+
+#everything decoding one KSM file builds up, instead of module globals
+#it rides along on the code section's cursor and is handed to every instruction that looks up an identifier
+#nothing is shared between two contexts, so files can be decoded side by side and are forgotten once they're done
+@dataclass
+class decodeContext:
+    profile: formatProfile
+    variableDict: dict[int, variable] = field(default_factory=dict)
+    functionDefinitionDict: dict[int, functionDefinition] = field(default_factory=dict)
+    importDefinitionDict: dict[int, importDefinition] = field(default_factory=dict)
+    arrayDefinitionDictByAddress: dict[int, arrayDefinition] = field(default_factory=dict)
+    arrayDefinitionDictByID: dict[int, arrayDefinition] = field(default_factory=dict)
+    arrayDefinitionDictByName: dict[str, arrayDefinition] = field(default_factory=dict)
+    functionTree: list[functionDefinition] = field(default_factory=list)
+    variableIDsDefinedInCpp: set[int] = field(default_factory=set)
+    
+    def variableDictGet(self, key: int, function: object = None) -> variable | None:
+        return self.profile.variableDictGet(self.variableDict, key, function)
+    
+    def functionDefinitionDictGet(self, key: int) -> functionDefinition | None:
+        return self.functionDefinitionDict.get(key, None)
+    
+    def importDefinitionDictGet(self, key: int) -> importDefinition | None:
+        return self.importDefinitionDict.get(key, None)
+    
+    def arrayDefinitionDictByAddressGet(self, key: int, functionTree: list[functionDefinition] = []) -> arrayDefinition | None:
+        if functionTree:
+            potentialMatch = functionTree[-1].localArraysByAddress.get(key, None)
+            if not potentialMatch is None:
+                return potentialMatch
+        return self.arrayDefinitionDictByAddress.get(key, None)
+    
+    def arrayDefinitionDictByIDGet(self, key: int, functionTree: list[functionDefinition] = []) -> arrayDefinition | None:
+        if functionTree:
+            potentialMatch = functionTree[-1].localArraysByID.get(key, None)
+            if not potentialMatch is None:
+                return potentialMatch
+        return self.arrayDefinitionDictByID.get(key, None)
+    
+    def arrayDefinitionDictByNameGet(self, key: str, function: functionDefinition | None = None) -> arrayDefinition | None:
+        if function is not None:
+            potentialMatch = function.localArraysByName.get(key, None)
+            if potentialMatch is not None:
+                return potentialMatch
+        return self.arrayDefinitionDictByName.get(key, None)
+    
+    def matchInstruction(self, instructionID: int, biasForVariables: bool = True) -> parentInstruction:
+        # plain opcodes are a single lookup into the table for this file's version
+        # function, variable and import identifiers always carry bits above 0xff so they never land here
+        if instructionID < 0x100:
+            return self.profile.dispatchTable[instructionID]
+        
+        if not self.functionDefinitionDictGet(instructionID) is None:
+            return calledFunctionInstruction
+        
+        if (instructionID & 0xffff0000):
+            return variableInstruction
+        
+        if (instructionID & 0xff) > self.profile.maxInstructionID or (biasForVariables and (instructionID & 0xff00)):
+            return importedInstruction
+        
+        return self.profile.instructionDict.get(instructionID, unknownInstruction)
+    
+    def newInstruction(self, instructionID: int, biasForVariables: bool = True, disableExpression: bool = False) -> parentInstruction:
+        return self.matchInstruction(instructionID, biasForVariables)(instructionID, disableExpression, self)
+    
+    #with a profiler every instruction made from here on, nested operands included, has its matchInstruction timed by the class it matched
+    #the timed newInstruction only replaces this context's own, contexts without a profiler never branch on one
+    def setProfiler(self, profiler: object):
+        matchInstruction = self.matchInstruction
+        def newInstruction(instructionID: int, biasForVariables: bool = True, disableExpression: bool = False) -> parentInstruction:
+            start = perf_counter()
+            instructionClass = matchInstruction(instructionID, biasForVariables)
+            seconds = perf_counter() - start
+            thisInstruction = instructionClass(instructionID, disableExpression, self)
+            profiler.record("matchInstruction", thisInstruction, seconds)
+            return thisInstruction
+        self.newInstruction = newInstruction
+
+#the braces that are open while compiling, innermost last
+#keeps track of the switch and while blocks among them as they are opened and closed, so goto and break never have to walk the stack
+class bracesStack(list):
+    def __init__(self):
+        super().__init__()
+        self.switchCount = 0
+        self.breakableTree = list()
+    
+    def track(self, instruction: parentInstruction, opened: bool):
+        if not isinstance(instruction, (switchInstruction, whileInstruction)):
+            return
+        if isinstance(instruction, switchInstruction):
+            self.switchCount += 1 if opened else -1
+        if opened:
+            self.breakableTree.append(instruction)
         else:
-            return gotoInstruction()
+            assert self.breakableTree.pop(-1) is instruction
+    
+    def append(self, instruction: parentInstruction):
+        super().append(instruction)
+        self.track(instruction, True)
+    
+    def pop(self, index: int = -1) -> parentInstruction:
+        instruction = super().pop(index)
+        self.track(instruction, False)
+        return instruction
+    
+    def __setitem__(self, index: int, instruction: parentInstruction):
+        self.track(self[index], False)
+        super().__setitem__(index, instruction)
+        self.track(instruction, True)
+
+def isVariableName(term: str, thisData: object) -> bool:
+    return term in thisData.definedVariables or (thisData.localDefinedVariablesTree and term in thisData.localDefinedVariablesTree[-1])
+
+def isArrayName(term: str, thisData: object) -> bool:
+    return term in thisData.definedGlobalArrays or (thisData.localDefinedArraysTree and term in thisData.localDefinedArraysTree[-1])
+
+ifComparisonDict = {
+    '==': ifEqualInstruction,
+    '!=': ifNotEqualInstruction,
+    '>': ifGreaterThanInstruction,
+    '<': ifLessThanInstruction,
+    '>=': ifGreaterThanOrEqualInstruction,
+    '<=': ifLessThanOrEqualInstruction
+}
+
+caseComparisonDict = {
+    '!=': caseNotEqualInstruction,
+    '>': caseGreaterThanInstruction,
+    '<': caseLessThanInstruction,
+    '>=': caseGreaterThanOrEqualInstruction,
+    '<=': caseLessThanOrEqualInstruction
+}
+
+def classifyThread(terms: object, thisData: object) -> type[parentInstruction] | None:
+    isChild = terms[0] == "childthread"
+    if terms[2] == '[':
+        return openThreadChildInstruction if isChild else openThreadInstruction
     if terms[2] == '(' or terms[2] == '*' and terms[3] == '(':
-        if terms[0] == "thread":
-            if nameIsVar(terms[1]):
-                return variableThreadCallInstruction()
-            return threadCallInstruction()
-        if terms[0] == "childthread":
-            if nameIsVar(terms[1]):
-                return variableThreadCallChildInstruction()
-            return threadCallChildInstruction()
-    if terms[0] == "delete":
-        return deleteVariableInstruction()
-    if terms[0] == "unidentified_13":
-        return unidentified13Instruction()
-    if terms[0] == "unidentified_14":
-        return unidentified14Instruction()
-    if terms[0] == "is_incomplete":
-        return isChildThreadIncompleteInstruction()
-    if terms[0] == "sleep_frames":
-        return sleepFramesInstruction()
-    if terms[0] == "sleep_milliseconds":
-        return sleepMillisecondsInstruction()
-    if terms[0] == "if":
-        match terms[1]:
-            case '==':
-                return ifEqualInstruction()
-            case '!=':
-                return ifNotEqualInstruction()
-            case '>':
-                return ifGreaterThanInstruction()
-            case '<':
-                return ifLessThanInstruction()
-            case '>=':
-                return ifGreaterThanOrEqualInstruction()
-            case '<=':
-                return ifLessThanOrEqualInstruction()
-            case _:
-                return ifInstruction()
-    if terms[0] == '}' and isinstance(thisData.bracesTree[-1], (ifInstruction, ifEqualInstruction, elseIfInstruction, elseInstruction)):
+        if isVariableName(terms[1], thisData):
+            return variableThreadCallChildInstruction if isChild else variableThreadCallInstruction
+        return threadCallChildInstruction if isChild else threadCallInstruction
+    return None
+
+def classifyClosingBrace(terms: object, thisData: object) -> type[parentInstruction] | None:
+    openedBy = thisData.bracesTree[-1]
+    if isinstance(openedBy, (openFunctionInstruction, openThreadInstruction)):
+        return closeFunctionInstruction
+    if isinstance(openedBy, (ifInstruction, ifEqualInstruction, elseIfInstruction, elseInstruction)):
         if terms[1] == "else":
-            if terms[2] == "if":
-                return elseIfInstruction()
-            else:
-                return elseInstruction()
-        else:
-            return endIfInstruction()
-    if terms[0] == "switch":
-        return switchInstruction()
-    if terms[0] == "case":
-        match terms[1]:
-            case '!=':
-                return caseNotEqualInstruction()
-            case '>':
-                return caseGreaterThanInstruction()
-            case '<':
-                return caseLessThanInstruction()
-            case '>=':
-                return caseGreaterThanOrEqualInstruction()
-            case '<=':
-                return caseLessThanOrEqualInstruction()
-            case _:
-                if terms[2] == '...':
-                    return caseRangeInstruction()
-                else:
-                    return caseInstruction()
-    if terms[0] == "default":
-        return caseDefaultInstruction()
-    if terms[0] == "break":
-        for instruction in thisData.bracesTree[::-1]:
-            if isinstance(instruction, switchInstruction):
-                breakType = switchInstruction
-                break
-            elif isinstance(instruction, whileInstruction):
-                breakType = whileInstruction
-                break
-        else:
-            breakType = None
-        return breakSwitchInstruction() if breakType == switchInstruction else breakWhileInstruction()
-    if terms[0] == '}' and isinstance(thisData.bracesTree[-1], (switchInstruction, caseInstruction)):
-        return endSwitchInstruction()
-    if terms[0] == "while":
-        return whileInstruction()
-    if terms[0] == "continue":
-        return continueWhileInstruction()
-    if terms[0] == '}' and isinstance(thisData.bracesTree[-1], whileInstruction):
-        return endWhileInstruction()
-    
-    match terms[0]:
-        case "add":
-            return addInstruction()
-        case "subtract":
-            return subtractInstruction()
-        case "multiply":
-            return multiplyInstruction()
-        case "divide":
-            return divideInstruction()
-        case "modulo":
-            return moduloInstruction()
-        case "logical_or":
-            return logicalOrInstruction()
-        case "logical_and":
-            return logicalAndInstruction()
-        case "bitwise_or":
-            return bitwiseOrInstruction()
-        case "bitwise_and":
-            return bitwiseAndInstruction()
-        case "bitwise_xor":
-            return bitwiseExclusiveOrInstruction()
-        case "bitshift_left":
-            return bitShiftLeftInstruction()
-        case "bitshift_right":
-            return bitShiftRightInstruction()
-        case _:
-            pass
-    
-    if terms[0] == "var_array":
-        return variableArrayOpenInstruction()
-    if terms[0] == "int_array":
-        return intArrayOpenInstruction()
-    if terms[0] == "float_array":
-        return floatArrayOpenInstruction()
-    if terms[0] == "bool_array":
-        return boolArrayOpenInstruction()
-    
-    isArray = lambda term: term in thisData.definedGlobalArrays or term in thisData.localDefinedArraysTree[-1]
-    
-    if terms[0] == "length":
-        return getArrayLengthInstruction() if isArray(terms[1]) else getVariableReferenceArrayLengthInstruction()
+            return elseIfInstruction if terms[2] == "if" else elseInstruction
+        return endIfInstruction
+    if isinstance(openedBy, (switchInstruction, caseInstruction)):
+        return endSwitchInstruction
+    if isinstance(openedBy, whileInstruction):
+        return endWhileInstruction
+    return None
+
+def classifyGoto(terms: object, thisData: object) -> type[parentInstruction]:
+    return caseGotoInstruction if thisData.bracesTree.switchCount else gotoInstruction
+
+def classifyIf(terms: object, thisData: object) -> type[parentInstruction]:
+    return ifComparisonDict.get(terms[1], ifInstruction)
+
+def classifyCase(terms: object, thisData: object) -> type[parentInstruction]:
+    if (instructionType := caseComparisonDict.get(terms[1])) is not None:
+        return instructionType
+    return caseRangeInstruction if terms[2] == '...' else caseInstruction
+
+def classifyBreak(terms: object, thisData: object) -> type[parentInstruction]:
+    breakableTree = thisData.bracesTree.breakableTree
+    return breakSwitchInstruction if breakableTree and isinstance(breakableTree[-1], switchInstruction) else breakWhileInstruction
+
+def classifyLength(terms: object, thisData: object) -> type[parentInstruction]:
+    return getArrayLengthInstruction if isArrayName(terms[1], thisData) else getVariableReferenceArrayLengthInstruction
+
+#array builtins whose first argument picks between the array and variable reference versions
+#these never shadow an array of the same name, "index[0] = 1" is still an array assignment
+def classifyArrayArgument(arrayInstruction: type[parentInstruction], referenceInstruction: type[parentInstruction]) -> Callable:
+    return lambda terms, thisData: None if terms[1] == '[' else arrayInstruction if isArrayName(terms[2], thisData) else referenceInstruction
+
+#keywords that don't shadow an array of the same name either
+def classifyUnlessSubscripted(instructionType: type[parentInstruction]) -> Callable:
+    return lambda terms, thisData: None if terms[1] == '[' else instructionType
+
+def classifyCast(instructionType: type[parentInstruction]) -> Callable:
+    return lambda terms, thisData: instructionType if terms[1] == '(' else None
+
+#statements told apart by their first term, a new statement only needs an entry here
+#entries are either the instruction itself or a function of the statement's terms and thisData returning one
+#a function returning None hands the statement on to identifyUnkeyedStatement
+cppStatementDict = {
+    "null": nullInstruction,
+    "noop": noopInstruction,
+    "return": returnInstruction,
+    "private": openFunctionInstruction,
+    "public": openFunctionInstruction,
+    "thread": classifyThread,
+    "childthread": classifyThread,
+    '}': classifyClosingBrace,
+    "goto": classifyGoto,
+    "delete": deleteVariableInstruction,
+    "unidentified_13": unidentified13Instruction,
+    "unidentified_14": unidentified14Instruction,
+    "is_incomplete": isChildThreadIncompleteInstruction,
+    "sleep_frames": sleepFramesInstruction,
+    "sleep_milliseconds": sleepMillisecondsInstruction,
+    "if": classifyIf,
+    "switch": switchInstruction,
+    "case": classifyCase,
+    "default": caseDefaultInstruction,
+    "break": classifyBreak,
+    "while": whileInstruction,
+    "continue": continueWhileInstruction,
+    "add": addInstruction,
+    "subtract": subtractInstruction,
+    "multiply": multiplyInstruction,
+    "divide": divideInstruction,
+    "modulo": moduloInstruction,
+    "logical_or": logicalOrInstruction,
+    "logical_and": logicalAndInstruction,
+    "bitwise_or": bitwiseOrInstruction,
+    "bitwise_and": bitwiseAndInstruction,
+    "bitwise_xor": bitwiseExclusiveOrInstruction,
+    "bitshift_left": bitShiftLeftInstruction,
+    "bitshift_right": bitShiftRightInstruction,
+    "var_array": variableArrayOpenInstruction,
+    "int_array": intArrayOpenInstruction,
+    "float_array": floatArrayOpenInstruction,
+    "bool_array": boolArrayOpenInstruction,
+    "length": classifyLength,
+    "array_copy_1": classifyArrayArgument(arrayCopy1Instruction, variableReferenceArrayCopy1Instruction),
+    "array_copy_2": classifyArrayArgument(arrayCopy2Instruction, variableReferenceArrayCopy2Instruction),
+    "array_copy_3": classifyArrayArgument(arrayCopy3Instruction, variableReferenceArrayCopy3Instruction),
+    "index": classifyArrayArgument(arrayGetIndexInstruction, variableReferenceArrayGetIndexInstruction),
+    "unidentified_76": classifyUnlessSubscripted(unidentified76Instruction),
+    "arg_count": classifyUnlessSubscripted(getArgumentCountInstruction),
+    "unidentified_7c": classifyUnlessSubscripted(unidentified7cInstruction),
+    "unidentified_7d": classifyUnlessSubscripted(unidentified7dInstruction),
+    '[': classifyUnlessSubscripted(globalCodeOpenInstruction),
+    ']': classifyUnlessSubscripted(globalCodeCloseInstruction),
+    "int": classifyCast(castToIntegerInstruction),
+    "float": classifyCast(castToFloatingPointInstruction),
+    "string": classifyCast(castToStringInstruction),
+    "sleep_until_complete": classifyUnlessSubscripted(sleepUntilCompleteInstruction),
+    "format": classifyUnlessSubscripted(formatStringInstruction),
+    "array_assign_1": classifyArrayArgument(arrayAssign1Instruction, variableReferenceArrayAssign1Instruction),
+    "array_assign_2": classifyArrayArgument(arrayAssign2Instruction, variableReferenceArrayAssign2Instruction),
+    "array_assign_3": classifyArrayArgument(arrayAssign3Instruction, variableReferenceArrayAssign3Instruction),
+    "type": classifyUnlessSubscripted(getDataTypeInstruction),
+    "sleep_while": classifyUnlessSubscripted(sleepWhileInstruction),
+    "assert": classifyUnlessSubscripted(assertInstruction)
+}
+
+#whatever isn't a keyword statement: array accesses, labels, calls and assignments
+def identifyUnkeyedStatement(terms: object, thisData: object) -> type[parentInstruction]:
     if terms[1] == '[':
         if terms[terms.index(']') + 1] == '=':
-            return arrayAssignmentInstruction() if isArray(terms[0]) else variableReferenceArrayAssignmentInstruction()
-        return readArrayEntryInstruction() if isArray(terms[0]) else variableReferenceReadArrayEntryInstruction()
-    
-    if terms[0] == "array_copy_1":
-        return arrayCopy1Instruction() if isArray(terms[2]) else variableReferenceArrayCopy1Instruction()
-    if terms[0] == "array_copy_2":
-        return arrayCopy2Instruction() if isArray(terms[2]) else variableReferenceArrayCopy2Instruction()
-    if terms[0] == "array_copy_3":
-        return arrayCopy3Instruction() if isArray(terms[2]) else variableReferenceArrayCopy3Instruction()
-    if terms[0] == "index":
-        return arrayGetIndexInstruction() if isArray(terms[2]) else variableReferenceArrayGetIndexInstruction()
-    
-    if terms[0] == "unidentified_76":
-        return unidentified76Instruction()
-    if terms[0] == "arg_count":
-        return getArgumentCountInstruction()
-    if terms[0] == "unidentified_7c":
-        return unidentified7cInstruction()
-    if terms[0] == "unidentified_7d":
-        return unidentified7dInstruction()
-    
-    if terms[0] == '[':
-        return globalCodeOpenInstruction()
-    
-    if terms[0] == ']':
-        return globalCodeCloseInstruction()
-    
-    if terms[0] == "int" and terms[1] == '(':
-        return castToIntegerInstruction()
-    if terms[0] == "float" and terms[1] == '(':
-        return castToFloatingPointInstruction()
-    if terms[0] == "string" and terms[1] == '(':
-        return castToStringInstruction()
-    
-    if terms[0] == "sleep_until_complete":
-        return sleepUntilCompleteInstruction()
-    if terms[0] == "format":
-        return formatStringInstruction()
-    
-    if terms[0] == "array_assign_1":
-        return arrayAssign1Instruction() if isArray(terms[2]) else variableReferenceArrayAssign1Instruction()
-    if terms[0] == "array_assign_2":
-        return arrayAssign2Instruction() if isArray(terms[2]) else variableReferenceArrayAssign2Instruction()
-    if terms[0] == "array_assign_3":
-        return arrayAssign3Instruction() if isArray(terms[2]) else variableReferenceArrayAssign3Instruction()
-    
-    if terms[0] == "type":
-        return getDataTypeInstruction()
-    if terms[0] == "sleep_while":
-        return sleepWhileInstruction()
-    if terms[0] == "assert":
-        return assertInstruction()
-    
-    # keep this stuff at the bottom...
+            return arrayAssignmentInstruction if isArrayName(terms[0], thisData) else variableReferenceArrayAssignmentInstruction
+        return readArrayEntryInstruction if isArrayName(terms[0], thisData) else variableReferenceReadArrayEntryInstruction
+    
     if terms[1] == ':':
-        return labelInstruction()
+        return labelInstruction
     
     if ((isDisableExpression := terms[1] == '*' and terms[2] == '(') or terms[1] == '(') and not isOperatorChar(terms[0]):
-        if nameIsVar(terms[0]):
+        if isVariableName(terms[0], thisData):
             if isDisableExpression:
                 readingString = False
                 for term in terms[3:]:
@@ -3421,20 +3783,34 @@ def identifyInstructionFromCpp(file: object, thisData: object, aligned: bool = F
                         #var1 = var2 * (var3 + 2);
                         break
                 else:
-                    return variableCallInstruction()
+                    return variableCallInstruction
             else:
-                return variableCallInstruction()
+                return variableCallInstruction
         elif terms[0][0] not in '0123456789.':
-            return callInstruction()
+            return callInstruction
     
     if '=' in terms:
         valuePos = terms.index('=') + 1
         value = terms[valuePos]
         if value == "funcref":
-            return functionAssignmentInstruction()
-        if (value in thisData.definedGlobalArrays or (thisData.localDefinedArraysTree and value in thisData.localDefinedArraysTree[-1])) and terms[valuePos + 1] in (None, ';'):
-            return assignmentReferenceArrayInstruction()
-        else:
-            return assignmentInstruction()
+            return functionAssignmentInstruction
+        if isArrayName(value, thisData) and terms[valuePos + 1] in (None, ';'):
+            return assignmentReferenceArrayInstruction
+    
+    return assignmentInstruction
+
+def identifyInstructionFromCpp(file: object, thisData: object, aligned: bool = False) -> parentInstruction | None:
+    # classified from the terms the file already has, aligned means the statement starts at the current term instead of the next one
+    terms = file.peekTerms(aligned)
+    if not aligned:
+        file.getNextTerm()
+    
+    if terms[0] == '"':
+        return
     
-    return assignmentInstruction()
+    instructionType = cppStatementDict.get(terms[0])
+    if instructionType is not None and not isinstance(instructionType, type):
+        instructionType = instructionType(terms, thisData)
+    if instructionType is None:
+        instructionType = identifyUnkeyedStatement(terms, thisData)
+    return instructionType()
@@ -0,0 +1,237 @@
+import array
+import os
+from struct import pack
+from typing import Iterable
+from gibberishModules.instructions import *
+from gibberishModules.functionDefinitions import *
+from gibberishModules.imports import *
+from gibberishModules.arrays import *
+from gibberishModules.variables import *
+from gibberishModules.strings import writeStringToKsm
+from gibberishModules.ksmsections import *
+from gibberishModules.nullprofiler import nullProfiler, noProfiler
+from gibberishModules.cppheader import parseCppHeaderFile
+from gibberishModules.cppbody import parseCppBodyFile
+
+def buildSummarySection(section: fileSection, importCount: int, allowDisableExpression: bool):
+    section.words.append(0x00000000)
+    infoWord = min(importCount, 0xff) | (allowDisableExpression << 16)
+    section.words.append(infoWord)
+
+def buildVariableDefinition(section: fileSection, thisVariable: variable):
+    buildWithName = (thisVariable.dataTypeString in ("func", "user"))
+    section.words.append(0xffffffff if buildWithName else 0x00000000)
+    section.words.append(thisVariable.identifier)
+    flags = variableDataTypesStringToInt(thisVariable.dataTypeString)
+    match thisVariable.scope:
+        case variableScope.localVar:
+            pass
+        case variableScope.static:
+            if thisVariable.dataTypeString == "user":
+                flags |= 0x08000000
+            elif thisVariable.dataTypeString != "func":
+                flags |= 0x02000000
+        case variableScope.const:
+            flags |= 0x04000000
+    section.words.append(flags)
+    match thisVariable.dataTypeString:
+        case "float":
+            section.words.frombytes(pack("f", thisVariable.value))
+        case "int":
+            if thisVariable.value < 0:
+                thisVariable.value += 0x100000000
+            section.words.append(thisVariable.value)
+        case "hex":
+            section.words.append(thisVariable.value)
+        case "string" | "me" | "user" | "func" | "ref":
+            section.words.append(0x00000000)
+        case "bool":
+            section.words.append(1 if thisVariable.value else 0)
+        case _:
+            raise Exception(f"Unhandled data type: {thisVariable.dataTypeString}")
+    if buildWithName:
+        writeStringToKsm(section, thisVariable.name)
+    if thisVariable.dataTypeString == "string":
+        writeStringToKsm(section, thisVariable.value)
+
+def buildFunctionDefinitionsSection(section: fileSection, definedFunctions: dict):
+    dataTypeBack = {
+        arrayDataType.Variable: 0,
+        arrayDataType.Int: 1,
+        arrayDataType.Float: 2,
+        arrayDataType.Bool: 3
+    }
+    
+    section.itemCount = len(definedFunctions)
+    for function in list(definedFunctions.values())[::-1]:
+        section.words.append(0xffffffff)
+        section.words.append(function.identifier)
+        section.words.append(int(function.isPublic))
+        tempVarFlagsRaw = sum(bit << index for index, bit in enumerate(function.tempVarFlags))
+        section.words.append(tempVarFlagsRaw)
+        del tempVarFlagsRaw
+        section.words.append(function.codeOffset)
+        section.words.append(function.codeEnd)
+        section.words.append(function.accumulatorID)
+        if not function.specialLabel is None:
+            section.words.append(function.specialLabel.identifier)
+        else:
+            section.words.append(0x00000000)
+        writeStringToKsm(section, function.name)
+        section.words.append(len(function.declaredLocals))
+        for localVariable in function.declaredLocals:
+            buildVariableDefinition(section, localVariable)
+        
+        section.words.append(len(function.localArraysByID))
+        for thisArray in function.localArraysByID.values():
+            section.words.append(0xffffffff)
+            section.words.append(thisArray.identifier)
+            section.words.append(dataTypeBack[thisArray.dataType])
+            section.words.append(thisArray.length)
+            section.words.append(thisArray.address)
+            writeStringToKsm(section, thisArray.name)
+        
+        section.words.append(len(function.labelsByID))
+        for thisLabel in list(function.labelsByID.values())[::-1]:
+            section.words.append(0)
+            section.words.append(thisLabel.identifier)
+            section.words.append(thisLabel.address)
+
+#the variables of each variable definition section, newest first like the sections list them
+def sortVariablesByScope(usedIdentifierSlots: list) -> dict[variableScope, list[variable]]:
+    variablesByScope = {variableScope.static: list(), variableScope.const: list(), variableScope.Global: list()}
+    for thisVariable in usedIdentifierSlots[::-1]:
+        if isinstance(thisVariable, variable) and thisVariable.scope in variablesByScope:
+            variablesByScope[thisVariable.scope].append(thisVariable)
+    return variablesByScope
+
+def buildVariableDefinitionSection(section: fileSection, variables: list[variable]):
+    section.itemCount = len(variables)
+    for thisVariable in variables:
+        buildVariableDefinition(section, thisVariable)
+
+def buildArrayDefinitionSection(section: fileSection, definedGlobalArrays: dict):
+    dataTypeBack = {
+        arrayDataType.Variable: 0,
+        arrayDataType.Int: 1,
+        arrayDataType.Float: 2,
+        arrayDataType.Bool: 3
+    }
+    
+    for thisArray in list(definedGlobalArrays.values())[::-1]:
+        section.itemCount += 1
+        section.words.append(0xffffffff)
+        section.words.append(thisArray.identifier)
+        section.words.append(dataTypeBack[thisArray.dataType])
+        section.words.append(thisArray.length)
+        section.words.append(thisArray.address)
+        writeStringToKsm(section, thisArray.name)
+
+def buildImportDefinitionSection(section: fileSection, usedImportSlots: list):
+    section.itemCount = len(usedImportSlots)
+    for thisImport in usedImportSlots[::-1]:
+        section.words.append(0xffffffff)
+        combinedParameter = (thisImport.timesUsed | (thisImport.fileID << 16))
+        section.words.append(combinedParameter)
+        del combinedParameter
+        section.words.append(importDataTypesStringToInt(thisImport.dataTypeString))
+        section.words.append(thisImport.unknown0)
+        section.words.append(thisImport.identifier)
+        section.words.append(0x00000000)
+        section.words.append(0x00000000)
+        writeStringToKsm(section, thisImport.name)
+
+def buildInstructionSection(section: fileSection, instructionList: Iterable[parentInstruction]):
+    for thisInstruction in instructionList:
+        #print(type(thisInstruction))
+        thisInstruction.writeToKsm(section)
+    resolveRelocations(section)
+    section.itemCount = len(section.words)
+
+def buildHeaderSection(section: fileSection, sections: list[fileSection]):
+    section.words.append(0x524d534b)
+    section.words.append(0x00010300)
+    offset = 0x0b
+    for thisSection in sections:
+        section.words.append(offset)
+        offset += len(thisSection.words) + 1
+    section.words.append(0x00000000)
+
+#lays out the header and every section, each after its item count, in one buffer sized from the finished sections
+#the file then takes a single write
+#the sections themselves aren't pre-sized, strings and expressions only know their size once they're encoded
+def writeKsmFile(fileName: str, sections: list[fileSection]):
+    headerSection, sections = sections[-1], sections[:-1]
+    fileBuffer = bytearray(4 * (len(headerSection.words) + sum(len(section.words) + 1 for section in sections)))
+    fileWords = memoryview(fileBuffer).cast('I')
+    position = len(headerSection.words)
+    fileWords[:position] = headerSection.words
+    for section in sections:
+        fileWords[position] = section.itemCount
+        position += 1
+        fileWords[position:position + len(section.words)] = section.words
+        position += len(section.words)
+    with open(fileName, "wb") as file:
+        file.write(fileBuffer)
+
+#builds every section of a KSM *.bin out of what parseCppBodyFile returned, the header last
+def buildKsmSections(instructionList: list, definedFunctions: dict, usedIdentifierSlots: list, usedImportSlots: list, importCount: int, allowDisableExpression: bool, definedGlobalArrays: dict, profiler: nullProfiler = noProfiler) -> list[fileSection]:
+    sections = [fileSection(0, array.array("I")) for sectionCount in range(9)]
+    with profiler.phase("buildInstructionSection"):
+        buildInstructionSection(sections[7], profiler.instructions(instructionList, None, "writeToKsm"))
+    with profiler.phase("buildSummarySection"):
+        buildSummarySection(sections[0], importCount, allowDisableExpression)
+    with profiler.phase("buildFunctionDefinitionsSection"):
+        buildFunctionDefinitionsSection(sections[1], definedFunctions)
+    variablesByScope = sortVariablesByScope(usedIdentifierSlots)
+    with profiler.phase("buildVariableDefinitionSection statics"):
+        buildVariableDefinitionSection(sections[2], variablesByScope[variableScope.static])
+    with profiler.phase("buildArrayDefinitionSection"):
+        buildArrayDefinitionSection(sections[3], definedGlobalArrays)
+    with profiler.phase("buildVariableDefinitionSection consts"):
+        buildVariableDefinitionSection(sections[4], variablesByScope[variableScope.const])
+    with profiler.phase("buildImportDefinitionSection"):
+        buildImportDefinitionSection(sections[5], usedImportSlots)
+    with profiler.phase("buildVariableDefinitionSection globals"):
+        buildVariableDefinitionSection(sections[6], variablesByScope[variableScope.Global])
+    with profiler.phase("buildHeaderSection"):
+        buildHeaderSection(sections[-1], sections[:-1])
+    return sections
+
+#builds a *.cksm and the *.hksm next to it into a KSM *.re.bin
+#header is the *.hksm lines and what parseCppHeaderFile made of them when the caller already has it, definitions in it get changed while building
+def compileFile(fileName: str, outputDirectory: str | None, incremental: bool = False, profiler: nullProfiler = noProfiler, header: tuple | None = None):
+    if header is None:
+        headerFileName = f"{fileName.removesuffix(".cksm")}.hksm"
+        headerText = open(headerFileName, "r", encoding = "utf-8").readlines()
+        with profiler.phase("parseCppHeaderFile"):
+            definedImports, definedVariables, identifierSlotOffset = parseCppHeaderFile(headerText)
+    else:
+        headerText, definedImports, definedVariables, identifierSlotOffset = header
+    
+    fileText = open(fileName, "r", encoding = "utf-8").readlines()
+    cache = None
+    if incremental:
+        from gibberishModules.buildcache import buildCache
+        with profiler.phase("load buildCache"):
+            cache = buildCache(f"{fileName.removesuffix(".cksm")}.buildcache", fileText, headerText, definedImports, definedVariables)
+    with profiler.phase("parseCppBodyFile"):
+        instructionList, definedFunctions, usedIdentifierSlots, usedImportSlots, importCount, allowDisableExpression, definedGlobalArrays = parseCppBodyFile(fileText, definedImports, definedVariables, identifierSlotOffset, cache, profiler if profiler.enabled else None)
+        if cache is not None:
+            cache.finish()
+    
+    #print(definedImports.keys())
+    #print("\n".join(f"{value}" for value in definedVariables.values()))
+    #print([f.name for f in definedFunctions.values()])
+    #print([f.isPublic for f in definedFunctions.values()])
+    sections = buildKsmSections(instructionList, definedFunctions, usedIdentifierSlots, usedImportSlots, importCount, allowDisableExpression, definedGlobalArrays, profiler)
+    outputFileName = f"{fileName.removesuffix(".cksm")}.re.bin"
+    if outputDirectory is not None:
+        os.makedirs(outputDirectory, exist_ok=True)
+        outputFileName = os.path.join(outputDirectory, os.path.basename(outputFileName))
+    with profiler.phase("writeKsmFile"):
+        writeKsmFile(outputFileName, sections)
+    if cache is not None:
+        with profiler.phase("save buildCache"):
+            cache.save()
+    return outputFileName
@@ -0,0 +1,192 @@
+import os
+from typing import Generator, Iterable
+from gibberishModules.instructions import *
+from gibberishModules.words import *
+from gibberishModules.functionDefinitions import *
+from gibberishModules.imports import *
+from gibberishModules.arrays import *
+from gibberishModules.variables import *
+from gibberishModules.cppheader import writeCppHeaderFile
+from gibberishModules.cppwriter import cppWriter
+from gibberishModules.ksmsections import *
+from gibberishModules.nullprofiler import nullProfiler, noProfiler
+
+def readHeader(fileWords: memoryview) -> (list[fileSection], formatProfile):
+    assert fileWords[0] == 0x524d534b, fileWords[0]
+    versionRaw = fileWords[1]
+    assert versionRaw in formatProfiles, fileWords[1]
+    headerWords = fileWords[2:11].tolist()
+    headerWords[-1] = len(fileWords)
+    sections = [fileSection(fileWords[startAddress], fileWords[startAddress + 1:endAddress]) for startAddress, endAddress in zip(headerWords[:-1], headerWords[1:])]
+    return sections, formatProfiles[versionRaw]
+
+def parseSummary(section: fileSection, profile: formatProfile) -> str | None:
+    if profile.versionRaw <= 0x00010300:
+        return None
+    assert section.itemCount == 0xffffffff, hex(section.itemCount)
+    cursor = wordCursor(section.words)
+    #TODO: figure out, discard for now
+    cursor.skip()
+    #filename
+    fileName = readStringFromKsm(cursor)
+    return fileName
+
+#end is where to stop, in words into the code section, the whole section by default
+def readInstructions(section: fileSection, context: decodeContext, position: int = 0, end: int | None = None) -> Generator[parentInstruction]:
+    cursor = wordCursor(section.words, position, context)
+    end = section.itemCount if end is None else end
+    
+    while cursor.position < end:
+        word = cursor.readWord()
+        
+        if (word & 0xffff0000) or (word & 0xff > 0xa0):
+            instructionID = word
+            disableExpression = False
+            
+            thisInstruction = variableInstruction(instructionID, disableExpression, context)
+        else:
+            instructionID = word & 0xff
+            disableExpression = bool(word & 0x0100)
+            
+            thisInstruction = context.newInstruction(instructionID, False, disableExpression)
+        
+        if isinstance(thisInstruction, endFileInstruction):
+            assert cursor.position == section.itemCount, hex((cursor.position - 1) * 4)
+            break
+        
+        thisInstruction.readFromKsm(cursor)
+        yield thisInstruction
+
+def parseInstructions(instructions: Iterable[parentInstruction], writer: cppWriter):
+    for thisInstruction in instructions:
+        cppText, writer.indentLevel, indentOffsetNextLine = thisInstruction.writeToCpp(writer.indentLevel)
+        writer.writeIndented(cppText)
+        writer.indentLevel += indentOffsetNextLine
+
+#a KSM *.bin whose sections are only decoded the first time something asks for them
+#tools require() the sections they need, anything else is never touched
+#every definition ends up in the file's own decodeContext, so any number of files can be open at once
+class ksmFile:
+    def __init__(self, fileWords: memoryview):
+        self.sections, self.profile = readHeader(fileWords)
+        self.context = decodeContext(self.profile)
+        self.decodedSections = dict()
+    
+    def require(self, sectionIndices: Iterable[ksmSection]):
+        # definition sections fill in the file's context, decode them in file order like the full pipeline does
+        for sectionIndex in sorted(sectionIndices):
+            self.getSection(sectionIndex)
+    
+    def getSection(self, sectionIndex: ksmSection) -> object:
+        if sectionIndex in self.decodedSections:
+            return self.decodedSections[sectionIndex]
+        section = self.sections[sectionIndex]
+        match sectionIndex:
+            case ksmSection.summary:
+                result = parseSummary(section, self.profile)
+            case ksmSection.functions:
+                result = self.context.functionDefinitionDict = parseFunctionDefinitions(section, self.profile)
+            case ksmSection.statics:
+                result = parseVariables(section, variableScope.static, self.context.variableDict)
+            case ksmSection.arrays:
+                result = parseArrayDefinitions(section)
+                self.context.arrayDefinitionDictByAddress, self.context.arrayDefinitionDictByID, self.context.arrayDefinitionDictByName = result
+            case ksmSection.consts:
+                result = parseVariables(section, variableScope.const, self.context.variableDict)
+            case ksmSection.imports:
+                result = self.context.importDefinitionDict = parseImportDefinitions(section, self.profile)
+            case ksmSection.globals:
+                result = parseVariables(section, variableScope.Global, self.context.variableDict)
+            case ksmSection.code:
+                raise Exception("The code section is streamed, use instructions() instead")
+        self.decodedSections[sectionIndex] = result
+        return result
+    
+    def instructions(self, position: int = 0, end: int | None = None) -> Generator[parentInstruction]:
+        # instructions look up every definition section while being read
+        self.require(definitionSections)
+        return readInstructions(self.sections[ksmSection.code], self.context, position, end)
+    
+    def census(self) -> list[int]:
+        # how many times each opcode occurs, without decoding any instructions
+        self.require((ksmSection.functions, ksmSection.arrays))
+        return opcodeCensus(self.context).scanSection(self.sections[ksmSection.code])
+
+def getMinimumAndMaximumIdentifiers(context: decodeContext) -> (int, int):
+    variableMin, variableMax = getMinimumAndMaxmimumVariableIdentifiers(context.variableDict)
+    functionMin, functionMax = getMinimumAndMaxmimumFunctionIdentifiers(context.functionDefinitionDict)
+    arrayMin, arrayMax = getMinimumAndMaxmimumArrayIdentifiers(context.arrayDefinitionDictByID)
+    finalMin = min(variableMin, functionMin, arrayMin)
+    finalMax = max(variableMax, functionMax, arrayMax)
+    
+    #ensure no variable overlap
+    identifierList = list()
+    identifierList.extend(context.variableDict)
+    identifierList.extend(context.functionDefinitionDict)
+    identifierList.extend(context.arrayDefinitionDictByID)
+    identifierList.extend(getAllLabelAndArrayIDs(context.functionDefinitionDict))
+    identifierList = [identifier & 0x00ffffff for identifier in identifierList]
+    identifierSet = set(identifierList)
+    assert len(identifierList) == len(identifierSet)
+    
+    if finalMin == 0xffffffff:
+        return -1, -1
+    return finalMin, finalMax
+
+#writes a KSM *.bin out as its *.hksm and *.cksm
+def decompileKsmFile(thisFile: ksmFile, headerWriter: cppWriter, bodyWriter: cppWriter, profiler: nullProfiler = noProfiler):
+    if profiler.enabled:
+        thisFile.context.setProfiler(profiler)
+    for sectionIndex in definitionSections:
+        with profiler.phase(f"parse {sectionIndex.name}"):
+            thisFile.getSection(sectionIndex)
+    with profiler.phase("getMinimumAndMaximumIdentifiers"):
+        minID, maxID = getMinimumAndMaximumIdentifiers(thisFile.context)
+    # the header has to be written first, it decides which variables the body declares
+    with profiler.phase("writeCppHeaderFile"):
+        writeCppHeaderFile(thisFile.context, minID, headerWriter)
+    with profiler.phase("parseInstructions"):
+        parseInstructions(profiler.instructions(thisFile.instructions(), "read", "writeToCpp"), bodyWriter)
+
+#decompiles a KSM *.bin into a *.cksm and *.hksm
+#they're named after the source file the summary names if it has one, otherwise after fileName, and both names are returned
+def decompileFile(fileName: str, outputDirectory: str | None, profiler: nullProfiler = noProfiler):
+    with profiler.phase("mapKsmFile"):
+        fileWords = mapKsmFile(fileName)
+    with profiler.phase("readHeader"):
+        thisFile = ksmFile(fileWords)
+    with profiler.phase("parse summary"):
+        filename = thisFile.getSection(ksmSection.summary)
+    
+    if filename is None:
+        filename = f"{fileName.removesuffix(".bin")}.cksm"
+    else:
+        filename = f"{filename.removesuffix(".cpp")}.cksm"
+    if outputDirectory is not None:
+        os.makedirs(outputDirectory, exist_ok=True)
+        filename = os.path.join(outputDirectory, os.path.basename(filename.replace("\\", "/")))
+    headerFileName = f"{filename.removesuffix(".cksm")}.hksm"
+    
+    # written under temporary names first, so a file that fails to decode partway never leaves a truncated *.cksm or *.hksm behind
+    try:
+        with open(f"{headerFileName}.tmp", "w", encoding='utf-8') as headerFile, open(f"{filename}.tmp", "w", encoding='utf-8') as file:
+            decompileKsmFile(thisFile, cppWriter(headerFile), cppWriter(file), profiler)
+    except BaseException:
+        for temporaryFileName in (f"{headerFileName}.tmp", f"{filename}.tmp"):
+            if os.path.exists(temporaryFileName):
+                os.remove(temporaryFileName)
+        raise
+    os.replace(f"{headerFileName}.tmp", headerFileName)
+    os.replace(f"{filename}.tmp", filename)
+    return filename, headerFileName
+
+#writes the *.cksm text of a single function, nothing else of the file is written out
+def decompileKsmFunction(thisFile: ksmFile, functionName: str, writer: cppWriter):
+    thisFile.require(definitionSections)
+    function = next((function for function in thisFile.context.functionDefinitionDict.values() if function.name == functionName), None)
+    if function is None:
+        raise LookupError(f"No function named \"{functionName}\"")
+    minID, maxID = getMinimumAndMaximumIdentifiers(thisFile.context)
+    # the header still decides which variables the body declares, even when it's thrown away
+    writeCppHeaderFile(thisFile.context, minID, cppWriter())
+    parseInstructions(thisFile.instructions(function.codeOffset, function.codeEnd), writer)
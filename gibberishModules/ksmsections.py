@@ -0,0 +1,22 @@
+import array
+from dataclasses import dataclass, field
+from enum import IntEnum
+from gibberishModules.instructions import relocation
+
+@dataclass
+class fileSection:
+    itemCount: int
+    words: array.array[int] | memoryview
+    relocations: list[relocation] = field(default_factory=list)
+
+class ksmSection(IntEnum):
+    summary = 0
+    functions = 1
+    statics = 2
+    arrays = 3
+    consts = 4
+    imports = 5
+    globals = 6
+    code = 7
+
+definitionSections = (ksmSection.functions, ksmSection.statics, ksmSection.arrays, ksmSection.consts, ksmSection.imports, ksmSection.globals)
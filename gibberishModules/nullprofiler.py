@@ -0,0 +1,23 @@
+#what nullProfiler.phase gives back, a context manager that does nothing
+class nullPhase:
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exceptionType: object, exception: object, traceback: object) -> bool:
+        return False
+
+noPhase = nullPhase()
+
+#stands in for phaseProfiler when --profile isn't given, costs one call per phase and none per instruction
+#it's also what phaseProfiler builds on, so code taking a profiler only ever needs this module
+#nothing here imports anything, runs without --profile never load profiler.py or what it needs
+class nullProfiler:
+    enabled = False
+
+    def phase(self, name: str) -> nullPhase:
+        return noPhase
+
+    def instructions(self, instructions: object, producerStep: str | None, consumerStep: str | None) -> object:
+        return instructions
+
+noProfiler = nullProfiler()
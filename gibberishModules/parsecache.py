@@ -0,0 +1,102 @@
+import hashlib
+import os
+import pickle
+
+#bump whenever a corpus tool changes what it returns for a file in a way the source below doesn't show, entries from older versions are then never hit again
+cacheVersion = 2
+#results depend on every decoder the tools run and are pickled from classes that may change their layout,
+#so the source of every module in gibberishModules is part of every key, any change to the code starts over with new entries
+codeVersion = None
+
+def hashFile(fileName: str) -> object:
+    with open(fileName, "rb") as file:
+        return hashlib.file_digest(file, "blake2b")
+
+def getCodeVersion() -> str:
+    global codeVersion
+    if codeVersion is None:
+        digest = hashlib.blake2b(str(cacheVersion).encode())
+        modulePath = os.path.dirname(os.path.abspath(__file__))
+        for fileName in sorted(fileName for fileName in os.listdir(modulePath) if fileName.endswith(".py")):
+            digest.update(fileName.encode())
+            with open(os.path.join(modulePath, fileName), "rb") as file:
+                digest.update(file.read())
+        codeVersion = digest.hexdigest()[:16]
+    return codeVersion
+
+#corpus tool results stored on disk, one entry per tool and file contents
+#entries are keyed by a hash of the contents, so unchanged files are never parsed again no matter where they moved
+#the least recently used entries are dropped once the whole cache grows past maxSize bytes
+class parseCache:
+    def __init__(self, path: str, maxSize: int = 256 * 1024 * 1024):
+        self.path = path
+        self.maxSize = maxSize
+        os.makedirs(path, exist_ok=True)
+
+    def getKey(self, toolName: str, fileName: str) -> str:
+        digest = hashFile(fileName)
+        digest.update(f"{toolName}:{getCodeVersion()}".encode())
+        return digest.hexdigest()[:40]
+
+    def getEntryPath(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.pickle")
+
+    def get(self, key: str) -> tuple | None:
+        # results are wrapped in a tuple so a cached None can be told apart from a miss
+        entryPath = self.getEntryPath(key)
+        try:
+            with open(entryPath, "rb") as file:
+                entry = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # a damaged entry, or one pickled from classes that changed since, is dropped and counts as a miss
+            try:
+                os.remove(entryPath)
+            except OSError:
+                pass
+            return None
+        # touching the entry is what keeps it from being evicted
+        os.utime(entryPath)
+        return entry
+
+    def put(self, key: str, result: object):
+        # written under a temporary name first, so other workers never read half an entry
+        entryPath = self.getEntryPath(key)
+        temporaryPath = f"{entryPath}.{os.getpid()}.tmp"
+        with open(temporaryPath, "wb") as file:
+            pickle.dump((result,), file, pickle.HIGHEST_PROTOCOL)
+        os.replace(temporaryPath, entryPath)
+
+    def evict(self):
+        entries = list()
+        totalSize = 0
+        with os.scandir(self.path) as directory:
+            for entry in directory:
+                if not entry.name.endswith(".pickle"):
+                    continue
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                totalSize += stat.st_size
+        entries.sort()
+        for lastUsed, size, entryPath in entries:
+            if totalSize <= self.maxSize:
+                break
+            os.remove(entryPath)
+            totalSize -= size
+
+#the result of fileFunction for one file, taken from the cache whenever the file's contents were seen before
+#module level so it can be handed to a process pool together with its arguments
+def runCachedFile(fileFunction: object, cache: parseCache | None, fullFileName: str) -> object:
+    if cache is None:
+        return fileFunction(fullFileName)
+    try:
+        key = cache.getKey(fileFunction.__name__, fullFileName)
+    except OSError:
+        return fileFunction(fullFileName)
+    entry = cache.get(key)
+    if entry is not None:
+        return entry[0]
+    result = fileFunction(fullFileName)
+    cache.put(key, result)
+    return result
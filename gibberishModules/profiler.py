@@ -0,0 +1,138 @@
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from typing import Generator, Iterable, TextIO
+from gibberishModules.nullprofiler import nullProfiler, noProfiler
+
+#what one phase of a decompile or compile cost, summed over every file when several are run
+#allocatedBlocks is how many more memory blocks Python held after the phase than before, not every allocation made during it
+@dataclass(slots=True)
+class phaseRecord:
+    name: str
+    count: int = 0
+    wallSeconds: float = 0.0
+    cpuSeconds: float = 0.0
+    allocatedBlocks: int = 0
+
+#latency histograms have one bucket per power of two microseconds, bucket 0 is under a microsecond and the last one is everything from about a second up
+histogramBucketCount = 22
+
+def getHistogramBucket(seconds: float) -> int:
+    return min(int(seconds * 1000000).bit_length(), histogramBucketCount - 1)
+
+#the smallest time in microseconds that lands in a bucket
+def getHistogramBucketStart(bucket: int) -> int:
+    return 0 if bucket == 0 else 1 << (bucket - 1)
+
+#time spent on the instructions of one class in one step, like "read" or "matchInstruction"
+@dataclass(slots=True)
+class instructionRecord:
+    count: int = 0
+    seconds: float = 0.0
+    maxSeconds: float = 0.0
+    histogram: list[int] = field(default_factory=lambda: [0] * histogramBucketCount)
+    
+    def add(self, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+        if seconds > self.maxSeconds:
+            self.maxSeconds = seconds
+        self.histogram[getHistogramBucket(seconds)] += 1
+    
+    #the bucket start of the instruction at fraction of the way through the sorted latencies, in microseconds
+    def getPercentile(self, fraction: float) -> int:
+        target = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if seen >= target:
+                return getHistogramBucketStart(bucket)
+        return getHistogramBucketStart(histogramBucketCount - 1)
+
+#which instructions each step times, the statement steps include the time of the operands nested in them
+stepDescriptions = {
+    "read": "top-level statements decoded by readFromKsm",
+    "writeToCpp": "top-level statements written as *.cksm text",
+    "matchInstruction": "every instruction decoded, nested operands included",
+    "identifyInstructionFromCpp": "top-level statements identified from *.cksm text",
+    "readFromCpp": "top-level statements parsed from *.cksm text",
+    "expression operand": "every operand parsed into an expression, calls include the operands inside them",
+    "writeToKsm": "top-level statements encoded into the code section"
+}
+
+#records phases and per instruction class counts and latencies for --profile
+#nothing here is used or even imported unless --profile is given, main.py gets noProfiler otherwise
+class phaseProfiler(nullProfiler):
+    enabled = True
+
+    def __init__(self):
+        self.phases = dict()
+        self.instructionSteps = dict()
+
+    @contextmanager
+    def phase(self, name: str):
+        allocatedBlocks = sys.getallocatedblocks()
+        cpuStart = time.process_time()
+        wallStart = time.perf_counter()
+        try:
+            yield
+        finally:
+            wallSeconds = time.perf_counter() - wallStart
+            cpuSeconds = time.process_time() - cpuStart
+            record = self.phases.get(name)
+            if record is None:
+                record = self.phases[name] = phaseRecord(name)
+            record.count += 1
+            record.wallSeconds += wallSeconds
+            record.cpuSeconds += cpuSeconds
+            record.allocatedBlocks += sys.getallocatedblocks() - allocatedBlocks
+
+    def record(self, step: str, thisInstruction: object, seconds: float):
+        records = self.instructionSteps.get(step)
+        if records is None:
+            records = self.instructionSteps[step] = dict()
+        className = type(thisInstruction).__name__
+        instructionRecords = records.get(className)
+        if instructionRecords is None:
+            instructionRecords = records[className] = instructionRecord()
+        instructionRecords.add(seconds)
+
+    #passes instructions through, timing how long each one took to come out of instructions (producerStep)
+    #and how long whoever iterates took over it before asking for the next one (consumerStep)
+    #a step that's None isn't recorded, like producing the items of a list
+    def instructions(self, instructions: Iterable, producerStep: str | None, consumerStep: str | None) -> Generator:
+        clock = time.perf_counter
+        start = clock()
+        for thisInstruction in instructions:
+            produced = clock()
+            yield thisInstruction
+            consumed = clock()
+            if producerStep is not None:
+                self.record(producerStep, thisInstruction, produced - start)
+            if consumerStep is not None:
+                self.record(consumerStep, thisInstruction, consumed - produced)
+            start = clock()
+
+    def toDict(self) -> dict:
+        return {
+            "phases": [asdict(record) for record in self.phases.values()],
+            "histogramBucketStartsMicroseconds": [getHistogramBucketStart(bucket) for bucket in range(histogramBucketCount)],
+            "steps": {step: stepDescriptions.get(step, step) for step in self.instructionSteps},
+            "instructions": {step: {className: asdict(record) for className, record in records.items()} for step, records in self.instructionSteps.items()}
+        }
+
+    def writeJson(self, fileName: str):
+        import json
+        with open(fileName, "w", encoding='utf-8') as file:
+            json.dump(self.toDict(), file, indent=4)
+
+    def writeTable(self, file: TextIO):
+        file.write(f"{'phase':<40} {'count':>10} {'wall ms':>10} {'cpu ms':>10} {'blocks':>10}\n")
+        for record in self.phases.values():
+            file.write(f"{record.name:<40} {record.count:>10} {record.wallSeconds * 1000:>10.2f} {record.cpuSeconds * 1000:>10.2f} {record.allocatedBlocks:>10}\n")
+        for step, records in self.instructionSteps.items():
+            file.write(f"\n{step}: {stepDescriptions.get(step, step)}\n")
+            file.write(f"{step + ' by instruction class':<40} {'count':>10} {'ms':>10} {'us each':>10} {'p50 us':>8} {'p99 us':>8} {'max us':>10}\n")
+            for className, record in sorted(records.items(), key=lambda item: item[1].seconds, reverse=True):
+                file.write(f"{className:<40} {record.count:>10} {record.seconds * 1000:>10.2f} {record.seconds * 1000000 / record.count:>10.2f} {record.getPercentile(0.5):>8} {record.getPercentile(0.99):>8} {record.maxSeconds * 1000000:>10.1f}\n")
@@ -0,0 +1,41 @@
+from dataclasses import dataclass, field
+
+#where a rebuilt section stops matching the original one
+#offset is in words from the start of the original file, count is how many words of the section differ
+@dataclass
+class sectionMismatch:
+    sectionName: str
+    offset: int
+    expected: int | None
+    actual: int | None
+    count: int
+
+#what one *.bin -> *.cksm/*.hksm -> *.re.bin round trip did
+#status is OK, MISMATCH, SKIPPED or ERROR, detail says why for the last two
+@dataclass
+class roundtripResult:
+    status: str
+    wordCount: int = 0
+    decompileSeconds: float = 0.0
+    compileSeconds: float = 0.0
+    mismatches: list[sectionMismatch] = field(default_factory=list)
+    detail: str = ""
+
+#compares words against the original's, None if they're the same
+#firstAddress is where the original's first word sits in the file
+def compareWords(sectionName: str, firstAddress: int, expectedWords: memoryview, actualWords: memoryview) -> sectionMismatch | None:
+    if expectedWords == actualWords:
+        return None
+    sharedLength = min(len(expectedWords), len(actualWords))
+    differingIndices = [index for index in range(sharedLength) if expectedWords[index] != actualWords[index]]
+    count = len(differingIndices) + abs(len(expectedWords) - len(actualWords))
+    index = differingIndices[0] if differingIndices else sharedLength
+    expected = expectedWords[index] if index < len(expectedWords) else None
+    actual = actualWords[index] if index < len(actualWords) else None
+    return sectionMismatch(sectionName, firstAddress + index, expected, actual, count)
+
+#same, for a section and the item count in front of it at startAddress
+def compareSection(sectionName: str, startAddress: int, expectedCount: int, expectedWords: memoryview, actualCount: int, actualWords: memoryview) -> sectionMismatch | None:
+    if expectedCount != actualCount:
+        return sectionMismatch(sectionName, startAddress, expectedCount, actualCount, 1 + max(len(expectedWords), len(actualWords)))
+    return compareWords(sectionName, startAddress + 1, expectedWords, actualWords)
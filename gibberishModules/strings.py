@@ -1,12 +1,11 @@
 from gibberishModules.words import *
 
-def readStringFromKsm(wordsEnumerated: enumerate[int], currentWord: rawWord) -> str:
-    getNextWord(wordsEnumerated, currentWord)
-    stringWordLength = currentWord.value
+def readStringFromKsm(cursor: wordCursor) -> str:
+    stringWordLength = cursor.readWord()
     byteText = bytes()
     for _ in range(stringWordLength):
-        getNextWord(wordsEnumerated, currentWord)
-        byteText += currentWord.value.to_bytes(4, byteorder='little')
+        word = cursor.readWord()
+        byteText += word.to_bytes(4, byteorder='little')
     if b'\x00' in byteText:
         byteText = byteText[:byteText.index(b'\x00')]
     text = byteText.decode('utf-8')
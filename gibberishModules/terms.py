@@ -1,89 +1,170 @@
+import re
+from array import array
+from bisect import bisect_left
+from enum import IntEnum
 from gibberishModules.instructions import *
 from gibberishModules.imports import importDefinition
 from gibberishModules.variables import isVariableScope, isVariableDatatype, variableScopeStringToEnumIntDictGet, variableDataTypesStringToInt, variable
 from gibberishModules.functionDefinitions import functionDefinition
 
+class termKind(IntEnum):
+    Bracket = 1
+    Operator = 2
+    Word = 3
+
+#one match per term, the group that matched is its termKind
+#whitespace only ends a word if it's a space, like it always did, so tabs in the middle of a line stay part of the word before them
+twoCharacterOperators = ('++', '--', '->', '==', '!=', '>=', '<=', '&&', '||', '>>', '<<')
+whitespacePattern = re.compile(r"\s*")
+termCharacters = re.escape("".join(dict.fromkeys(operatorChars + bracketsAndDelimiters)))
+termPattern = re.compile(
+    rf"\s*(?:([{re.escape(bracketsAndDelimiters)}])"
+    rf"|({'|'.join(map(re.escape, twoCharacterOperators))}|[{termCharacters}])"
+    rf"|([^\s{termCharacters}][^ {termCharacters}]*))")
+
+#the terms left on a line, read straight out of the term buffer of an iterableFile without moving it
+#indexing past the end of the line gives None, so statements can be told apart by looking at a few terms ahead
+class termWindow:
+    def __init__(self, terms: list[str], start: int, first: tuple = ()):
+        self.terms = terms
+        self.start = start - len(first)
+        self.first = first
+    
+    def __len__(self) -> int:
+        return len(self.terms) - self.start
+    
+    def __getitem__(self, index: int | slice) -> str | None | list[str]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < len(self.first):
+            return self.first[index]
+        index += self.start
+        return self.terms[index] if index < len(self.terms) else None
+    
+    def index(self, term: str) -> int:
+        if term in self.first:
+            return self.first.index(term)
+        return self.terms.index(term, self.start + len(self.first)) - self.start
+    
+    def __contains__(self, term: str) -> bool:
+        try:
+            self.index(term)
+        except ValueError:
+            return False
+        return True
+
+#reads a *.cksm/*.hksm file term by term
+#every line is split into terms once, with their kinds and columns, getNextTerm only steps through them
+#line is what's left of the current line after the current term, it is None once the file has ended
 class iterableFile:
     isHeaderFile = False
     index = 0
-    restoredLine = line = ""
+    term = None
     
     def __init__(self, fileLines: list[str]):
         self.fileLines = enumerate(fileLines)
+        self.setLine("")
+    
+    @property
+    def line(self) -> str | None:
+        return self.text[self.position:] if self.text is not None else None
+    
+    def setLine(self, text: str | None, isFormatted: bool = False):
+        self.text = text
+        self.position = 0
+        self.terms = None
+        self.isFormatted = isFormatted
+    
+    def splitLine(self):
+        # whatever is left of the line from position on, in one pass
+        self.terms = list()
+        self.kinds = array("B")
+        self.starts = array("I")
+        self.ends = array("I")
+        for match in termPattern.finditer(self.text, self.position):
+            kind = match.lastindex
+            self.terms.append(match.group(kind))
+            self.kinds.append(kind)
+            self.starts.append(match.start(kind))
+            self.ends.append(match.end())
+        self.termIndex = 0
+    
+    def seekColumn(self, position: int):
+        # for anything that reads the line itself instead of its terms, i.e. strings and semicolons
+        self.position = position
+        if self.terms is None:
+            return
+        self.termIndex = bisect_left(self.starts, position)
+        if self.termIndex and self.ends[self.termIndex - 1] > position:
+            # landed in the middle of a term, what's left gets split again
+            self.terms = None
+    
+    def peekTerms(self, includeCurrent: bool = False) -> termWindow:
+        # looks ahead without moving, includeCurrent puts the current term in front of the ones after it
+        if self.terms is None:
+            self.splitLine()
+        return termWindow(self.terms, self.termIndex, (self.term,) if includeCurrent else ())
+    
+    def isLineEmpty(self) -> bool:
+        # same as line == '' without copying what's left of the line
+        return self.text is not None and self.position == len(self.text)
+    
+    def peekCharacter(self) -> str | None:
+        # same as line[0], None where that would raise
+        return self.text[self.position] if self.text is not None and self.position < len(self.text) else None
     
     def formatCurrentLine(self):
-        self.line = self.line.removesuffix('\n')
-        if '//' in self.line:
-            self.line = self.line[:self.line.index('//')]
-        self.line = self.line.strip()
-        self.restoredLine = self.line
+        if self.isFormatted:
+            # what's left of a line that was already formatted only loses its leading whitespace, its terms stay as they are
+            self.seekColumn(whitespacePattern.match(self.text, self.position).end())
+            return
+        line = self.line.removesuffix('\n')
+        if '//' in line:
+            line = line[:line.index('//')]
+        self.setLine(line.strip(), True)
     
     def allowGetNextLine(self, allowSemicolon: bool = False, lineMustEnd: bool = False, errorMessageSemicolon: str | None =  None, errorMessageLineDoesntEnd: str | None = None) -> bool:
         if errorMessageSemicolon is None:
             errorMessageSemicolon = f"Unexpected semicolon at line {self.index+1}!"
         if errorMessageLineDoesntEnd is None:
             errorMessageLineDoesntEnd = f"Line {self.index+1} continues unexpectedly!"
-        if self.line is None:
+        if self.text is None:
             return True
         
         try:
-            if self.line == "":
-                self.index, self.line = next(self.fileLines)
-                while self.line.strip() == "":
-                    self.index, self.line = next(self.fileLines)
-                self.restoredLine = self.line
+            if self.isLineEmpty():
+                self.index, line = next(self.fileLines)
+                while line.strip() == "":
+                    self.index, line = next(self.fileLines)
+                self.setLine(line)
                 return True
 
-            if self.line[0] == ";":
+            if self.text[self.position] == ";":
                 assert allowSemicolon, errorMessageSemicolon
-                if self.line == ";":
-                    self.index, self.line = next(self.fileLines)
+                if self.position == len(self.text) - 1:
+                    self.index, line = next(self.fileLines)
+                    self.setLine(line)
                 else:
-                    self.line = self.line[1:]
-                self.restoredLine = self.line
+                    self.seekColumn(self.position + 1)
                 return True
         except StopIteration:
-            self.line = None
+            self.setLine(None)
             return True
         else:
             assert not lineMustEnd, errorMessageLineDoesntEnd
             return False
     
     def getNextTerm(self):
-        self.line = self.line.lstrip()
-        
-        if self.line == "":
+        if self.terms is None:
+            self.splitLine()
+        if self.termIndex == len(self.terms):
+            self.position = len(self.text)
             self.term = None
             return
-        
-        #assert self.line != "", f"Unexpected end of line on line {self.index+1}."
-        
-        endPosition = 0
-        
-        if isBracketOrDelimiter(self.line[0]):
-            self.term = self.line[0]
-            self.line = self.line[1:]
-            return
-        
-        readingOperator = isOperatorChar(term:= self.line[0])
-        if readingOperator:
-            if (doubleterm:= self.line[:2]) in ('++', '--', '->', '==', '!=', '>=', '<=', '&&', '||', '>>', '<<'):
-                self.term = doubleterm
-                self.line = self.line[2:]
-            else:
-                self.term = term
-                self.line = self.line[1:]
-            return
-        
-        for character in self.line:
-            if (isOperatorChar(character) ^ readingOperator) or character == " ":
-                break
-            if (isBracketOrDelimiter(character)):
-                break
-            endPosition += 1
-        self.term = self.line[:endPosition]
-        self.line = self.line[endPosition:]
-        
+        self.term = self.terms[self.termIndex]
+        self.position = self.ends[self.termIndex]
+        self.termIndex += 1
+    
     def readImportDefinition(self) -> importDefinition:
         assert self.term == "import", f"Unknown file parameter on line {self.index+1}: \"{self.term}\""
         self.getNextTerm()
@@ -100,7 +181,7 @@ class iterableFile:
         unknown0 = int(self.term, 0)
         self.getNextTerm()
         assert self.term == "}", f"Expected \"}}\" on line {self.index+1}, instead got \"{self.term}\""
-        assert self.line == '' or self.line[0] == ';', f"Line {self.index+1} continues unexpectedly!"
+        assert self.isLineEmpty() or self.peekCharacter() == ';', f"Line {self.index+1} continues unexpectedly!"
         return importDefinition(name, None, 0, fileID, dataTypeString, unknown0)
     
     def readFileParameter(self) -> importDefinition | int:
@@ -131,9 +212,9 @@ class iterableFile:
             escapingCharacter = False
             stringValue = ""
             while True:
-                exitPosition = self.line.index(exitCharacter)
-                sliceLine = self.line[:exitPosition]
-                self.line = self.line[exitPosition + 1:]
+                exitPosition = self.text.index(exitCharacter, self.position)
+                sliceLine = self.text[self.position:exitPosition]
+                self.seekColumn(exitPosition + 1)
                 sliceLine = sliceLine.replace("\\\\", "\x00")
                 stringValue += sliceLine
                 if sliceLine and sliceLine[-1] == "\\":
@@ -158,7 +239,7 @@ class iterableFile:
         
         #reading a float or int or hex
         isNumber = (self.term[0] in "0123456789.")
-        if self.term == "-" and self.line[0] in "0123456789.":
+        if self.term == "-" and self.text[self.position] in "0123456789.":
            tmp = self.term
            self.getNextTerm()
            self.term = tmp + self.term
@@ -4,8 +4,6 @@ from dataclasses import dataclass
 from gibberishModules.words import *
 from gibberishModules.strings import *
 
-versionRaw = None
-
 class variableScope(Enum):
     tempVar = 1
     localVar = 2
@@ -14,7 +12,7 @@ class variableScope(Enum):
     Global = 5
     tempStaticVar = 6
 
-@dataclass
+@dataclass(slots=True)
 class variable:
     name: str | None
     identifier: int
@@ -26,8 +24,6 @@ class variable:
     def __copy__(self):
         return variable(self.name, self.identifier, self.alias, self.value, self.scope, self.dataTypeString)
 
-variableDict = dict()
-
 dataTypes = {
     0x00: 'float',
     0x01: 'int',
@@ -50,25 +46,22 @@ dataTypes = {
 
 dataTypesReverse = {value: key for key, value in dataTypes.items()}
 
-def readVariableFromKsm(wordsEnumerated: enumerate[int], currentWord: rawWord, scope: IntEnum) -> (variable, int):
+def readVariableFromKsm(cursor: wordCursor, scope: IntEnum) -> (variable, int):
     # name presence flag
-    getNextWord(wordsEnumerated, currentWord)
-    hasName = (currentWord.value == 0xffffffff)
-    assert (hasName or currentWord.value == 0x00000000), hex(currentWord.value)
+    word = cursor.readWord()
+    hasName = (word == 0xffffffff)
+    assert (hasName or word == 0x00000000), hex(word)
     
     # identifier
-    getNextWord(wordsEnumerated, currentWord)
-    identifier = currentWord.value
+    identifier = cursor.readWord()
     
     # flags
-    getNextWord(wordsEnumerated, currentWord)
-    flags = currentWord.value
+    flags = cursor.readWord()
     
     dataTypeString = dataTypes[flags & 0xff]
     
     # value
-    getNextWord(wordsEnumerated, currentWord)
-    rawValue = currentWord.value
+    rawValue = cursor.readWord()
     hasString = False
     match dataTypeString:
         case "float":
@@ -94,40 +87,27 @@ def readVariableFromKsm(wordsEnumerated: enumerate[int], currentWord: rawWord, s
             value = rawValue
     
     if hasName:
-        name = readStringFromKsm(wordsEnumerated, currentWord)
+        name = readStringFromKsm(cursor)
     else:
         name = None
     
     # string value
     if hasString:
-        value = readStringFromKsm(wordsEnumerated, currentWord)
+        value = readStringFromKsm(cursor)
     
     # generated alias
     alias = f"var_{hex(identifier)}"
     return variable(name, identifier, alias, value, scope, dataTypeString), identifier
     
-def parseVariables(section: object, scope: IntEnum, versionRawInput: int | None = None):
-    if not versionRawInput is None:
-        global versionRaw
-        versionRaw = versionRawInput
-    currentWord = rawWord(0, 0)
-    wordsEnumerated = enumerate(section.words)
-    global variableDict
+def parseVariables(section: object, scope: IntEnum, variableDict: dict[int, variable]):
+    cursor = wordCursor(section.words)
     if scope == variableScope.Global:
         assert section.itemCount == 0
     for index in range(section.itemCount):
-        newDefinition, variableID = readVariableFromKsm(wordsEnumerated, currentWord, scope)
+        newDefinition, variableID = readVariableFromKsm(cursor, scope)
         variableDict[variableID] = newDefinition
 
-def variableDictGet(key: int, function: object = None) -> variable | None:
-    variableMatch = variableDict.get(key, None)
-    
-    if variableMatch is not None:
-        if versionRaw < 0x00010302:
-            assert not (bool((key & 0xf0000000) == 0x30000000) ^ (variableMatch.scope == variableScope.static)), hex(key)
-            assert not (bool((key & 0xf0000000) == 0x40000000) ^ (variableMatch.scope == variableScope.const)), hex(key)
-        return variableMatch
-    
+def temporaryVariableGet(key: int) -> variable | None:
     # tempVar
     if (key & 0xffffff00) == 0x10000100:
         tempIdentifier = key & 0xff
@@ -148,24 +128,39 @@ def variableDictGet(key: int, function: object = None) -> variable | None:
         localIdentifier = (key >> 8) & 0xff
         alias = f"localVar{localIdentifier}"
         return variable(None, key, alias, 0, variableScope.localVar, None)
-    
-    if not versionRaw is None and versionRaw >= 0x00010302:
-        variableMatch = function.definedLocals.get(key, None) if function is not None else None
-        if variableMatch is not None:
-            return variableMatch
-        
-        if (key & 0xffffff00) == 0x40000100:
-            tempIdentifier = key & 0xff
-            alias = f"tempVar{tempIdentifier}"
-            return variable(None, key, alias, 0, variableScope.tempVar, None)    
-    
     return None
 
-def variableDictGetAllValues() -> list[variable]:
-    return variableDict.values()
+def variableDictGet(variableDict: dict[int, variable], key: int, function: object = None) -> variable | None:
+    variableMatch = variableDict.get(key, None)
+    
+    if variableMatch is not None:
+        assert not (bool((key & 0xf0000000) == 0x30000000) ^ (variableMatch.scope == variableScope.static)), hex(key)
+        assert not (bool((key & 0xf0000000) == 0x40000000) ^ (variableMatch.scope == variableScope.const)), hex(key)
+        return variableMatch
+    
+    return temporaryVariableGet(key)
 
-def variableDictGetAllKeys() -> list[int]:
-    return variableDict.keys()
+# 1.3.2 doesn't tag identifiers by scope, but functions define their own locals
+def variableDictGetAlt(variableDict: dict[int, variable], key: int, function: object = None) -> variable | None:
+    variableMatch = variableDict.get(key, None)
+    
+    if variableMatch is not None:
+        return variableMatch
+    
+    variableMatch = temporaryVariableGet(key)
+    if variableMatch is not None:
+        return variableMatch
+    
+    variableMatch = function.definedLocals.get(key, None) if function is not None else None
+    if variableMatch is not None:
+        return variableMatch
+    
+    if (key & 0xffffff00) == 0x40000100:
+        tempIdentifier = key & 0xff
+        alias = f"tempVar{tempIdentifier}"
+        return variable(None, key, alias, 0, variableScope.tempVar, None)    
+    
+    return None
 
 def writeVariableValue(value: int | float | str | bool | None, dataTypeString: str) -> str | None:
     match dataTypeString:
@@ -210,12 +205,8 @@ def variableScopeEnumIntToStringDictGet(key: IntEnum) -> str | None:
 def variableScopeStringToEnumIntDictGet(key: str) -> IntEnum | None:
     return variableScopeStringToEnumIntDict.get(key, None)
 
-def getMinimumAndMaxmimumVariableIdentifiers() -> (int, int):
+def getMinimumAndMaxmimumVariableIdentifiers(variableDict: dict[int, variable]) -> (int, int):
     identifierList = [identifier & 0x0fffffff for identifier in variableDict.keys()]
     if not identifierList:
         return 0xffffffff, 0x00000000
-    return min(identifierList), max(identifierList)
-
-def resetVariableDict():
-    global variableDict
-    variableDict = dict()
\ No newline at end of file
+    return min(identifierList), max(identifierList)
\ No newline at end of file
@@ -1,8 +1,52 @@
-from dataclasses import dataclass
-@dataclass
-class rawWord:
-    index: int
-    value: int
-
-def getNextWord(wordsEnumerated: enumerate, currentWord: rawWord):
-    currentWord.index, currentWord.value = next(wordsEnumerated)
\ No newline at end of file
+import mmap
+from struct import calcsize, unpack_from
+
+#maps a KSM *.bin into memory and returns its contents as 32-bit words
+#the mapping stays alive for as long as any view of it does, so sections can be sliced out of it without copying
+def mapKsmFile(fileName: str) -> memoryview:
+    with open(fileName, "rb") as file:
+        fileMap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(fileMap).cast('I')
+
+#a read position over the 32-bit words of a file section
+#words are read straight out of a memoryview of the file buffer, nothing gets copied
+#context travels along with the cursor so readers can look up whatever the file defined, it is None for definition sections
+class wordCursor:
+    def __init__(self, words: memoryview | object, position: int = 0, context: object = None):
+        self.words = words if isinstance(words, memoryview) else memoryview(words)
+        self.bytes = self.words.cast('B')
+        self.length = len(self.words)
+        self.position = position
+        self.context = context
+
+    def readWord(self) -> int:
+        word = self.words[self.position]
+        self.position += 1
+        return word
+
+    def peekWord(self, offset: int = 0) -> int:
+        return self.words[self.position + offset]
+
+    def readWords(self, count: int) -> memoryview:
+        end = self.position + count
+        if end > self.length:
+            raise IndexError(f"Cannot read {count} words at {hex(self.position * 4)}, section ends at {hex(self.length * 4)}")
+        words = self.words[self.position:end]
+        self.position = end
+        return words
+
+    def readStruct(self, format: str) -> tuple:
+        # format must be a whole number of words, i.e. "<f" or f"<{count}i"
+        size = calcsize(format)
+        assert size % 4 == 0, format
+        values = unpack_from(format, self.bytes, self.position * 4)
+        self.position += size // 4
+        return values
+
+    def seek(self, position: int):
+        if not 0 <= position <= self.length:
+            raise IndexError(f"Cannot seek to {hex(position * 4)}, section ends at {hex(self.length * 4)}")
+        self.position = position
+
+    def skip(self, count: int = 1):
+        self.seek(self.position + count)
@@ -1,487 +1,183 @@
-from dataclasses import dataclass
-import array
 import sys
 import os
-from struct import pack
-from importlib import reload
-from gibberishModules.instructions import *
-from gibberishModules.words import *
-from gibberishModules.functionDefinitions import *
-from gibberishModules.imports import *
-from gibberishModules.arrays import *
-from gibberishModules.variables import *
-from gibberishModules.cppheader import writeCppHeaderFile, parseCppHeaderFile
-from gibberishModules.cppbody import parseCppBodyFile
-from gibberishModules.strings import writeStringToKsm
+from gibberishModules.nullprofiler import nullProfiler, noProfiler
 
-@dataclass
-class fileSection:
-    itemCount: int
-    words: array.array[int]
-    
-def readHeader(fileWords: array.array[int]) -> list[array.array[int]]:
-    assert fileWords[0] == 0x524d534b, fileWords[0]
-    global versionRaw, versionText
-    versionRaw = fileWords[1]
-    setInstructionsVersionRaw(versionRaw)
-    assert versionRaw in (0x00010300, 0x00010302), fileWords[1]
-    majorVersion = (versionRaw >> 16) & 0xffff
-    minorVersion = (versionRaw >> 8) & 0xff
-    patchVersion = versionRaw & 0xff
-    versionText = f"{majorVersion}.{minorVersion}.{patchVersion}"
-    headerWords = fileWords[2:11]
-    headerWords[-1] = len(fileWords)
-    sections = [fileSection(fileWords[startAddress], fileWords[startAddress + 1:endAddress]) for startAddress, endAddress in zip(headerWords[:-1], headerWords[1:])]
-    return sections
+#the build runs this once per file thousands of times over, so every mode imports only what it runs when it starts
+#decompiling never loads the *.cksm parser or section builders, building never loads the corpus tools, and so on
 
-def parseSummary(section: fileSection) -> str | None:
-    if versionRaw <= 0x00010300:
+#prints what --profile recorded, or writes it to profileFileName as JSON
+def writeProfile(profiler: nullProfiler, profileFileName: str | None):
+    if profiler is noProfiler:
+        return
+    if profileFileName is None:
+        profiler.writeTable(sys.stdout)
+    else:
+        profiler.writeJson(profileFileName)
+
+#where the outputs of fileName go, None means next to fileName like a single file run
+def getOutputDirectory(outputDirectory: str | None, baseDirectory: str, fileName: str) -> str | None:
+    if outputDirectory is None:
         return None
-    assert section.itemCount == 0xffffffff, hex(section.itemCount)
-    currentWord = rawWord(0, 0)
-    wordsEnumerated = enumerate(section.words)
-    #TODO: figure out, discard for now
-    getNextWord(wordsEnumerated, currentWord)
-    #filename
-    fileName = readStringFromKsm(wordsEnumerated, currentWord)
-    return fileName
-
-def parseInstructions(section: fileSection) -> str:
-    currentWord = rawWord(0, 0)
-    wordsEnumerated = enumerate(section.words)
-    outstr = ""
-    indentLevel = 0
-    if versionRaw == 0x00010302:
-        setMaxInstructionID(0x76)
-    
-    while currentWord.index < section.itemCount - 1:
-        getNextWord(wordsEnumerated, currentWord)
-        
-        if (currentWord.value & 0xffff0000) or (currentWord.value & 0xff > 0xa0):
-            instructionID = currentWord.value
-            disableExpression = False
-            
-            thisInstruction = variableInstruction(instructionID, disableExpression)
+    return os.path.normpath(os.path.join(outputDirectory, os.path.relpath(os.path.dirname(fileName), baseDirectory)))
+
+def isBatchInput(fileName: str) -> bool:
+    # *.re.bin are what building writes, picking them up again would decompile every build output
+    return fileName.endswith(".cksm") or (fileName.endswith(".bin") and not fileName.endswith(".re.bin"))
+
+#every file the command line names, each with where its outputs go
+#directories are walked and globs expanded for *.bin and *.cksm files, files given by name are taken whatever they're called
+def collectInputFiles(arguments: list[str], outputDirectory: str | None) -> list[tuple[str, str | None]]:
+    inputFiles = list()
+    for argument in arguments:
+        if os.path.isdir(argument):
+            fileNames = sorted(os.path.join(root, fileName) for root, dirNames, fileNames in os.walk(argument) for fileName in fileNames)
+            inputFiles.extend((fileName, getOutputDirectory(outputDirectory, argument, fileName)) for fileName in fileNames if isBatchInput(fileName))
+        elif any(character in argument for character in "*?["):
+            import glob
+            # the directories before the first wildcard are what the outputs are mirrored from
+            parts = argument.replace("\\", "/").split("/")
+            wildcardIndex = next(index for index, part in enumerate(parts) if any(character in part for character in "*?["))
+            baseDirectory = "/".join(parts[:wildcardIndex]) or "."
+            fileNames = sorted(fileName for fileName in glob.glob(argument, recursive=True) if os.path.isfile(fileName))
+            inputFiles.extend((fileName, getOutputDirectory(outputDirectory, baseDirectory, fileName)) for fileName in fileNames if isBatchInput(fileName))
+        elif argument.endswith((".bin", ".cksm")):
+            inputFiles.append((argument, outputDirectory))
         else:
-            instructionID = currentWord.value & 0xff
-            disableExpression = bool(currentWord.value & 0x0100)
-            
-            thisInstruction = matchInstruction(instructionID, False)(instructionID, disableExpression)
-        
-        if isinstance(thisInstruction, endFileInstruction):
-            assert currentWord.index == section.itemCount - 1, hex(currentWord.index * 4)
-            break
-        
-        thisInstruction.readFromKsm(wordsEnumerated, currentWord)
-        cppText, indentLevel, indentOffsetNextLine = thisInstruction.writeToCpp(indentLevel)
-        if cppText.endswith('\n'):
-            cppText = '\t' * indentLevel + cppText[:-1].replace('\n', f"\n{'\t' * indentLevel}") + "\n"
-        outstr += cppText
-        
-        indentLevel += indentOffsetNextLine
-        indentOffsetNextLine = 0
-    return outstr    
+            print(f"Skipping {argument}, it's not a *.bin, *.cksm, directory or glob")
+    return inputFiles
 
-def getMinimumAndMaximumIdentifiers() -> (int, int):
-    variableMin, variableMax = getMinimumAndMaxmimumVariableIdentifiers()
-    functionMin, functionMax = getMinimumAndMaxmimumFunctionIdentifiers()
-    arrayMin, arrayMax = getMinimumAndMaxmimumArrayIdentifiers()
-    finalMin = min(variableMin, functionMin, arrayMin)
-    finalMax = max(variableMax, functionMax, arrayMax)
+def main():
+    def helperText():
+        print("""Usage:
+    python main.py <file>.bin       - parses a KSM *.bin file and outputs it to *.cksm and *.hksm
+    python main.py <file>.cksm      - parses a *.cksm file (and respective *.hksm file) and builds into KSM *.bin
+    python main.py <file>.cksm --incremental            - same, but reuses functions that didn't change since the last --incremental build
+    python main.py <file>.bin|.cksm --profile [<out>.json]  - same as above, then prints the time of every phase and instruction class, nested ones included, or writes them as JSON
+    python main.py <file|dir|glob>... [--out <dir>]     - same as above for every *.bin and *.cksm given, all in one process, *.re.bin files in directories and globs are left out
+    python main.py <socket> -daemon                     - serves decompile and compile requests over a Unix socket, keeping parsed headers between them
+    python main.py <dir> -index [<db>]                  - indexes every file of a corpus into a SQLite database (ksmindex.db by default)
+    python main.py <dir> -roundtrip [--jobs <n>]        - decompiles and builds every file of a corpus in memory, lists the files that don't come back the same in roundtrip.txt
+    python main.py <db> -query import|function <name>   - lists the files that import or define <name>
+    python main.py <db> -query opcode|id <number>       - lists the files that use an opcode or whose identifier range holds an id
+    python main.py <db> -query invalid                  - lists the files that couldn't be decoded""")
     
-    #ensure no variable overlap
-    identifierList = list()
-    identifierList.extend(variableDictGetAllKeys())
-    identifierList.extend(functionDefinitionDictGetAllKeys())
-    identifierList.extend(arrayDefinitionDictByIDGetAllKeys())
-    identifierList.extend(getAllLabelAndArrayIDs())
-    identifierList = [identifier & 0x00ffffff for identifier in identifierList]
-    identifierSet = set(identifierList)
-    assert len(identifierList) == len(identifierSet)
+    # corpus tools only, number of worker processes
+    jobs = 1
+    if "--jobs" in sys.argv:
+        jobsIndex = sys.argv.index("--jobs")
+        jobs = int(sys.argv[jobsIndex + 1])
+        del sys.argv[jobsIndex:jobsIndex + 2]
     
-    if finalMin == 0xffffffff:
-        return -1, -1
-    return finalMin, finalMax
+    # corpus tools only, where results of already seen files are kept
+    # defaults to next to this script so it never ends up inside the corpus being walked
+    cachePath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ksmcache")
+    if "--cache" in sys.argv:
+        cacheIndex = sys.argv.index("--cache")
+        cachePath = sys.argv[cacheIndex + 1]
+        del sys.argv[cacheIndex:cacheIndex + 2]
+    if "--no-cache" in sys.argv:
+        sys.argv.remove("--no-cache")
+        cachePath = None
     
-def parseIDTest():
-    path = sys.argv[1]
-    idRangeList = list()
-    for root, dirNames, fileNames in os.walk(path):
-        for fileName in fileNames:
-            resetVariableDict()
-            fullFileName = f"{root}\\{fileName}"
-            with open(fullFileName, "rb") as file:
-                rawFile = file.read()
-            fileWords = array.array("I", rawFile)
-            try:
-                sections = readHeader(fileWords)
-                parseFunctionDefinitions(sections[1], versionRaw)
-                parseVariables(sections[2], variableScope.static, versionRaw)
-                parseArrayDefinitions(sections[3])
-                parseVariables(sections[4], variableScope.const)
-                parseImportDefinitions(sections[5], versionRaw)
-                parseVariables(sections[6], variableScope.Global)
-            except:
-                fullFileName = fullFileName.removeprefix(path)
-                idRangeList.append((-2, -2, fullFileName))
-            else:
-                fullFileName = fullFileName.removeprefix(path)
-                minID, maxID = getMinimumAndMaximumIdentifiers()
-                idRangeList.append((minID, maxID, fullFileName))
-    idRangeList.sort(key=lambda x: x[0])
-    lastMaxID = None
-    outFile = ""
-    for minID, maxID, fullFileName in idRangeList:
-        if minID == -1:
-            outFile += f"NONE - {fullFileName}\n"
-        elif minID == -2:
-            outFile += f"ERR - {fullFileName}\n"
-        else:
-            outFile += f"{hex(minID // 8)} - {fullFileName}\n"
-            lastMaxID = maxID
-    filename = "list.txt"
-    with open(filename, "w", encoding='utf-8') as file:
-        file.write(outFile)
-
-def parseIDTest2():
-    path = sys.argv[1]
-    importList = list()
-    for root, dirNames, fileNames in os.walk(path):
-        for fileName in fileNames:
-            resetVariableDict()
-            fullFileName = f"{root}\\{fileName}"
-            with open(fullFileName, "rb") as file:
-                rawFile = file.read()
-            fileWords = array.array("I", rawFile)
-            try:
-                sections = readHeader(fileWords)
-                parseFunctionDefinitions(sections[1], versionRaw)
-                parseVariables(sections[2], variableScope.static, versionRaw)
-                parseArrayDefinitions(sections[3])
-                parseVariables(sections[4], variableScope.const)
-                parseImportDefinitions(sections[5], versionRaw)
-                parseVariables(sections[6], variableScope.Global)
-            except:
-                fullFileName = fullFileName.removeprefix(path)
-            else:
-                fullFileName = fullFileName.removeprefix(path)
-                extList = list(importDefinitionDictGetAllValues())
-                for thisImport in extList:
-                    thisImport.foundIn = fullFileName
-                importList.extend(extList)
-    outFileA = ""
-    outFileB = ""
-    outFileC = ""
-    importNameSet = set()
-    for thisImport in importList:
-        if thisImport.name in importNameSet:
-            continue
-        importNameSet.add(thisImport.name)
-        fileIDtext = hex(thisImport.fileID)
-        fileIDtext = "0x" + ("0" * (6 - len(fileIDtext))) + fileIDtext[2:] + "\n"
-        outFileA += fileIDtext
-        outFileB += thisImport.name + "\n"
-        outFileC += thisImport.foundIn + "\n"
-    filename = "listA.txt"
-    with open(filename, "w", encoding='utf-8') as file:
-        file.write(outFileA)
-    filename = "listB.txt"
-    with open(filename, "w", encoding='utf-8') as file:
-        file.write(outFileB)
-    filename = "listC.txt"
-    with open(filename, "w", encoding='utf-8') as file:
-        file.write(outFileC)
+    # *.cksm only, keeps the encoded words of every function in <file>.buildcache for the next build
+    incremental = "--incremental" in sys.argv
+    if incremental:
+        sys.argv.remove("--incremental")
     
-def parseFindInstruction(path: str, targetInstructionID: int):
-    setTargetInstructionID(targetInstructionID)
-    outFile = ""
-    for root, dirNames, fileNames in os.walk(path):
-        for fileName in fileNames:
-            resetVariableDict()
-            setTargetInstructionFound(False)
-            fullFileName = f"{root}\\{fileName}"
-            with open(fullFileName, "rb") as file:
-                rawFile = file.read()
-            fileWords = array.array("I", rawFile)
-            try:
-                sections = readHeader(fileWords)
-                parseFunctionDefinitions(sections[1], versionRaw)
-                parseVariables(sections[2], variableScope.static, versionRaw)
-                parseArrayDefinitions(sections[3])
-                parseVariables(sections[4], variableScope.const)
-                parseImportDefinitions(sections[5], versionRaw)
-                parseVariables(sections[6], variableScope.Global)
-                writeCppHeaderFile(versionRaw)
-                parseInstructions(sections[7])
-            except:
-                fullFileName = fullFileName.removeprefix(path)
-                outFile += f"ERROR - {fullFileName}\n"
-            else:
-                fullFileName = fullFileName.removeprefix(path)
-                if getTargetInstructionFound():
-                    outFile += f"FOUND - {fullFileName}\n"
-            print(f"{fullFileName} processed.")
-    filename = "list.txt"
-    with open(filename, "w", encoding='utf-8') as file:
-        file.write(outFile)
-
-def parseFindAllInstructions(path: str):
-    setTargetInstructionID("all")
-    outFile = "ERROR:\n"
-    fileNameSetList = [list() for count in range(0xa1)]
-    for root, dirNames, fileNames in os.walk(path):
-        for fileName in fileNames:
-            resetVariableDict()
-            resetFoundInstructionsSet()
-            fullFileName = f"{root}\\{fileName}"
-            with open(fullFileName, "rb") as file:
-                rawFile = file.read()
-            fileWords = array.array("I", rawFile)
-            try:
-                sections = readHeader(fileWords)
-                parseFunctionDefinitions(sections[1], versionRaw)
-                parseVariables(sections[2], variableScope.static, versionRaw)
-                parseArrayDefinitions(sections[3])
-                parseVariables(sections[4], variableScope.const)
-                parseImportDefinitions(sections[5], versionRaw)
-                parseVariables(sections[6], variableScope.Global)
-                writeCppHeaderFile(versionRaw)
-                parseInstructions(sections[7])
-            except:
-                fullFileName = fullFileName.removeprefix(path)
-                outFile += f"  - {fullFileName}\n"
-            else:
-                fullFileName = fullFileName.removeprefix(path)
-                for instructionID in getTargetInstructionFound():
-                    assert instructionID >= 0x00 and instructionID <= 0xa0
-                    fileNameSetList[instructionID].append(fullFileName)
-            print(f"{fullFileName} processed.")
-    for instructionID, fileNameList in enumerate(fileNameSetList):
-        outFile += f"INSTRUCTION_{hex(instructionID)}:\n"
-        for fileName in fileNameList:
-            outFile += f"  - {fileName}\n"
-    filename = "list.yaml"
-    with open(filename, "w", encoding='utf-8') as file:
-        file.write(outFile)
-
-def buildSummarySection(section: fileSection, importCount: int, allowDisableExpression: bool):
-    section.words.append(0x00000000)
-    infoWord = min(importCount, 0xff) | (allowDisableExpression << 16)
-    section.words.append(infoWord)
-
-def buildVariableDefinition(section: fileSection, thisVariable: variable):
-    buildWithName = (thisVariable.dataTypeString in ("func", "user"))
-    section.words.append(0xffffffff if buildWithName else 0x00000000)
-    section.words.append(thisVariable.identifier)
-    flags = variableDataTypesStringToInt(thisVariable.dataTypeString)
-    match thisVariable.scope:
-        case variableScope.localVar:
-            pass
-        case variableScope.static:
-            if thisVariable.dataTypeString == "user":
-                flags |= 0x08000000
-            elif thisVariable.dataTypeString != "func":
-                flags |= 0x02000000
-        case variableScope.const:
-            flags |= 0x04000000
-    section.words.append(flags)
-    match thisVariable.dataTypeString:
-        case "float":
-            section.words.frombytes(pack("f", thisVariable.value))
-        case "int":
-            if thisVariable.value < 0:
-                thisVariable.value += 0x100000000
-            section.words.append(thisVariable.value)
-        case "hex":
-            section.words.append(thisVariable.value)
-        case "string" | "me" | "user" | "func" | "ref":
-            section.words.append(0x00000000)
-        case "bool":
-            section.words.append(1 if thisVariable.value else 0)
-        case _:
-            raise Exception(f"Unhandled data type: {thisVariable.dataTypeString}")
-    if buildWithName:
-        writeStringToKsm(section, thisVariable.name)
-    if thisVariable.dataTypeString == "string":
-        writeStringToKsm(section, thisVariable.value)
-
-def buildFunctionDefinitionsSection(section: fileSection, definedFunctions: dict):
-    dataTypeBack = {
-        arrayDataType.Variable: 0,
-        arrayDataType.Int: 1,
-        arrayDataType.Float: 2,
-        arrayDataType.Bool: 3
-    }
+    # *.bin and *.cksm only, where the outputs go instead of next to their inputs
+    # files from a directory or glob keep their place relative to it
+    outputDirectory = None
+    if "--out" in sys.argv:
+        outIndex = sys.argv.index("--out")
+        outputDirectory = sys.argv[outIndex + 1]
+        del sys.argv[outIndex:outIndex + 2]
     
-    section.itemCount = len(definedFunctions)
-    for function in list(definedFunctions.values())[::-1]:
-        section.words.append(0xffffffff)
-        section.words.append(function.identifier)
-        section.words.append(int(function.isPublic))
-        tempVarFlagsRaw = sum(bit << index for index, bit in enumerate(function.tempVarFlags))
-        section.words.append(tempVarFlagsRaw)
-        del tempVarFlagsRaw
-        section.words.append(function.codeOffset)
-        section.words.append(function.codeEnd)
-        section.words.append(function.accumulatorID)
-        if not function.specialLabel is None:
-            section.words.append(function.specialLabel.identifier)
-        else:
-            section.words.append(0x00000000)
-        writeStringToKsm(section, function.name)
-        section.words.append(len(function.declaredLocals))
-        for localVariable in function.declaredLocals:
-            buildVariableDefinition(section, localVariable)
-        
-        section.words.append(len(function.localArraysByID))
-        for thisArray in function.localArraysByID.values():
-            section.words.append(0xffffffff)
-            section.words.append(thisArray.identifier)
-            section.words.append(dataTypeBack[thisArray.dataType])
-            section.words.append(thisArray.length)
-            section.words.append(thisArray.address)
-            writeStringToKsm(section, thisArray.name)
-        
-        section.words.append(len(function.labelsByID))
-        for thisLabel in list(function.labelsByID.values())[::-1]:
-            section.words.append(0)
-            section.words.append(thisLabel.identifier)
-            section.words.append(thisLabel.address)
-
-def buildVariableDefinitionSection(section: fileSection, usedIdentifierSlots: list, scope: int):
-    for thisVariable in usedIdentifierSlots[::-1]:
-        if isinstance(thisVariable, variable) and thisVariable.scope == scope:
-            section.itemCount += 1
-            buildVariableDefinition(section, thisVariable)
-
-def buildArrayDefinitionSection(section: fileSection, definedGlobalArrays: dict):
-    dataTypeBack = {
-        arrayDataType.Variable: 0,
-        arrayDataType.Int: 1,
-        arrayDataType.Float: 2,
-        arrayDataType.Bool: 3
-    }
-    
-    for thisArray in list(definedGlobalArrays.values())[::-1]:
-        section.itemCount += 1
-        section.words.append(0xffffffff)
-        section.words.append(thisArray.identifier)
-        section.words.append(dataTypeBack[thisArray.dataType])
-        section.words.append(thisArray.length)
-        section.words.append(thisArray.address)
-        writeStringToKsm(section, thisArray.name)
-
-def buildImportDefinitionSection(section: fileSection, usedImportSlots: list):
-    section.itemCount = len(usedImportSlots)
-    for thisImport in usedImportSlots[::-1]:
-        section.words.append(0xffffffff)
-        combinedParameter = (thisImport.timesUsed | (thisImport.fileID << 16))
-        section.words.append(combinedParameter)
-        del combinedParameter
-        section.words.append(importDataTypesStringToInt(thisImport.dataTypeString))
-        section.words.append(thisImport.unknown0)
-        section.words.append(thisImport.identifier)
-        section.words.append(0x00000000)
-        section.words.append(0x00000000)
-        writeStringToKsm(section, thisImport.name)
-
-def buildInstructionSection(section: fileSection, instructionList: list):
-    for thisInstruction in instructionList:
-        #print(type(thisInstruction))
-        thisInstruction.writeToKsm(section)
-    for thisInstruction in instructionList:
-        thisInstruction.writeToKsmAfter(section)
-    section.itemCount = len(section.words)
-
-def buildHeaderSection(section: fileSection, sections: list[fileSection]):
-    section.words.append(0x524d534b)
-    section.words.append(0x00010300)
-    offset = 0x0b
-    for thisSection in sections:
-        section.words.append(offset)
-        offset += len(thisSection.words) + 1
-    section.words.append(0x00000000)
-
-def main():
-    def helperText():
-        print("""Usage:
-    python main.py <file>.bin       - parses a KSM *.bin file and outputs it to *.cksm and *.hksm
-    python main.py <file>.cksm      - parses a *.cksm file (and respective *.hksm file) and builds into KSM *.bin""")
+    # *.bin and *.cksm only, records every phase, with a *.json after it the results are written there instead of printed
+    profiler = noProfiler
+    profileFileName = None
+    if "--profile" in sys.argv:
+        profileIndex = sys.argv.index("--profile")
+        from gibberishModules.profiler import phaseProfiler
+        profiler = phaseProfiler()
+        if profileIndex + 1 < len(sys.argv) and sys.argv[profileIndex + 1].endswith(".json"):
+            profileFileName = sys.argv[profileIndex + 1]
+            del sys.argv[profileIndex + 1]
+        del sys.argv[profileIndex]
     
-    if len(sys.argv) == 3 and sys.argv[2] == "-idtest":
-        parseIDTest()
+    if len(sys.argv) in (4, 5) and sys.argv[2] == "-query":
+        from gibberishModules.corpustools import parseQuery
+        parseQuery(sys.argv[1], sys.argv[3], sys.argv[4] if len(sys.argv) == 5 else None)
         return
-    if len(sys.argv) == 3 and sys.argv[2] == "-idtest2":
-        parseIDTest2()
+    if len(sys.argv) == 3 and sys.argv[2] == "-daemon":
+        from gibberishModules.daemon import runDaemon
+        runDaemon(sys.argv[1])
         return
-    if len(sys.argv) == 4 and sys.argv[2] == "-findinstruction":
-        if sys.argv[3].lower() == "all":
-            parseFindAllInstructions(sys.argv[1])
+    if len(sys.argv) == 3 and sys.argv[2] == "-roundtrip":
+        from gibberishModules.corpustools import parseRoundtrip
+        parseRoundtrip(sys.argv[1], jobs)
+        return
+    if len(sys.argv) >= 3 and sys.argv[2] in ("-idtest", "-idtest2", "-findinstruction", "-index"):
+        from gibberishModules.corpustools import parseIndex, parseIDTest, parseIDTest2, parseFindInstruction, parseFindAllInstructions
+        from gibberishModules.parsecache import parseCache
+        cache = parseCache(cachePath) if cachePath is not None else None
+        if len(sys.argv) in (3, 4) and sys.argv[2] == "-index":
+            parseIndex(sys.argv[1], sys.argv[3] if len(sys.argv) == 4 else "ksmindex.db", jobs, cache)
+        elif len(sys.argv) == 3 and sys.argv[2] == "-idtest":
+            parseIDTest(jobs, cache)
+        elif len(sys.argv) == 3 and sys.argv[2] == "-idtest2":
+            parseIDTest2(jobs, cache)
+        elif len(sys.argv) == 4 and sys.argv[2] == "-findinstruction":
+            if sys.argv[3].lower() == "all":
+                parseFindAllInstructions(sys.argv[1], jobs, cache)
+            else:
+                parseFindInstruction(sys.argv[1], int(sys.argv[3], 0), jobs, cache)
         else:
-            parseFindInstruction(sys.argv[1], int(sys.argv[3], 0))
+            helperText()
+        if cache is not None:
+            cache.evict()
         return
-    elif len(sys.argv) != 2:
+    elif len(sys.argv) < 2:
         helperText()
         return
-    if sys.argv[1].endswith(".bin"):
-        with open(sys.argv[1], "rb") as file:
-            rawFile = file.read()
-        fileWords = array.array("I", rawFile)
-        sections = readHeader(fileWords)
-        filename = parseSummary(sections[0])
-        parseFunctionDefinitions(sections[1], versionRaw)
-        parseVariables(sections[2], variableScope.static, versionRaw)
-        parseArrayDefinitions(sections[3])
-        parseVariables(sections[4], variableScope.const)
-        parseImportDefinitions(sections[5], versionRaw)
-        parseVariables(sections[6], variableScope.Global)
-        minID, maxID = getMinimumAndMaximumIdentifiers()
-        outHeaderFile = writeCppHeaderFile(versionRaw, minID)
-        outFile = parseInstructions(sections[7])
-        
-        if filename is None:
-            filename = f"{sys.argv[1].removesuffix(".bin")}.cksm"
-        else:
-            filename = f"{filename.removesuffix(".cpp")}.cksm"
-        open(filename, "w", encoding='utf-8').write(outFile)
-
-        filename = f"{filename.removesuffix(".cksm")}.hksm"
-        open(filename, "w", encoding='utf-8').write(outHeaderFile)
-        return
-    if sys.argv[1].endswith(".cksm"):
-        fileName = sys.argv[1]
-        headerFileName = f"{fileName.removesuffix(".cksm")}.hksm"
-        
-        fileText = open(headerFileName, "r", encoding = "utf-8").readlines()
-        definedImports, definedVariables, identifierSlotOffset = parseCppHeaderFile(fileText)
-        
-        fileText = open(fileName, "r", encoding = "utf-8").readlines()
-        instructionList, definedFunctions, usedIdentifierSlots, usedImportSlots, importCount, allowDisableExpression, definedGlobalArrays = parseCppBodyFile(fileText, definedImports, definedVariables, identifierSlotOffset)
-        
-        #print(definedImports.keys())
-        #print("\n".join(f"{value}" for value in definedVariables.values()))
-        #print([f.name for f in definedFunctions.values()])
-        #print([f.isPublic for f in definedFunctions.values()])
-        sections = [fileSection(0, array.array("I")) for sectionCount in range(9)]
-        buildInstructionSection(sections[7], instructionList)
-        buildSummarySection(sections[0], importCount, allowDisableExpression)
-        buildFunctionDefinitionsSection(sections[1], definedFunctions)
-        buildVariableDefinitionSection(sections[2], usedIdentifierSlots, variableScope.static)
-        buildArrayDefinitionSection(sections[3], definedGlobalArrays)
-        buildVariableDefinitionSection(sections[4], usedIdentifierSlots, variableScope.const)
-        buildImportDefinitionSection(sections[5], usedImportSlots)
-        buildVariableDefinitionSection(sections[6], usedIdentifierSlots, variableScope.Global)
-        buildHeaderSection(sections[-1], sections[:-1])
-        outFile = bytearray()
-        outFile += sections[-1].words.tobytes()
-        for section in sections[:-1]:
-            section.words.insert(0, section.itemCount)
-            outFile += section.words.tobytes()
-        filename = f"{sys.argv[1].removesuffix(".cksm")}.re.bin"
-        open(filename, "wb").write(outFile)
+    if len(sys.argv) == 2 and outputDirectory is None and os.path.isfile(sys.argv[1]):
+        if sys.argv[1].endswith(".bin"):
+            from gibberishModules.ksmreader import decompileFile
+            decompileFile(sys.argv[1], None, profiler)
+            writeProfile(profiler, profileFileName)
+            return
+        if sys.argv[1].endswith(".cksm"):
+            from gibberishModules.ksmbuilder import compileFile
+            compileFile(sys.argv[1], None, incremental, profiler)
+            writeProfile(profiler, profileFileName)
+            return
+        helperText()
         return
     
-    helperText()
-    return
+    inputFiles = collectInputFiles(sys.argv[1:], outputDirectory)
+    if not inputFiles:
+        helperText()
+        return
+    if any(fileName.endswith(".bin") for fileName, fileOutputDirectory in inputFiles):
+        from gibberishModules.ksmreader import decompileFile
+    if any(fileName.endswith(".cksm") for fileName, fileOutputDirectory in inputFiles):
+        from gibberishModules.ksmbuilder import compileFile
+    errorCount = 0
+    for fileName, fileOutputDirectory in inputFiles:
+        # a broken file doesn't stop the rest, every file gets its own context and compilation data anyway
+        try:
+            if fileName.endswith(".bin"):
+                decompileFile(fileName, fileOutputDirectory, profiler)
+            else:
+                compileFile(fileName, fileOutputDirectory, incremental, profiler)
+        except Exception as exception:
+            errorCount += 1
+            print(f"ERROR - {fileName} - {type(exception).__name__}: {exception}")
+            continue
+        print(f"{fileName} processed.")
+    print(f"{len(inputFiles) - errorCount} of {len(inputFiles)} files processed.")
+    writeProfile(profiler, profileFileName)
+    # the only way out of batch mode, failing if any file did
+    if errorCount:
+        sys.exit(1)
 
 if __name__ == "__main__": main()
\ No newline at end of file
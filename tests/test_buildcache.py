@@ -0,0 +1,55 @@
+import os
+import pickle
+import tempfile
+import unittest
+from benchmarks.synthetic import generateKsmFile
+from gibberishModules.buildcache import buildCache, getBuildCacheVersion
+from gibberishModules.ksmreader import decompileFile
+from gibberishModules.ksmbuilder import compileFile
+
+class buildCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cacheFileName = os.path.join(self.directory.name, "a.buildcache")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def loadRecords(self, data: bytes) -> dict:
+        with open(self.cacheFileName, "wb") as file:
+            file.write(data)
+        return buildCache(self.cacheFileName, list(), list(), dict(), dict()).records
+
+    #caches written by older checkouts, or damaged ones, are ignored rather than failing the build
+    def test_incompatibleCacheIsEmpty(self):
+        incompatibleCaches = {
+            "oldLayoutMissingClass": b"(I2\ncgibberishModules.instructions\nnoSuchInstruction\n)Rt.",
+            "otherVersion": pickle.dumps("1:0000000000000000") + pickle.dumps({"key": None}),
+            "changedSignature": pickle.dumps(getBuildCacheVersion()) + b"cgibberishModules.buildcache\nfunctionRecord\n)R.",
+            "truncated": pickle.dumps(getBuildCacheVersion()) + b"\x80\x05\x95",
+            "garbage": b"not a pickle at all"
+        }
+        for name, data in incompatibleCaches.items():
+            with self.subTest(name):
+                self.assertEqual(self.loadRecords(data), dict())
+
+    def test_missingCacheIsEmpty(self):
+        self.assertEqual(buildCache(self.cacheFileName, list(), list(), dict(), dict()).records, dict())
+
+    #an incremental build that reuses every function has to build the same file as a full one
+    def test_incrementalBuildMatchesFullBuild(self):
+        fileName = os.path.join(self.directory.name, "synthetic.bin")
+        with open(fileName, "wb") as file:
+            file.write(generateKsmFile(0x00010300, 4, 10))
+        bodyFileName, headerFileName = decompileFile(fileName, self.directory.name)
+        outputs = list()
+        for incremental in (False, True, True):
+            with open(compileFile(bodyFileName, self.directory.name, incremental), "rb") as file:
+                outputs.append(file.read())
+        self.assertEqual(outputs[1], outputs[0])
+        self.assertEqual(outputs[2], outputs[0])
+        with open(f"{bodyFileName.removesuffix(".cksm")}.buildcache", "rb") as file:
+            self.assertEqual(pickle.load(file), getBuildCacheVersion())
+            self.assertTrue(pickle.load(file))
+
+if __name__ == "__main__": unittest.main()
@@ -0,0 +1,31 @@
+import os
+import tempfile
+import unittest
+from benchmarks.synthetic import generateKsmFile
+from gibberishModules.daemon import daemonState
+
+class daemonTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.workingDirectory = tempfile.TemporaryDirectory()
+        self.previousWorkingDirectory = os.getcwd()
+        os.chdir(self.workingDirectory.name)
+
+    def tearDown(self):
+        os.chdir(self.previousWorkingDirectory)
+        self.workingDirectory.cleanup()
+        self.directory.cleanup()
+
+    #1.3.2 files are named after the source file in their summary, that name mustn't resolve against the daemon's working directory
+    def test_decompileWritesNextToFile(self):
+        fileName = os.path.join(self.directory.name, "input.bin")
+        with open(fileName, "wb") as file:
+            file.write(generateKsmFile(0x00010302, 4, 10))
+        result = daemonState().answer(f"{{\"command\": \"decompile\", \"file\": \"{fileName}\"}}".encode("utf-8"))["result"]
+        for name in ("body", "header"):
+            self.assertTrue(os.path.isabs(result[name]))
+            self.assertEqual(os.path.dirname(result[name]), self.directory.name)
+            self.assertTrue(os.path.exists(result[name]))
+        self.assertEqual(os.listdir(self.workingDirectory.name), list())
+
+if __name__ == "__main__": unittest.main()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+from gibberishModules import parsecache
+from gibberishModules.parsecache import parseCache
+
+class parseCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = parseCache(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def writeEntry(self, key: str, data: bytes):
+        with open(self.cache.getEntryPath(key), "wb") as file:
+            file.write(data)
+
+    def test_putThenGet(self):
+        self.cache.put("key", [1, 2, 3])
+        self.assertEqual(self.cache.get("key"), ([1, 2, 3],))
+
+    def test_cachedNoneIsAHit(self):
+        self.cache.put("key", None)
+        self.assertEqual(self.cache.get("key"), (None,))
+
+    def test_missingEntryIsAMiss(self):
+        self.assertIsNone(self.cache.get("key"))
+
+    #a change to any decoder has to miss everything cached before it
+    def test_keyFollowsCodeVersion(self):
+        fileName = os.path.join(self.directory.name, "a.bin")
+        with open(fileName, "wb") as file:
+            file.write(b"KSMR")
+        codeVersion = parsecache.getCodeVersion()
+        try:
+            key = self.cache.getKey("censusFile", fileName)
+            parsecache.codeVersion = "changed"
+            self.assertNotEqual(self.cache.getKey("censusFile", fileName), key)
+        finally:
+            parsecache.codeVersion = codeVersion
+
+    #entries pickled from classes that changed or moved since, and plain damaged files
+    def test_incompatibleEntryIsAMissAndDropped(self):
+        incompatibleEntries = {
+            "missingClass": b"cgibberishModules.imports\nnoSuchClass\n)R.",
+            "missingModule": b"cgibberishModules.noSuchModule\nnoSuchClass\n)R.",
+            "wrongArguments": b"cgibberishModules.corpusindex\nindexedFile\n)R.",
+            "truncated": b"\x80\x05\x95",
+            "garbage": b"not a pickle at all"
+        }
+        for key, data in incompatibleEntries.items():
+            with self.subTest(key):
+                self.writeEntry(key, data)
+                self.assertIsNone(self.cache.get(key))
+                self.assertFalse(os.path.exists(self.cache.getEntryPath(key)))
+
+if __name__ == "__main__": unittest.main()
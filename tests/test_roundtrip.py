@@ -0,0 +1,62 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from benchmarks.synthetic import generateKsmFile
+from gibberishModules.ksmreader import decompileFile
+from gibberishModules.ksmbuilder import compileFile
+from gibberishModules.corpustools import listCorpusFiles, roundtripFile, parseRoundtrip
+
+#round trips a small corpus the way -roundtrip walks it, subdirectories included
+class roundtripTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "corpus")
+        corpusFiles = {
+            "a.bin": self.buildOnce(generateKsmFile(0x00010300, 4, 10)),
+            os.path.join("sub", "b.bin"): self.buildOnce(generateKsmFile(0x00010300, 3, 5, seed=2)),
+            os.path.join("sub", "c.bin"): generateKsmFile(0x00010302, 3, 5),
+            "broken.bin": b"KSMR garbage"
+        }
+        for fileName, data in corpusFiles.items():
+            fullFileName = os.path.join(self.path, fileName)
+            os.makedirs(os.path.dirname(fullFileName), exist_ok=True)
+            with open(fullFileName, "wb") as file:
+                file.write(data)
+
+    #synthetic files aren't laid out exactly like the compiler does it, going through it once makes files that come back the same
+    def buildOnce(self, data: bytes) -> bytes:
+        buildPath = os.path.join(self.directory.name, "build")
+        os.makedirs(buildPath, exist_ok=True)
+        fileName = os.path.join(buildPath, "synthetic.bin")
+        with open(fileName, "wb") as file:
+            file.write(data)
+        bodyFileName, headerFileName = decompileFile(fileName, buildPath)
+        with open(compileFile(bodyFileName, buildPath), "rb") as file:
+            return file.read()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_listedFilesRoundtrip(self):
+        statuses = {os.path.relpath(fullFileName, self.path): roundtripFile(fullFileName).status for fullFileName in listCorpusFiles(self.path)}
+        self.assertEqual(statuses, {
+            "a.bin": "OK",
+            os.path.join("sub", "b.bin"): "OK",
+            os.path.join("sub", "c.bin"): "SKIPPED",
+            "broken.bin": "ERROR"
+        })
+
+    def test_parseRoundtrip(self):
+        workingDirectory = os.getcwd()
+        os.chdir(self.directory.name)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                parseRoundtrip(self.path)
+        finally:
+            os.chdir(workingDirectory)
+        self.assertIn("2 OK, 0 MISMATCH, 1 SKIPPED, 1 ERROR", output.getvalue())
+        self.assertTrue(os.path.exists(os.path.join(self.directory.name, "roundtrip.txt")))
+
+if __name__ == "__main__": unittest.main()